@@ -0,0 +1,37 @@
+"""Add outbox_messages table for transactional queue dispatch
+
+Revision ID: 3b8e51c0d2f4
+Revises: 74bebc4e82f4
+Create Date: 2026-10-16 09:12:41.204118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8e51c0d2f4'
+down_revision: Union[str, None] = '74bebc4e82f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'outbox_messages',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('queue', sa.String(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id', name=op.f('pk_outbox_messages')),
+    )
+    op.create_index(op.f('ix_outbox_messages_id'), 'outbox_messages', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_outbox_messages_id'), table_name='outbox_messages')
+    op.drop_table('outbox_messages')
@@ -0,0 +1,30 @@
+"""Add ocr_pending status and image_data for the OCR pipeline stage
+
+Revision ID: 5c1f7a9e2b63
+Revises: 3b8e51c0d2f4
+Create Date: 2026-10-16 11:02:17.530912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1f7a9e2b63'
+down_revision: Union[str, None] = '3b8e51c0d2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TYPE submissionstatus ADD VALUE IF NOT EXISTS 'ocr_pending'")
+    op.add_column('submissions', sa.Column('image_data', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    # Submissions still waiting for OCR cannot be represented without the stage
+    op.execute("UPDATE submissions SET status = 'evaluation_error' WHERE status::text = 'ocr_pending'")
+    op.drop_column('submissions', 'image_data')
+    # Postgres cannot drop a single enum value; 'ocr_pending' stays in the type unused
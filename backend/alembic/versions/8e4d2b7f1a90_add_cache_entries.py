@@ -0,0 +1,35 @@
+"""Add cache_entries table for the shared cache tier
+
+Revision ID: 8e4d2b7f1a90
+Revises: 5c1f7a9e2b63
+Create Date: 2026-10-16 13:27:05.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4d2b7f1a90'
+down_revision: Union[str, None] = '5c1f7a9e2b63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'cache_entries',
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('value', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('key', name=op.f('pk_cache_entries')),
+    )
+    op.create_index(op.f('ix_cache_entries_expires_at'), 'cache_entries', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_cache_entries_expires_at'), table_name='cache_entries')
+    op.drop_table('cache_entries')
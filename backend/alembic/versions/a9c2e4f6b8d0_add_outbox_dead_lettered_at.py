@@ -0,0 +1,26 @@
+"""Add dead_lettered_at to outbox_messages
+
+Revision ID: a9c2e4f6b8d0
+Revises: f3a6d8b1c5e7
+Create Date: 2026-10-17 19:02:31.518274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c2e4f6b8d0'
+down_revision: Union[str, None] = 'f3a6d8b1c5e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('outbox_messages', sa.Column('dead_lettered_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('outbox_messages', 'dead_lettered_at')
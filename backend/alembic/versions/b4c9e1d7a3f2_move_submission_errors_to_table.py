@@ -0,0 +1,130 @@
+"""Move submission errors from the JSON column to submission_errors
+
+Revision ID: b4c9e1d7a3f2
+Revises: 8e4d2b7f1a90
+Create Date: 2026-10-17 09:12:44.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4c9e1d7a3f2'
+down_revision: Union[str, None] = '8e4d2b7f1a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ERROR_FIELDS = ('type', 'location', 'description', 'severity', 'status')
+# Submissions copied per batch, so large tables are never loaded at once
+BATCH_SIZE = 500
+
+submissions = sa.table(
+    'submissions',
+    sa.column('id', sa.Integer),
+    sa.column('errors', sa.JSON),
+)
+
+submission_errors = sa.table(
+    'submission_errors',
+    sa.column('submission_id', sa.Integer),
+    sa.column('error_id', sa.String),
+    sa.column('position', sa.Integer),
+    sa.column('type', sa.String),
+    sa.column('location', sa.Text),
+    sa.column('description', sa.Text),
+    sa.column('severity', sa.String),
+    sa.column('status', sa.String),
+)
+
+
+def _severity(value):
+    # Same normalization as SubmissionError.update_from_dict: strings are kept
+    # as they are, legacy booleans map to "high"/"low"
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return 'high' if value else 'low'
+    return str(value)
+
+
+def _batches(connection, query, id_column):
+    """Run `query` in keyset batches of BATCH_SIZE submissions, in id order."""
+    last_id = None
+    while True:
+        batch_query = query.order_by(id_column).limit(BATCH_SIZE)
+        if last_id is not None:
+            batch_query = batch_query.where(id_column > last_id)
+        rows = connection.execute(batch_query).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'submission_errors',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('submission_id', sa.Integer(), nullable=False),
+        sa.Column('error_id', sa.String(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('type', sa.String(), nullable=True),
+        sa.Column('location', sa.Text(), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('severity', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['submission_id'], ['submissions.id'], name=op.f('fk_submission_errors_submission_id_submissions'), ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id', name=op.f('pk_submission_errors')),
+    )
+    op.create_index(op.f('ix_submission_errors_id'), 'submission_errors', ['id'], unique=False)
+    op.create_index('ix_submission_errors_submission_id_status', 'submission_errors', ['submission_id', 'status'], unique=False)
+
+    connection = op.get_bind()
+    query = sa.select(submissions.c.id, submissions.c.errors).where(submissions.c.errors.isnot(None))
+    for batch in _batches(connection, query, submissions.c.id):
+        rows = []
+        for submission_id, errors in batch:
+            for position, error in enumerate(errors or []):
+                if not isinstance(error, dict):
+                    continue
+                row = {field: error.get(field) for field in ERROR_FIELDS}
+                row.update(
+                    submission_id=submission_id,
+                    error_id=str(error.get('id')),
+                    position=position,
+                    severity=_severity(error.get('severity')),
+                    status=error.get('status') or 'active',
+                )
+                rows.append(row)
+        if rows:
+            op.bulk_insert(submission_errors, rows)
+
+    op.drop_column('submissions', 'errors')
+
+
+def downgrade() -> None:
+    op.add_column('submissions', sa.Column('errors', sa.JSON(), nullable=True))
+
+    connection = op.get_bind()
+    query = sa.select(submissions.c.id).where(
+        sa.exists().where(submission_errors.c.submission_id == submissions.c.id)
+    )
+    for batch in _batches(connection, query, submissions.c.id):
+        submission_ids = [row[0] for row in batch]
+        errors_by_submission = {}
+        errors_query = sa.select(submission_errors).where(
+            submission_errors.c.submission_id.in_(submission_ids)
+        ).order_by(submission_errors.c.submission_id, submission_errors.c.position)
+        for row in connection.execute(errors_query).mappings():
+            error = {'id': row['error_id']}
+            error.update({field: row[field] for field in ERROR_FIELDS})
+            errors_by_submission.setdefault(row['submission_id'], []).append(error)
+        for submission_id, errors in errors_by_submission.items():
+            connection.execute(submissions.update().where(submissions.c.id == submission_id).values(errors=errors))
+
+    op.drop_index('ix_submission_errors_submission_id_status', table_name='submission_errors')
+    op.drop_index(op.f('ix_submission_errors_id'), table_name='submission_errors')
+    op.drop_table('submission_errors')
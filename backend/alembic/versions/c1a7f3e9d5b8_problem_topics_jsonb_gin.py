@@ -0,0 +1,48 @@
+"""Store problem topics as JSONB with a GIN index
+
+Revision ID: c1a7f3e9d5b8
+Revises: b4c9e1d7a3f2
+Create Date: 2026-10-17 11:03:27.640915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1a7f3e9d5b8'
+down_revision: Union[str, None] = 'b4c9e1d7a3f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # JSONB and GIN are PostgreSQL features; other databases keep plain JSON
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.alter_column(
+        'problems', 'topics',
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        postgresql_using='topics::jsonb',
+    )
+    # jsonb_path_ops supports @> only, with a smaller and faster index
+    op.create_index(
+        'ix_problems_topics', 'problems', ['topics'], unique=False,
+        postgresql_using='gin', postgresql_ops={'topics': 'jsonb_path_ops'},
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_problems_topics', table_name='problems', postgresql_using='gin')
+    op.alter_column(
+        'problems', 'topics',
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        postgresql_using='topics::json',
+    )
@@ -0,0 +1,34 @@
+"""Add composite indexes for keyset pagination of submissions
+
+Revision ID: d2b8e4f0a6c3
+Revises: c1a7f3e9d5b8
+Create Date: 2026-10-17 13:41:09.275518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2b8e4f0a6c3'
+down_revision: Union[str, None] = 'c1a7f3e9d5b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_submissions_submitted_at_id', 'submissions',
+        [sa.text('submitted_at DESC'), sa.text('id DESC')], unique=False,
+    )
+    op.create_index(
+        'ix_submissions_problem_id_submitted_at_id', 'submissions',
+        ['problem_id', sa.text('submitted_at DESC'), sa.text('id DESC')], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_submissions_problem_id_submitted_at_id', table_name='submissions')
+    op.drop_index('ix_submissions_submitted_at_id', table_name='submissions')
@@ -0,0 +1,33 @@
+"""Add catalog_versions table for in-process catalog cache invalidation
+
+Revision ID: e5f1a3c7b9d2
+Revises: d2b8e4f0a6c3
+Create Date: 2026-10-17 15:41:08.274915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f1a3c7b9d2'
+down_revision: Union[str, None] = 'd2b8e4f0a6c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    catalog_versions = op.create_table(
+        'catalog_versions',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name', name=op.f('pk_catalog_versions')),
+    )
+    # Seed the row so writers only ever need the UPDATE
+    op.bulk_insert(catalog_versions, [{'name': 'problems', 'version': 0}])
+
+
+def downgrade() -> None:
+    op.drop_table('catalog_versions')
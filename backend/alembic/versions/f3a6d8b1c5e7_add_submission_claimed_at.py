@@ -0,0 +1,26 @@
+"""Add claimed_at to submissions for reclaiming stale processing claims
+
+Revision ID: f3a6d8b1c5e7
+Revises: e5f1a3c7b9d2
+Create Date: 2026-10-17 18:12:44.106382
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a6d8b1c5e7'
+down_revision: Union[str, None] = 'e5f1a3c7b9d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('submissions', sa.Column('claimed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('submissions', 'claimed_at')
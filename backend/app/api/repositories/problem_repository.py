@@ -2,6 +2,7 @@ from typing import List, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 from ...db.models import Problem
+from ...crud.problem import topics_filter
 from ..schemas.problem import ProblemCreate, ProblemUpdate
 
 class ProblemRepository:
@@ -41,10 +42,9 @@ class ProblemRepository:
         if is_published is not None:
             query = query.filter(Problem.is_published == is_published)
             
-        # For topics, we need a more complex filter if provided
+        # One containment test for all topics (GIN-indexed on PostgreSQL)
         if topics and len(topics) > 0:
-            for topic in topics:
-                query = query.filter(Problem.topics.contains([topic]))
+            query = query.filter(topics_filter(db, topics))
         
         return query.order_by(desc(Problem.created_at)).offset(skip).limit(limit).all()
     
@@ -1,41 +1,73 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app import crud, schemas
 from app.db import models
 from app.db.session import get_db
+from app.core.config import settings
+from app.core.http_cache import cache_headers, if_none_match, not_modified, request_etag
+from app.core.pagination import NEXT_CURSOR_HEADER, InvalidCursor, decode_cursor, encode_cursor
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.Problem])
 def read_problems(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    topics: Optional[List[str]] = Query(None),
+    cursor: Optional[str] = None,
 ):
     """
     Retrieve a list of problems.
     - Anyone can view published problems.
     - Moderators/Admins can view all problems (including unpublished drafts).
+    - `topics` (repeatable) keeps only problems tagged with all given topics.
+    - Full pages carry an `X-Next-Cursor` header; pass it back as `cursor`
+      for the next page (`skip` is ignored when a cursor is given).
+    - Responses carry an `ETag` derived from the problem catalog version;
+      a matching `If-None-Match` is answered with 304 and no body.
     """
+    after_id = None
+    if cursor:
+        try:
+            after_id = int(decode_cursor(cursor, 1)[0])
+        except (InvalidCursor, TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    etag = request_etag(request, crud.problem.get_catalog_version_cached(db))
+    if if_none_match(request, etag):
+        return not_modified(etag, settings.PROBLEM_HTTP_MAX_AGE_SECONDS)
     # TODO: Implement filtering based on published status and user role
     # For now, return all problems
-    problems = crud.problem.get_problems(db, skip=skip, limit=limit)
+    problems = crud.problem.get_problems_cached(db, skip=skip, limit=limit, topics=topics, after_id=after_id)
+    if limit > 0 and len(problems) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(problems[-1].id)
+    response.headers.update(cache_headers(etag, settings.PROBLEM_HTTP_MAX_AGE_SECONDS))
     return problems
 
 @router.get("/{problem_id}", response_model=schemas.Problem)
 def read_problem(
     problem_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
 ):
     """
     Retrieve a specific problem by ID.
     - Anyone can view published problems.
     - Moderators/Admins can view unpublished drafts.
+    - Conditional requests (`If-None-Match`) are answered with 304 while the
+      problem catalog is unchanged.
     """
-    db_problem = crud.problem.get_problem(db, problem_id=problem_id)
+    etag = request_etag(request, crud.problem.get_catalog_version_cached(db))
+    if if_none_match(request, etag):
+        return not_modified(etag, settings.PROBLEM_HTTP_MAX_AGE_SECONDS)
+    db_problem = crud.problem.get_problem_cached(db, problem_id=problem_id)
     if db_problem is None:
         raise HTTPException(status_code=404, detail="Problem not found")
-    
+    response.headers.update(cache_headers(etag, settings.PROBLEM_HTTP_MAX_AGE_SECONDS))
+
     return db_problem 
\ No newline at end of file
@@ -1,18 +1,23 @@
-import pika
+import asyncio
 import json
 import logging
-import time
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any, TYPE_CHECKING
 import copy
 
 from app import crud, schemas
 from app.db import models
-from app.db.session import get_db, SessionLocal
+from app.db.session import get_db, engine
+from app.db.pool import pool_status
 from app.db.models.submission import SubmissionStatus
 from app.crud import submission as submission_crud
-from app.evaluation.image_to_latex import convert_image_to_latex
+from app.core.config import settings
+from app.core.rabbitmq import get_publisher, EVALUATION_QUEUE
+from app.core.events import get_event_hub
+from app.core.pagination import NEXT_CURSOR_HEADER, InvalidCursor, decode_cursor, encode_cursor
 from app.evaluation import default_router
 
 if TYPE_CHECKING:
@@ -22,7 +27,12 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 # Maximum allowed appeal attempts per submission
-MAX_APPEAL_ATTEMPTS = 5
+MAX_APPEAL_ATTEMPTS = settings.MAX_APPEAL_ATTEMPTS
+
+# Seconds between keep-alive comments on idle event streams
+EVENT_STREAM_HEARTBEAT_SECONDS = 15
+# Statuses after which a submission never changes again
+FINAL_STATUSES = {SubmissionStatus.completed.value, SubmissionStatus.evaluation_error.value}
 
 def submission_to_dict(submission: models.Submission) -> Dict[str, Any]:
     """Convert a Submission model to a dictionary for API response"""
@@ -39,80 +49,66 @@ def submission_to_dict(submission: models.Submission) -> Dict[str, Any]:
         "appeal_attempts": submission.appeal_attempts # Include appeal attempts
     }
 
-# Function to publish task to RabbitMQ that can be mocked in tests
-def publish_to_rabbitmq(message: Dict[str, Any], host: str = 'rabbitmq', retries: int = 3) -> bool:
-    """
-    Publish a message to RabbitMQ for async processing
-    
-    Args:
-        message: Message to publish
-        host: RabbitMQ hostname
-        retries: Number of connection retries before giving up
-        
-    Returns:
-        True if message was successfully published, False otherwise
-    """
-    # Track connection state for global health check
-    for attempt in range(retries):
-        try:
-            logger.info(f"Attempting to publish message for submission {message.get('submission_id')} to RabbitMQ (attempt {attempt+1}/{retries})")
-            connection_params = pika.ConnectionParameters(
-                host=host, 
-                port=5672,
-                connection_attempts=2,
-                retry_delay=1,
-                socket_timeout=5
-            )
-            
-            connection = pika.BlockingConnection(connection_params)
-            channel = connection.channel()
-
-            queue_name = 'evaluation_queue'
-            channel.queue_declare(queue=queue_name, durable=True)  # Durable queue
-
-            channel.basic_publish(
-                exchange='',
-                routing_key=queue_name,
-                body=json.dumps(message),
-                properties=pika.BasicProperties(
-                    delivery_mode=pika.DeliveryMode.Persistent  # Make message persistent
-                )
-            )
-            logger.info(f"Successfully published submission {message.get('submission_id')} to {queue_name}")
-            connection.close()
-            return True
-        except pika.exceptions.AMQPConnectionError as e:
-            logger.warning(f"RabbitMQ connection error on attempt {attempt+1}: {str(e)}")
-            # Only sleep if we're going to retry
-            if attempt < retries - 1:
-                time.sleep(1)  # Brief delay before retrying
-        except Exception as e:
-            logger.error(f"Error publishing to RabbitMQ: {type(e).__name__}: {str(e)}", exc_info=True)
-            # For non-connection errors, don't retry
-            break
-    
-    logger.error(f"Failed to publish submission {message.get('submission_id')} to RabbitMQ after {retries} attempts")
-    return False
-
-@router.get("/", response_model=List[schemas.Submission])
+@router.get("/", response_model=List[schemas.SubmissionListItem], response_model_exclude_unset=True)
 def get_submissions(
+    response: Response,
     db: Session = Depends(get_db),
     skip: int = 0,
     limit: int = 20,
     problem_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
     """
-    Get all submissions with pagination, optionally filtered by problem_id
+    Get all submissions with pagination, optionally filtered by problem_id.
+
+    Pages are newest first. Full pages carry an `X-Next-Cursor` header; pass
+    it back as `cursor` to fetch the next page without OFFSET (`skip` is
+    ignored when a cursor is given).
+
+    `fields` is a comma-separated list of columns to return (e.g.
+    `id,problem_id,status,score,submitted_at,appeal_attempts`, or `summary`
+    for exactly those). Only those columns are queried; `id` and
+    `submitted_at` are always included. Without it full submissions,
+    including solution text and errors, are returned.
     """
+    after = None
+    if cursor:
+        try:
+            submitted_at, submission_id = decode_cursor(cursor, 2)
+            after = (submitted_at, int(submission_id))
+        except (InvalidCursor, TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    selected_fields = None
+    if fields:
+        selected_fields = [f.strip() for f in fields.split(",") if f.strip()]
+        if selected_fields == ["summary"]:
+            selected_fields = list(submission_crud.SUBMISSION_SUMMARY_FIELDS)
+        unknown = set(selected_fields) - set(submission_crud.SUBMISSION_LIST_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields {sorted(unknown)}; allowed: {', '.join(submission_crud.SUBMISSION_LIST_FIELDS)}"
+            )
     try:
-        if problem_id:
-            submissions = crud.submission.get_submissions_for_problem(db, problem_id, skip, limit)
+        if selected_fields is not None:
+            items = crud.submission.get_submission_fields(
+                db, selected_fields, problem_id=problem_id, skip=skip, limit=limit, after=after
+            )
+            logger.info(f"Retrieved {len(items)} submission summaries")
+        elif problem_id:
+            submissions = crud.submission.get_submissions_for_problem(db, problem_id, skip, limit, after=after)
+            items = [submission_to_dict(s) for s in submissions]
             logger.info(f"Retrieved {len(submissions)} submissions for problem {problem_id}")
         else:
-            submissions = crud.submission.get_submissions(db, skip, limit)
+            submissions = crud.submission.get_submissions(db, skip, limit, after=after)
+            items = [submission_to_dict(s) for s in submissions]
             logger.info(f"Retrieved {len(submissions)} submissions")
         
-        return [submission_to_dict(s) for s in submissions]
+        if limit > 0 and len(items) == limit:
+            last = items[-1]
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last["submitted_at"], last["id"])
+        return items
     except Exception as e:
         logger.error(f"Error retrieving submissions: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -136,28 +132,13 @@ def check_evaluator_health():
         rabbitmq_details = {}
         
         try:
-            # Use a shorter timeout for health check
-            connection = pika.BlockingConnection(
-                pika.ConnectionParameters(
-                    host='rabbitmq',
-                    blocked_connection_timeout=5
-                )
-            )
-            
-            # Declare the queue
-            channel = connection.channel()
-            queue_name = 'evaluation_queue'
-            queue_info = channel.queue_declare(queue=queue_name, durable=True)
-            
-            # Get queue length
-            queue_length = queue_info.method.message_count
+            # Reuse a pooled channel rather than opening a new connection
+            queue_length = get_publisher().get_queue_length(EVALUATION_QUEUE)
             
             rabbitmq_details = {
-                "queue_name": queue_name,
+                "queue_name": EVALUATION_QUEUE,
                 "queue_length": queue_length
             }
-            
-            connection.close()
         except Exception as e:
             rabbitmq_status = "unhealthy"
             rabbitmq_details = {"error": str(e)}
@@ -170,7 +151,8 @@ def check_evaluator_health():
             "rabbitmq": {
                 "status": rabbitmq_status,
                 "details": rabbitmq_details
-            }
+            },
+            "database_pool": pool_status(engine.pool)
         }
         
         logger.info(f"Evaluator health check completed: {health_info['status']}")
@@ -183,7 +165,7 @@ def check_evaluator_health():
         )
 
 @router.post("/", response_model=schemas.Submission, status_code=202)
-async def create_submission_endpoint(
+def create_submission_endpoint(
     problem_id: int = Form(...),
     solution_text: Optional[str] = Form(None),
     image_file: Optional[UploadFile] = File(None),
@@ -195,13 +177,15 @@ async def create_submission_endpoint(
     Args:
         problem_id: ID of the problem being solved
         solution_text: LaTeX solution text (optional)
-        image_file: Image file to be processed with OCR (optional)
+        image_file: Image file to be converted by the OCR worker (optional)
         db: Database session
         
     Returns:
         Newly created submission object
     
-    One of solution_text or image_file must be provided.
+    One of solution_text or image_file must be provided. A plain `def`, so
+    FastAPI runs the blocking upload read and commit in its threadpool
+    instead of on the event loop.
     """
     logger.info(f"Processing submission for problem {problem_id}")
     
@@ -212,86 +196,31 @@ async def create_submission_endpoint(
             detail="Either solution_text or image_file must be provided",
         )
     
-    # Handle image file upload and OCR processing
+    # Image submissions are stored as-is; the OCR worker extracts the LaTeX
+    image_data = None
     if image_file and not solution_text:
-        try:
-            logger.info(f"Processing image file: {image_file.filename}")
-            
-            # Read the file
-            contents = await image_file.read()
-            
-            # Convert image to LaTeX using OCR
-            solution_text = convert_image_to_latex(contents)
-            
-            if not solution_text:
-                logger.error("OCR processing failed to extract LaTeX")
-                raise HTTPException(
-                    status_code=400,
-                    detail="Failed to extract LaTeX from the provided image. Please check image quality or submit LaTeX directly.",
-                )
-            
-            logger.info("Successfully converted image to LaTeX")
-        except Exception as e:
-            logger.error(f"Error processing image: {str(e)}", exc_info=True)
+        logger.info(f"Storing image file for OCR: {image_file.filename}")
+        image_data = image_file.file.read()
+        if not image_data:
+            logger.error("Uploaded image file is empty")
             raise HTTPException(
-                status_code=500,
-                detail=f"Error processing image: {str(e)}",
+                status_code=400,
+                detail="The uploaded image file is empty.",
             )
     
     # Create submission in the database
     try:
         submission_in = schemas.SubmissionCreate(
             problem_id=problem_id,
-            solution_text=solution_text,
+            solution_text=solution_text or "", # Filled in by the OCR worker for images
         )
         
-        # Create the submission record
-        db_submission = crud.submission.create_submission(db=db, submission_in=submission_in)
+        # Create the submission record. Its queue message (ocr_queue for images,
+        # evaluation_queue otherwise) is written to the outbox in the same
+        # transaction and dispatched by the relay.
+        db_submission = crud.submission.create_submission(db=db, submission_in=submission_in, image_data=image_data)
         logger.info(f"Created submission with ID {db_submission.id}")
         
-        # Prepare submission for async processing
-        submission_dict = {
-            "submission_id": db_submission.id,
-            "problem_id": problem_id,
-            "solution_text": solution_text,
-        }
-        
-        # Try to publish to RabbitMQ but don't fail if it's not available
-        rabbitmq_success = publish_to_rabbitmq(submission_dict)
-        
-        if not rabbitmq_success:
-            logger.warning(f"Failed to publish submission {db_submission.id} to RabbitMQ. Will process synchronously.")
-            
-            try:
-                # Process synchronously as a fallback
-                # Get a new session to avoid conflicts with the main request session
-                fallback_db = SessionLocal()
-                
-                try:
-                    # Use the evaluator directly
-                    errors = default_router.find_errors(problem_id, solution_text)
-                    success = default_router.evaluate(problem_id, solution_text, errors)
-                    score = 100 if success else max(0, 100 - (len(errors) * 10))
-                    
-                    # Update the submission
-                    updated_submission = crud.submission.update_submission_evaluation(
-                        fallback_db,
-                        submission_id=db_submission.id,
-                        status=SubmissionStatus.COMPLETED,
-                        score=score,
-                        errors=errors
-                    )
-                    logger.info(f"Processed submission {db_submission.id} synchronously with score {score}")
-                except Exception as eval_error:
-                    logger.error(f"Error in fallback evaluation for submission {db_submission.id}: {str(eval_error)}", exc_info=True)
-                    updated_submission = crud.submission.update_submission_status(fallback_db, db_submission.id, SubmissionStatus.FAILED)
-            except Exception as fallback_error:
-                logger.error(f"Failed even in fallback processing: {str(fallback_error)}", exc_info=True)
-            finally:
-                fallback_db.close()
-        else:
-            logger.info(f"Successfully published submission {db_submission.id} to RabbitMQ")
-        
         return submission_to_dict(db_submission)
     except Exception as e:
         logger.error(f"Error creating submission: {str(e)}", exc_info=True)
@@ -314,23 +243,81 @@ def read_submission(
     logger.info(f"Successfully retrieved submission {submission_id} with status {db_submission.status}")
     return db_submission
 
-@router.post("/{submission_id}/appeals", response_model=schemas.Submission)
+@router.get("/{submission_id}/events")
+async def stream_submission_events(
+    submission_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Stream status changes of a submission as Server-Sent Events.
+
+    The first event is the current status; after that one `status` event is
+    sent per transition. The stream ends once the submission reaches a final
+    status. Events carry only {"submission_id", "status"}; clients refetch the
+    submission when it changes.
+    """
+    hub = get_event_hub()
+    # Subscribe before reading the snapshot so no transition can slip in between
+    queue = hub.subscribe(submission_id)
+    try:
+        db_submission = await run_in_threadpool(crud.submission.get_submission, db, submission_id)
+        if db_submission is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Submission not found")
+        snapshot = {"submission_id": submission_id, "status": submission_to_dict(db_submission)["status"]}
+    except BaseException:
+        hub.unsubscribe(submission_id, queue)
+        raise
+    finally:
+        # Don't hold a pooled connection for the lifetime of the stream
+        db.close()
+
+    async def event_stream():
+        try:
+            change = snapshot
+            while True:
+                yield f"event: status\ndata: {json.dumps(change)}\n\n"
+                if change["status"] in FINAL_STATUSES:
+                    return
+                while True:
+                    try:
+                        change = await asyncio.wait_for(queue.get(), timeout=EVENT_STREAM_HEARTBEAT_SECONDS)
+                        break
+                    except asyncio.TimeoutError:
+                        if await request.is_disconnected():
+                            return
+                        yield ": keep-alive\n\n"
+        finally:
+            hub.unsubscribe(submission_id, queue)
+
+    logger.info(f"Streaming status events for submission {submission_id}")
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/{submission_id}/appeals", response_model=schemas.Submission, status_code=status.HTTP_202_ACCEPTED)
 def appeal_submission_batch(
     submission_id: int,
     appeal_batch: schemas.MultiAppealCreate,
     db: Session = Depends(get_db),
 ) -> Dict[str, Any]:
-    """Submit a batch of appeals for errors in a submission."""
+    """
+    Submit a batch of appeals for errors in a submission.
+
+    The batch is judged asynchronously: the appealed errors become
+    'appealing', the submission moves to 'processing' and the judge worker
+    picks the batch up from `appeal_queue`. The submission returns to
+    'appealing' (or 'completed') when the verdicts are stored; follow it on
+    the event stream.
+    """
     logger.info(f"Processing appeal batch for submission {submission_id} with {len(appeal_batch.appeals)} items.")
     
-    # 1. Get submission and problem context
+    # 1. Get submission
     submission = crud.submission.get_submission(db, submission_id=submission_id)
     if not submission:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Submission not found")
-    
-    problem = db.query(models.Problem).filter(models.Problem.id == submission.problem_id).first()
-    if not problem:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Associated problem not found")
 
     # 2. Check Status and Appeal Limits
     if submission.status != SubmissionStatus.appealing:
@@ -341,100 +328,47 @@ def appeal_submission_batch(
         logger.warning(f"Appeal rejected: Submission {submission_id} has reached the maximum appeal limit ({MAX_APPEAL_ATTEMPTS}).")
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Maximum appeal attempts reached.")
 
-    # 3. Prepare for Appeal Processing
-    try:
-        # Increment attempt count
-        submission = crud.submission.increment_appeal_attempts(db, submission_id)
-        if not submission: # Check if increment failed
-            raise Exception(f"Failed to increment appeal attempts for submission {submission_id}")
-        
-        # Create list of error IDs with 'appealing' status for batch update
-        appealed_error_ids = [a.error_id for a in appeal_batch.appeals]
-        # Need ErrorDetail structure for update_errors_batch
-        errors_to_mark_appealing: List[Dict] = []
-        valid_appeal_requests: List[schemas.ErrorAppeal] = []
-        submission_errors_map = {e.get('id'): e for e in (submission.errors or []) if isinstance(e, dict)}
-
-        for appeal_req in appeal_batch.appeals:
-            # Check for required justification (text or image)
-            if not appeal_req.justification and not appeal_req.image_justification:
-                logger.warning(f"Skipping appeal for error {appeal_req.error_id}: no justification provided")
-                continue
-                
-            # Check if error exists and is appealable (active or rejected)
-            if appeal_req.error_id in submission_errors_map and submission_errors_map[appeal_req.error_id].get('status') in ['active', 'rejected']:
-                errors_to_mark_appealing.append({'id': appeal_req.error_id, 'status': 'appealing'})
-                valid_appeal_requests.append(appeal_req) # Only process valid ones
-            else:
-                logger.warning(f"Skipping appeal for error {appeal_req.error_id}: not found or not active/rejected in submission {submission_id}")
-        
-        if not valid_appeal_requests:
-            raise HTTPException(status_code=400, detail="No valid active errors selected for appeal.")
-
-        # Update error statuses to 'appealing'
-        submission = crud.submission.update_errors_batch(db, submission_id, errors_to_mark_appealing)
-        if not submission: # Should exist, but check
-            raise Exception("Failed to mark errors as appealing after retrieving submission.")
-        
-        logger.info(f"Marked {len(valid_appeal_requests)} errors as 'appealing' for submission {submission_id}")
-
-        # 4. Process Valid Appeals Batch via Evaluator
-        logger.info(f"Routing appeal batch for submission {submission_id} to evaluator.")
-        default_router.process_appeal(
-            appeals=valid_appeal_requests, # Use the filtered list 
-            submission=submission, 
-            problem=problem
-        )
-        
-        # 6. Re-evaluate Submission (using the in-memory modified submission object)
-        logger.info(f"Re-evaluating submission {submission_id} after appeals.")
-        evaluation_result = default_router.evaluate(submission=submission, problem=problem)
-
-        # 7. Update Submission state (score, feedback, errors)
-        submission = crud.submission.update_submission_after_appeal(
-            db=db,
-            submission_id=submission_id,
-            evaluation_result=evaluation_result,
-            updated_errors=submission.errors # Pass the modified errors list
-        )
-        if not submission:
-            raise Exception("Failed to update submission score/feedback/errors after re-evaluation.")
+    # 3. Keep the appeals that have a justification and target an appealable error
+    valid_appeal_requests: List[schemas.ErrorAppeal] = []
+    submission_errors_map = {e.get('id'): e for e in (submission.errors or []) if isinstance(e, dict)}
 
-        # 8. Determine FINAL status based on attempts and remaining potentially appealable errors
-        # An error is still potentially subject to appeal if it's 'active' or 'rejected'
-        # (assuming rejected errors can be re-appealed if attempts remain)
-        has_remaining_appealable_errors = any(
-            e.get('status') in ['active', 'rejected']
-            for e in (submission.errors or []) if isinstance(e, dict)
-        )
-        
-        final_status = SubmissionStatus.appealing # Default to stay appealing
-
-        # Transition to 'completed' only if attempts are used up OR if there are absolutely no more errors that could be appealed
-        if submission.appeal_attempts >= MAX_APPEAL_ATTEMPTS or not has_remaining_appealable_errors:
-            final_status = SubmissionStatus.completed
-            logger.info(f"Setting final status to 'completed' for submission {submission_id}. Attempts: {submission.appeal_attempts}, Has appealable errors: {has_remaining_appealable_errors}")
+    for appeal_req in appeal_batch.appeals:
+        # Check for required justification (text or image)
+        if not appeal_req.justification and not appeal_req.image_justification:
+            logger.warning(f"Skipping appeal for error {appeal_req.error_id}: no justification provided")
+            continue
+            
+        # Check if error exists and is appealable (active or rejected)
+        if appeal_req.error_id in submission_errors_map and submission_errors_map[appeal_req.error_id].get('status') in crud.submission.APPEALABLE_ERROR_STATUSES:
+            valid_appeal_requests.append(appeal_req) # Only process valid ones
         else:
-             logger.info(f"Submission {submission_id} remains 'appealing'. Attempts: {submission.appeal_attempts}, Has appealable errors: {has_remaining_appealable_errors}")
-
-        # 9. Update the final status separately
-        final_submission = crud.submission.update_submission_status(db, submission_id, final_status)
-        if not final_submission:
-             raise Exception(f"Failed to set final status {final_status} for submission {submission_id}")
-
-        logger.info(f"Appeal batch processing complete for submission {submission_id}. Final status: {final_submission.status}")
-        return submission_to_dict(final_submission)
+            logger.warning(f"Skipping appeal for error {appeal_req.error_id}: not found or not active/rejected in submission {submission_id}")
+    
+    if not valid_appeal_requests:
+        raise HTTPException(status_code=400, detail="No valid active errors selected for appeal.")
 
-    except HTTPException as http_exc: # Re-raise HTTP exceptions directly
-        raise http_exc
+    # 4. Queue the batch. The status and limit checks above are repeated
+    # atomically here, so concurrent appeals cannot exceed the limit.
+    try:
+        queued = crud.submission.queue_appeal(db, submission_id, valid_appeal_requests, max_attempts=MAX_APPEAL_ATTEMPTS)
     except Exception as e:
-        db.rollback() # Ensure rollback on any exception during the process
-        logger.error(f"Appeal batch processing failed for submission {submission_id}: {str(e)}", exc_info=True)
-        # Optionally try to revert status if appropriate, complex error handling needed.
+        logger.error(f"Appeal batch could not be queued for submission {submission_id}: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Appeal processing failed: {str(e)}"
         )
+    if not queued:
+        current = db.get(models.Submission, submission_id, populate_existing=True)
+        if current is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Submission not found")
+        if current.status != SubmissionStatus.appealing:
+            logger.warning(f"Appeal rejected: Submission {submission_id} left the 'appealing' state (current: {current.status})")
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Submission is not in an appealable state.")
+        logger.warning(f"Appeal rejected: Submission {submission_id} has reached the maximum appeal limit ({MAX_APPEAL_ATTEMPTS}).")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Maximum appeal attempts reached.")
+
+    logger.info(f"Queued {len(valid_appeal_requests)} appeal(s) for submission {submission_id}")
+    return submission_to_dict(queued)
 
 @router.post("/{submission_id}/accept", response_model=schemas.Submission)
 def accept_score(
@@ -455,19 +389,22 @@ def accept_score(
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Submission is not in an appealable state.")
     
     try:
-        # Update submission status to completed
+        # Update submission status to completed, unless a concurrent request moved it on
         updated_submission = crud.submission.update_submission_status(
             db=db,
             submission_id=submission_id,
-            status=SubmissionStatus.completed
+            status=SubmissionStatus.completed,
+            expected_status=SubmissionStatus.appealing
         )
         
         if not updated_submission:
-            raise Exception(f"Failed to update status for submission {submission_id}")
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Submission is not in an appealable state.")
         
         logger.info(f"Successfully accepted score for submission {submission_id}")
         return submission_to_dict(updated_submission)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to accept score for submission {submission_id}: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -0,0 +1,228 @@
+"""
+Small caching toolkit: an in-process LRU tier and a database-backed tier
+shared by every API and worker process, combined by TieredCache, and
+VersionedCache for in-process copies of data that is invalidated through a
+shared version counter instead of a TTL.
+
+Values in the shared tier are stored as JSON, so anything json.dumps accepts
+can be cached. Caches are best effort: a failing shared tier is logged and
+treated as a miss, never surfaced to the caller.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Hashable, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.models.cache import CacheEntry
+
+logger = logging.getLogger(__name__)
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded LRU cache with an optional per-entry TTL.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class DatabaseCache:
+    """
+    Persistent cache tier on the `cache_entries` table.
+
+    Each call uses its own short-lived session from `session_factory`, so the
+    cache can be used from any thread without touching the caller's session.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], ttl: Optional[float] = None):
+        self.session_factory = session_factory
+        self.ttl = ttl
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            with self.session_factory() as db:
+                entry = db.get(CacheEntry, key)
+                if entry is None or (entry.expires_at is not None and entry.expires_at <= datetime.utcnow()):
+                    return default
+                return json.loads(entry.value)
+        except Exception as e:
+            logger.warning(f"Cache read failed for {key}: {type(e).__name__}: {str(e)}")
+            return default
+
+    def set(self, key: str, value: Any):
+        expires_at = datetime.utcnow() + timedelta(seconds=self.ttl) if self.ttl is not None else None
+        try:
+            with self.session_factory() as db:
+                db.merge(CacheEntry(key=key, value=json.dumps(value), created_at=datetime.utcnow(), expires_at=expires_at))
+                db.commit()
+        except IntegrityError:
+            # Another process stored the same key concurrently; its value is just as good
+            logger.debug(f"Cache entry {key} was written concurrently")
+        except Exception as e:
+            logger.warning(f"Cache write failed for {key}: {type(e).__name__}: {str(e)}")
+
+    def delete(self, key: str):
+        try:
+            with self.session_factory() as db:
+                db.query(CacheEntry).filter(CacheEntry.key == key).delete(synchronize_session=False)
+                db.commit()
+        except Exception as e:
+            logger.warning(f"Cache delete failed for {key}: {type(e).__name__}: {str(e)}")
+
+    def purge_expired(self) -> int:
+        """Delete expired entries. Returns the number of rows removed."""
+        with self.session_factory() as db:
+            removed = (
+                db.query(CacheEntry)
+                .filter(CacheEntry.expires_at.isnot(None), CacheEntry.expires_at <= datetime.utcnow())
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+        if removed:
+            logger.info(f"Purged {removed} expired cache entries")
+        return removed
+
+class TieredCache:
+    """
+    Read-through combination of a local LRU tier and a shared tier.
+
+    Reads check the local tier first and back-fill it on a shared hit; writes
+    go to both tiers. Keys are prefixed with `namespace` in the shared tier so
+    unrelated caches can share the table.
+    """
+
+    def __init__(self, namespace: str, local: LRUCache, shared: Optional[DatabaseCache] = None):
+        self.namespace = namespace
+        self.local = local
+        self.shared = shared
+
+    def _shared_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        if self.shared is None:
+            return default
+        value = self.shared.get(self._shared_key(key))
+        if value is None:
+            return default
+        self.local.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any):
+        self.local.set(key, value)
+        if self.shared is not None:
+            self.shared.set(self._shared_key(key), value)
+
+    def delete(self, key: str):
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(self._shared_key(key))
+
+_MISSING = object()
+
+class VersionedCache:
+    """
+    Read-through local cache invalidated by a shared version counter.
+
+    `version_loader(db)` returns the current version of the cached data (a
+    row every writer bumps). It is read at most every `check_interval`
+    seconds, and all entries are dropped whenever it differs from the version
+    they were loaded under, so changes made by other processes are seen
+    within `check_interval`. Call `invalidate` to see this process's own
+    changes immediately.
+
+    Loaders should return immutable values: entries are shared by every
+    caller. None is never cached.
+    """
+
+    def __init__(self, version_loader: Callable[[Session], Any], max_entries: int = 1024, check_interval: float = 2.0):
+        self.version_loader = version_loader
+        self.check_interval = check_interval
+        self.local = LRUCache(max_entries)
+        self._lock = threading.Lock()
+        self._version: Any = _MISSING
+        self._checked_at: Optional[float] = None
+        # Bumped on every invalidation, so a load that raced one is not stored
+        self._generation = 0
+
+    def get_or_load(self, db: Session, key: Hashable, loader: Callable[[], Any]) -> Any:
+        self._check_version(db)
+        with self._lock:
+            generation = self._generation
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = loader()
+        if value is not None:
+            with self._lock:
+                if generation == self._generation:
+                    self.local.set(key, value)
+        return value
+
+    def current_version(self, db: Session) -> Any:
+        """The version the cached entries belong to, re-checked at most every `check_interval`."""
+        self._check_version(db)
+        with self._lock:
+            return self._version
+
+    def invalidate(self):
+        """Drop every entry and re-read the version on the next access."""
+        with self._lock:
+            self.local.clear()
+            self._generation += 1
+            self._checked_at = None
+
+    def _check_version(self, db: Session):
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return
+        version = self.version_loader(db)
+        with self._lock:
+            if version != self._version:
+                self.local.clear()
+                self._generation += 1
+                self._version = version
+            self._checked_at = now
@@ -13,6 +13,22 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "postgresql://postgres:postgres@db:5432/mooj")
+    # Selects the pool profile below: "api" (uvicorn) or "worker" (judge/OCR workers, relay, scripts)
+    DB_PROCESS_ROLE: str = os.getenv("DB_PROCESS_ROLE", "api")
+    # API profile: many short requests
+    DB_API_POOL_SIZE: int = int(os.getenv("DB_API_POOL_SIZE", 10))
+    DB_API_MAX_OVERFLOW: int = int(os.getenv("DB_API_MAX_OVERFLOW", 10))
+    DB_API_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_API_STATEMENT_TIMEOUT_MS", 15000))
+    # Worker profile: size the pool to WORKER_CONCURRENCY plus the sweeper/relay
+    DB_WORKER_POOL_SIZE: int = int(os.getenv("DB_WORKER_POOL_SIZE", 5))
+    DB_WORKER_MAX_OVERFLOW: int = int(os.getenv("DB_WORKER_MAX_OVERFLOW", 5))
+    DB_WORKER_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_WORKER_STATEMENT_TIMEOUT_MS", 60000))
+    # Shared by both profiles
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # LISTEN for submission status NOTIFYs in this process (PostgreSQL only)
+    SUBMISSION_EVENTS_LISTEN: bool = os.getenv("SUBMISSION_EVENTS_LISTEN", "true").lower() == "true"
 
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your_secret_key_here")
@@ -41,9 +57,72 @@ class Settings(BaseSettings):
     GOOGLE_CLIENT_ID: Optional[str] = os.getenv("GOOGLE_CLIENT_ID")
     GOOGLE_CLIENT_SECRET: Optional[str] = os.getenv("GOOGLE_CLIENT_SECRET")
 
+    # RabbitMQ
+    RABBITMQ_HOST: str = os.getenv("RABBITMQ_HOST", "rabbitmq")
+    RABBITMQ_PORT: int = int(os.getenv("RABBITMQ_PORT", 5672))
+    RABBITMQ_VHOST: str = os.getenv("RABBITMQ_VHOST", "/")
+    RABBITMQ_USER: str = os.getenv("RABBITMQ_USER", "guest")
+    RABBITMQ_PASSWORD: str = os.getenv("RABBITMQ_PASSWORD", "guest")
+    # Channels kept open by the API publisher (each on its own connection)
+    RABBITMQ_CHANNEL_POOL_SIZE: int = int(os.getenv("RABBITMQ_CHANNEL_POOL_SIZE", 4))
+    # Seconds a request waits for a free channel before publishing fails
+    RABBITMQ_ACQUIRE_TIMEOUT: float = float(os.getenv("RABBITMQ_ACQUIRE_TIMEOUT", 2.0))
+    RABBITMQ_SOCKET_TIMEOUT: float = float(os.getenv("RABBITMQ_SOCKET_TIMEOUT", 5.0))
+
+    # OCR process pool (run by the OCR worker)
+    OCR_POOL_WORKERS: int = int(os.getenv("OCR_POOL_WORKERS", 2))
+    OCR_TIMEOUT_SECONDS: float = float(os.getenv("OCR_TIMEOUT_SECONDS", 30))
+    # OCR results cached by image SHA-256: in-process LRU size and shared-tier TTL
+    OCR_CACHE_MAX_ENTRIES: int = int(os.getenv("OCR_CACHE_MAX_ENTRIES", 1024))
+    OCR_CACHE_TTL_SECONDS: int = int(os.getenv("OCR_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+
+    # Problem catalog cache (crud.problem): in-process LRU size, and how often
+    # a process checks the shared catalog version for changes made elsewhere
+    PROBLEM_CACHE_MAX_ENTRIES: int = int(os.getenv("PROBLEM_CACHE_MAX_ENTRIES", 1024))
+    PROBLEM_CACHE_VERSION_CHECK_SECONDS: float = float(os.getenv("PROBLEM_CACHE_VERSION_CHECK_SECONDS", 2.0))
+    # Cache-Control max-age of problem responses; clients and proxies revalidate
+    # with If-None-Match afterwards
+    PROBLEM_HTTP_MAX_AGE_SECONDS: int = int(os.getenv("PROBLEM_HTTP_MAX_AGE_SECONDS", 60))
+
+    # Appeal batches a submission may file; the last one completes it
+    MAX_APPEAL_ATTEMPTS: int = int(os.getenv("MAX_APPEAL_ATTEMPTS", 5))
+
     # LLM API
     LLM_API_KEY: Optional[str] = os.getenv("LLM_API_KEY")
     LLM_API_ENDPOINT: Optional[str] = os.getenv("LLM_API_ENDPOINT")
+    # Shared LLM client (app.evaluation.llm): keep-alive connection pool
+    LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", 20))
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", 10))
+    LLM_KEEPALIVE_EXPIRY_SECONDS: float = float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", 30.0))
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", 60.0))
+    # Requests in flight per process, and per evaluator unless its config sets
+    # "llm_concurrency"
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", 16))
+    LLM_EVALUATOR_CONCURRENCY: int = int(os.getenv("LLM_EVALUATOR_CONCURRENCY", 4))
+    # Requests started per second per process, with bursts up to LLM_BURST (0 disables)
+    LLM_REQUESTS_PER_SECOND: float = float(os.getenv("LLM_REQUESTS_PER_SECOND", 5.0))
+    LLM_BURST: int = int(os.getenv("LLM_BURST", 10))
+    # Retries of timeouts, 429 and 5xx responses, with jittered exponential backoff
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", 4))
+    LLM_RETRY_BASE_SECONDS: float = float(os.getenv("LLM_RETRY_BASE_SECONDS", 0.5))
+    LLM_RETRY_MAX_SECONDS: float = float(os.getenv("LLM_RETRY_MAX_SECONDS", 30.0))
+
+    def db_pool_profile(self, role: Optional[str] = None) -> dict:
+        """Pool size, overflow and statement timeout for an "api" or "worker" process."""
+        role = role or self.DB_PROCESS_ROLE
+        if role not in ("api", "worker"):
+            raise ValueError(f"Unknown DB_PROCESS_ROLE '{role}', expected 'api' or 'worker'")
+        if role == "worker":
+            return {
+                "pool_size": self.DB_WORKER_POOL_SIZE,
+                "max_overflow": self.DB_WORKER_MAX_OVERFLOW,
+                "statement_timeout_ms": self.DB_WORKER_STATEMENT_TIMEOUT_MS,
+            }
+        return {
+            "pool_size": self.DB_API_POOL_SIZE,
+            "max_overflow": self.DB_API_MAX_OVERFLOW,
+            "statement_timeout_ms": self.DB_API_STATEMENT_TIMEOUT_MS,
+        }
 
     class Config:
         case_sensitive = True
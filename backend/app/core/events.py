@@ -0,0 +1,191 @@
+"""
+Submission status change notifications.
+
+Every committed change to `Submission.status` made through `SessionLocal` or
+the async worker's sessions is announced, whichever process made it (API,
+judge worker, OCR worker, sweeper); other session factories opt in with
+`register_status_listeners`:
+
+* On PostgreSQL the change is sent with NOTIFY on `SUBMISSION_EVENTS_CHANNEL`
+  inside the writing transaction, so it is delivered exactly when (and only
+  if) the transaction commits. Each API process runs one LISTEN thread that
+  fans notifications out to its subscribers.
+* On other databases (tests, single-process development) changes are
+  dispatched in-process after commit.
+
+Subscribers are asyncio queues, one per open event stream.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set, Tuple, Type, Union
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db.models.submission import Submission
+from app.db.session import AsyncWorkerSession, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+SUBMISSION_EVENTS_CHANNEL = "submission_events"
+
+# Session.info key holding events waiting for the commit (non-Postgres only)
+_PENDING_EVENTS_KEY = "pending_submission_events"
+
+# Seconds between reconnect attempts of the LISTEN thread
+LISTEN_RETRY_SECONDS = 5
+
+def _status_value(status: Any) -> str:
+    return status.value if hasattr(status, "value") else str(status)
+
+def _collect_status_changes(session: Session, flush_context):
+    """Announce the status of every submission inserted or updated by this flush."""
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Submission) and inspect(obj).attrs.status.history.has_changes():
+            announce_status_change(session, obj.id, obj.status)
+
+def announce_status_change(session: Session, submission_id: int, status: Any):
+    """
+    Queue a status event for the current transaction of `session`.
+
+    ORM changes are picked up automatically; call this directly after
+    Core UPDATE statements, which bypass the flush.
+    """
+    change = {"submission_id": submission_id, "status": _status_value(status)}
+    if session.get_bind().dialect.name == "postgresql":
+        # NOTIFY is transactional: delivered on commit, discarded on rollback
+        session.connection().execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": SUBMISSION_EVENTS_CHANNEL, "payload": json.dumps(change)},
+        )
+    else:
+        session.info.setdefault(_PENDING_EVENTS_KEY, []).append(change)
+
+def _dispatch_local_events(session: Session):
+    for change in session.info.pop(_PENDING_EVENTS_KEY, []):
+        get_event_hub().publish(change)
+
+def _discard_local_events(session: Session, previous_transaction):
+    session.info.pop(_PENDING_EVENTS_KEY, None)
+
+_STATUS_LISTENERS = (
+    ("after_flush", _collect_status_changes),
+    ("after_commit", _dispatch_local_events),
+    ("after_soft_rollback", _discard_local_events),
+)
+
+def register_status_listeners(session_factory: Union[sessionmaker, Type[Session]]):
+    """Announce status changes made through sessions of `session_factory`. Idempotent."""
+    for name, listener in _STATUS_LISTENERS:
+        if not event.contains(session_factory, name, listener):
+            event.listen(session_factory, name, listener)
+
+register_status_listeners(SessionLocal)
+register_status_listeners(AsyncWorkerSession)
+
+class SubmissionEventHub:
+    """
+    Fans submission status events out to per-stream asyncio queues.
+
+    `publish` may be called from any thread; events are handed to each
+    subscriber's event loop with call_soon_threadsafe.
+    """
+
+    def __init__(self, database_url: str = settings.DATABASE_URL, listen: bool = settings.SUBMISSION_EVENTS_LISTEN):
+        self.database_url = database_url
+        self.listen = listen
+        self._subscribers: Dict[int, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._listener: Optional[threading.Thread] = None
+
+    def subscribe(self, submission_id: int) -> asyncio.Queue:
+        """Return a queue receiving events for one submission. Call from the event loop."""
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            self._subscribers[submission_id].add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, submission_id: int, queue: asyncio.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(submission_id)
+            if not subscribers:
+                return
+            subscribers.difference_update({s for s in subscribers if s[1] is queue})
+            if not subscribers:
+                del self._subscribers[submission_id]
+
+    def publish(self, change: Dict[str, Any]):
+        """Deliver a {"submission_id", "status"} event to its subscribers."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(change.get("submission_id"), ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, change)
+            except RuntimeError:
+                # The subscriber's loop is closed; it will unsubscribe on its way out
+                pass
+
+    def start(self):
+        """Start the LISTEN thread when enabled and running on PostgreSQL."""
+        if not self.listen or self._listener is not None:
+            return
+        if make_url(self.database_url).get_backend_name() != "postgresql":
+            return
+        self._stop.clear()
+        self._listener = threading.Thread(target=self._listen, name="submission-events", daemon=True)
+        self._listener.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._listener is not None:
+            self._listener.join(timeout=LISTEN_RETRY_SECONDS)
+            self._listener = None
+
+    def _listen(self):
+        import psycopg2
+        import psycopg2.extensions
+
+        dsn = make_url(self.database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = psycopg2.connect(dsn)
+                connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {SUBMISSION_EVENTS_CHANNEL}")
+                logger.info(f"Listening for submission events on '{SUBMISSION_EVENTS_CHANNEL}'")
+                while not self._stop.is_set():
+                    if select.select([connection], [], [], 1.0) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notification = connection.notifies.pop(0)
+                        try:
+                            self.publish(json.loads(notification.payload))
+                        except ValueError:
+                            logger.warning(f"Ignoring malformed submission event: {notification.payload}")
+            except Exception as e:
+                logger.error(f"Submission event listener failed: {type(e).__name__}: {str(e)}; retrying in {LISTEN_RETRY_SECONDS}s")
+                self._stop.wait(LISTEN_RETRY_SECONDS)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+_event_hub: Optional[SubmissionEventHub] = None
+_event_hub_lock = threading.Lock()
+
+def get_event_hub() -> SubmissionEventHub:
+    """Return the process-wide event hub, creating it on first use."""
+    global _event_hub
+    if _event_hub is None:
+        with _event_hub_lock:
+            if _event_hub is None:
+                _event_hub = SubmissionEventHub()
+    return _event_hub
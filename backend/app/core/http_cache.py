@@ -0,0 +1,45 @@
+"""
+HTTP validation caching helpers (ETag / If-None-Match).
+
+An ETag is derived from the version of the data behind a response and the
+request that produced it, so it can be computed, and a conditional request
+answered with 304, before loading anything. Responses also carry a
+Cache-Control header so browsers, CDNs and reverse proxies can serve them
+without reaching the API at all until `max-age` runs out.
+"""
+import hashlib
+from typing import Any, Dict
+
+from fastapi import Request, Response, status
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over `parts` (e.g. catalog version, path, query string)."""
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+def request_etag(request: Request, version: Any) -> str:
+    """ETag of the response to `request` when the underlying data is at `version`."""
+    query = sorted(request.query_params.multi_items())
+    return make_etag(version, request.url.path, query)
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """
+    Whether the request's If-None-Match matches `etag`.
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match, so
+    validators a proxy marked weak (W/"...") still match.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in header.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+def cache_headers(etag: str, max_age: int) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+
+def not_modified(etag: str, max_age: int) -> Response:
+    """A 304 response carrying the validators of the cached representation."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag, max_age))
@@ -0,0 +1,65 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor is the sort key of the last row of a page, JSON-encoded and
+base64url-wrapped so clients treat it as opaque. The next page is then
+`WHERE (sort key) < cursor` (or `>` for ascending order), which an index on
+the sort key answers without scanning the skipped rows, unlike OFFSET.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Sequence
+
+from sqlalchemy import tuple_
+
+# Response header carrying the cursor of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class InvalidCursor(ValueError):
+    """The cursor was not produced by encode_cursor for this listing."""
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and set(value) == {"dt"}:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+def encode_cursor(*values: Any) -> str:
+    """Encode a row's sort key values as an opaque cursor string."""
+    payload = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decode a cursor into its `size` sort key values.
+
+    Raises:
+        InvalidCursor: If the cursor is malformed or has the wrong shape.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != size:
+            raise InvalidCursor(f"Expected a cursor of {size} values")
+        return [_decode_value(v) for v in values]
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        if isinstance(e, InvalidCursor):
+            raise
+        raise InvalidCursor("Malformed cursor") from e
+
+def keyset_after(columns: Sequence[Any], values: Sequence[Any], descending: bool = True):
+    """
+    Filter selecting the rows after `values` in the (columns) order.
+
+    Uses a row-value comparison, e.g. (submitted_at, id) < (:t, :id), which
+    PostgreSQL evaluates as a single index range scan.
+    """
+    key = tuple_(*columns)
+    bound = tuple_(*values)
+    return key < bound if descending else key > bound
@@ -0,0 +1,203 @@
+"""
+Process-wide RabbitMQ publisher shared by all request handlers.
+
+pika's BlockingConnection is not thread-safe, so every pooled channel owns
+its own connection and is checked out by one thread at a time. Channels are
+opened lazily, put in confirm mode, and replaced transparently when the
+broker drops them.
+"""
+import json
+import logging
+import queue
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+import pika
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EVALUATION_QUEUE = "evaluation_queue"
+OCR_QUEUE = "ocr_queue"
+APPEAL_QUEUE = "appeal_queue"
+
+# Queues the API publishes to; declared once per process
+DECLARED_QUEUES = (EVALUATION_QUEUE, OCR_QUEUE, APPEAL_QUEUE)
+
+class PublishError(Exception):
+    """Raised when a message could not be confirmed by the broker."""
+
+class _PooledChannel:
+    """A confirm-mode channel together with the connection that owns it."""
+
+    def __init__(self, connection: pika.BlockingConnection):
+        self.connection = connection
+        self.channel = connection.channel()
+        self.channel.confirm_delivery()
+
+    @property
+    def is_open(self) -> bool:
+        return self.connection.is_open and self.channel.is_open
+
+    def close(self):
+        try:
+            if self.connection.is_open:
+                self.connection.close()
+        except Exception as e:
+            logger.debug(f"Ignoring error while closing RabbitMQ connection: {e}")
+
+class RabbitMQPublisher:
+    """
+    Pool of publisher-confirm channels with lazy (re)connection.
+
+    The pool holds `pool_size` slots. A slot is either an open channel or
+    None (not connected yet / dropped), in which case it is connected on the
+    next checkout. Queues are declared once, on the first connection.
+    """
+
+    def __init__(self, connection_params: pika.ConnectionParameters, pool_size: int = 4,
+                 acquire_timeout: float = 2.0, queues: Iterable[str] = DECLARED_QUEUES):
+        self.connection_params = connection_params
+        self.acquire_timeout = acquire_timeout
+        self.queues = tuple(queues)
+        self._pool: "queue.LifoQueue[Optional[_PooledChannel]]" = queue.LifoQueue(maxsize=pool_size)
+        for _ in range(pool_size):
+            self._pool.put(None)
+        self._declared = False
+        self._declare_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "RabbitMQPublisher":
+        """Build a publisher from the RABBITMQ_* settings."""
+        params = pika.ConnectionParameters(
+            host=settings.RABBITMQ_HOST,
+            port=settings.RABBITMQ_PORT,
+            virtual_host=settings.RABBITMQ_VHOST,
+            credentials=pika.PlainCredentials(settings.RABBITMQ_USER, settings.RABBITMQ_PASSWORD),
+            connection_attempts=1,
+            socket_timeout=settings.RABBITMQ_SOCKET_TIMEOUT,
+            blocked_connection_timeout=settings.RABBITMQ_SOCKET_TIMEOUT,
+        )
+        return cls(
+            params,
+            pool_size=settings.RABBITMQ_CHANNEL_POOL_SIZE,
+            acquire_timeout=settings.RABBITMQ_ACQUIRE_TIMEOUT,
+        )
+
+    def _connect(self) -> _PooledChannel:
+        pooled = _PooledChannel(pika.BlockingConnection(self.connection_params))
+        if not self._declared:
+            with self._declare_lock:
+                if not self._declared:
+                    for queue_name in self.queues:
+                        pooled.channel.queue_declare(queue=queue_name, durable=True)
+                    self._declared = True
+                    logger.info(f"Declared RabbitMQ queues: {', '.join(self.queues)}")
+        return pooled
+
+    def _checkout(self) -> Optional[_PooledChannel]:
+        try:
+            return self._pool.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise PublishError(f"No RabbitMQ channel available within {self.acquire_timeout}s")
+
+    def start(self):
+        """
+        Open one channel and declare the queues. Called at application startup;
+        raises if the broker is unreachable.
+        """
+        slot = self._checkout()
+        try:
+            if slot is None or not slot.is_open:
+                slot = self._connect()
+        finally:
+            self._pool.put(slot)
+
+    def publish(self, queue_name: str, message: Dict[str, Any]):
+        """
+        Publish a persistent JSON message and wait for the broker confirm.
+
+        A dropped channel is reconnected and the publish retried once.
+
+        Raises:
+            PublishError: if the message was not confirmed.
+        """
+        body = json.dumps(message)
+        properties = pika.BasicProperties(
+            content_type="application/json",
+            delivery_mode=pika.spec.PERSISTENT_DELIVERY_MODE,
+        )
+        slot = self._checkout()
+        try:
+            for attempt in range(2):
+                try:
+                    if slot is None or not slot.is_open:
+                        slot = self._connect()
+                    slot.channel.basic_publish(
+                        exchange='',
+                        routing_key=queue_name,
+                        body=body,
+                        properties=properties,
+                        mandatory=True,
+                    )
+                    return
+                except (pika.exceptions.UnroutableError, pika.exceptions.NackError) as e:
+                    # The channel is still usable; the broker refused this message
+                    raise PublishError(f"Broker did not accept message for {queue_name}: {type(e).__name__}") from e
+                except pika.exceptions.AMQPError as e:
+                    logger.warning(f"RabbitMQ channel failed on publish attempt {attempt + 1}: {type(e).__name__}: {e}")
+                    if slot is not None:
+                        slot.close()
+                    slot = None
+                    if attempt == 1:
+                        raise PublishError(f"Could not publish to {queue_name}: {type(e).__name__}: {e}") from e
+        finally:
+            self._pool.put(slot)
+
+    def get_queue_length(self, queue_name: str) -> int:
+        """Return the number of ready messages in a queue."""
+        slot = self._checkout()
+        try:
+            if slot is None or not slot.is_open:
+                slot = self._connect()
+            return slot.channel.queue_declare(queue=queue_name, passive=True).method.message_count
+        except pika.exceptions.AMQPError:
+            if slot is not None:
+                slot.close()
+            slot = None
+            raise
+        finally:
+            self._pool.put(slot)
+
+    def close(self):
+        """Close every pooled connection. The publisher reconnects if used again."""
+        slots = []
+        while True:
+            try:
+                slots.append(self._pool.get_nowait())
+            except queue.Empty:
+                break
+        for slot in slots:
+            if slot is not None:
+                slot.close()
+            self._pool.put(None)
+
+_publisher: Optional[RabbitMQPublisher] = None
+_publisher_lock = threading.Lock()
+
+def get_publisher() -> RabbitMQPublisher:
+    """Return the process-wide publisher, creating it on first use."""
+    global _publisher
+    if _publisher is None:
+        with _publisher_lock:
+            if _publisher is None:
+                _publisher = RabbitMQPublisher.from_settings()
+    return _publisher
+
+def close_publisher():
+    """Close the process-wide publisher's channels, if one was ever created."""
+    with _publisher_lock:
+        publisher = _publisher
+    if publisher is not None:
+        publisher.close()
@@ -2,7 +2,7 @@
 # from .user import get_user, get_user_by_email, get_users, create_user, update_user, delete_user 
 
 # Remove problem CRUD imports - Re-enabling create_problem for tests
-from .problem import get_problem, get_problems, create_problem #, update_problem, delete_problem
+from .problem import get_problem, get_problems, get_problem_cached, get_problems_cached, create_problem, update_problem, delete_problem
 
 # Import submission CRUD
 from .submission import create_submission, get_submission, get_submissions_for_problem
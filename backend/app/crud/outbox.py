@@ -0,0 +1,76 @@
+from sqlalchemy.orm import Session
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Tuple
+
+from app.db.models.outbox import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+def enqueue_message(db: Session, queue: str, payload: Dict[str, Any]) -> OutboxMessage:
+    """
+    Add a message to the outbox. Does NOT commit: the caller commits it
+    together with the rows the message refers to.
+    """
+    message = OutboxMessage(queue=queue, payload=payload)
+    db.add(message)
+    return message
+
+def relay_batch(db: Session, publish: Callable[[str, Dict[str, Any]], None], batch_size: int = 100, max_attempts: int = 5) -> Tuple[int, bool]:
+    """
+    Publish up to `batch_size` pending outbox messages in insertion order.
+
+    Rows are locked with SKIP LOCKED so several relays can run side by side.
+    Each confirmed message is deleted. On a publish failure the batch stops
+    (the broker is most likely down) and the failed row keeps its place,
+    unless the row has already failed `max_attempts` times: then it is
+    skipped, and dead-lettered if a later message of the batch is confirmed,
+    since the broker is evidently up and only refuses this one.
+
+    Args:
+        db: Database session
+        publish: Callable(queue, payload) that raises if the broker did not confirm
+        batch_size: Maximum number of messages to publish
+        max_attempts: Failed attempts after which a message stops blocking the outbox
+
+    Returns:
+        (number of messages published, whether a publish failed)
+    """
+    published = 0
+    failed = False
+    skipped = []
+    try:
+        messages = (
+            db.query(OutboxMessage)
+            .filter(OutboxMessage.dead_lettered_at.is_(None))
+            .order_by(OutboxMessage.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        for message in messages:
+            try:
+                publish(message.queue, message.payload)
+            except Exception as e:
+                message.attempts += 1
+                message.last_error = f"{type(e).__name__}: {e}"
+                logger.warning(f"Outbox relay failed to publish message {message.id} to {message.queue}: {message.last_error}")
+                failed = True
+                if message.attempts < max_attempts:
+                    break
+                skipped.append(message)
+                continue
+            db.delete(message)
+            published += 1
+            for dead in skipped:
+                dead.dead_lettered_at = datetime.utcnow()
+                logger.error(f"Outbox message {dead.id} to {dead.queue} dead-lettered after {dead.attempts} attempts: {dead.last_error}")
+            skipped.clear()
+        db.commit()
+        if published:
+            logger.info(f"Outbox relay published {published} message(s)")
+        return published, failed
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Outbox relay batch failed: {str(e)}", exc_info=True)
+        raise
@@ -1,16 +1,195 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+"""
+Problem CRUD and the in-process problem catalog cache.
 
+Problems are read on every judgement and every problem view but rarely
+change, so reads go through `get_problem_cached` / `get_problems_cached`,
+which serve immutable `ProblemSnapshot`s from a per-process cache.
+
+Every write to a problem, whichever code path makes it (this module, the
+legacy repository, seed scripts), bumps the shared "problems" row of
+`catalog_versions` inside the writing transaction: ORM flushes and bulk
+UPDATE/DELETE statements on Problem are picked up by the session listeners
+below, registered on `SessionLocal` (other session factories opt in with
+`register_catalog_listeners`). The writing process drops its cache when the transaction ends; other
+API and worker processes notice the new version within
+PROBLEM_CACHE_VERSION_CHECK_SECONDS.
+"""
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import chain
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, event, func, insert, literal, select, type_coerce, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.cache import VersionedCache
+from app.core.config import settings
+from app.db.models.catalog import CatalogVersion
+from app.db.session import SessionLocal
 from app.db.models.problem import Problem
-from app.schemas.problem import ProblemCreate
+from app.schemas.problem import ProblemCreate, ProblemUpdate
+
+PROBLEM_CATALOG = "problems"
+
+# Session.info flag: this transaction has already bumped the catalog version
+_CATALOG_CHANGED_KEY = "problem_catalog_changed"
+
+@dataclass(frozen=True)
+class ProblemSnapshot:
+    """Immutable copy of a Problem row, safe to share across sessions and threads."""
+    id: int
+    title: str
+    statement: str
+    difficulty: float
+    topics: Optional[Tuple[str, ...]]
+    is_published: bool
+    created_at: datetime
+
+    @classmethod
+    def from_model(cls, problem: Problem) -> "ProblemSnapshot":
+        return cls(
+            id=problem.id,
+            title=problem.title,
+            statement=problem.statement,
+            difficulty=problem.difficulty,
+            topics=tuple(problem.topics) if problem.topics is not None else None,
+            is_published=problem.is_published,
+            created_at=problem.created_at,
+        )
+
+def read_catalog_version(db: Session, name: str = PROBLEM_CATALOG) -> int:
+    """Current version of a catalog (0 if it was never bumped)."""
+    version = db.execute(select(CatalogVersion.version).where(CatalogVersion.name == name)).scalar()
+    return version or 0
+
+def bump_catalog_version(db: Session, name: str = PROBLEM_CATALOG):
+    """
+    Increment a catalog version in the current transaction of `db`.
+
+    Runs on the session's connection without flushing, so it is safe to call
+    from flush events. Does not commit.
+    """
+    connection = db.connection()
+    result = connection.execute(
+        update(CatalogVersion).where(CatalogVersion.name == name).values(version=CatalogVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        # The migration seeds the row; only fresh create_all databases get here
+        connection.execute(insert(CatalogVersion).values(name=name, version=1))
+
+_problem_cache: Optional[VersionedCache] = None
+_problem_cache_lock = threading.Lock()
+
+def get_problem_cache() -> VersionedCache:
+    """Return the process-wide problem catalog cache, creating it on first use."""
+    global _problem_cache
+    if _problem_cache is None:
+        with _problem_cache_lock:
+            if _problem_cache is None:
+                _problem_cache = VersionedCache(
+                    read_catalog_version,
+                    max_entries=settings.PROBLEM_CACHE_MAX_ENTRIES,
+                    check_interval=settings.PROBLEM_CACHE_VERSION_CHECK_SECONDS,
+                )
+    return _problem_cache
+
+def _catalog_changed(session: Session):
+    if not session.info.get(_CATALOG_CHANGED_KEY):
+        bump_catalog_version(session)
+        session.info[_CATALOG_CHANGED_KEY] = True
+    # Also drop entries loaded from this transaction's uncommitted state
+    get_problem_cache().invalidate()
+
+def _track_problem_flush(session: Session, flush_context):
+    for obj in chain(session.new, session.deleted, session.dirty):
+        if not isinstance(obj, Problem):
+            continue
+        if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+            continue
+        _catalog_changed(session)
+        return
+
+def _track_problem_bulk_writes(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    if any(mapper.class_ is Problem for mapper in orm_execute_state.all_mappers):
+        _catalog_changed(orm_execute_state.session)
+
+def _invalidate_after_catalog_change(session: Session, transaction):
+    # Committed or rolled back, what this process cached is now stale
+    if transaction.parent is None and session.info.pop(_CATALOG_CHANGED_KEY, False):
+        get_problem_cache().invalidate()
+
+_CATALOG_LISTENERS = (
+    ("after_flush", _track_problem_flush),
+    ("do_orm_execute", _track_problem_bulk_writes),
+    ("after_transaction_end", _invalidate_after_catalog_change),
+)
+
+def register_catalog_listeners(session_factory: sessionmaker):
+    """Track problem writes made through sessions of `session_factory`. Idempotent."""
+    for name, listener in _CATALOG_LISTENERS:
+        if not event.contains(session_factory, name, listener):
+            event.listen(session_factory, name, listener)
+
+register_catalog_listeners(SessionLocal)
+
+def topics_filter(db: Session, topics: List[str]):
+    """
+    Filter expression matching problems tagged with all of `topics`.
+
+    On PostgreSQL this is a single JSONB containment test (topics @> [...]),
+    which the GIN index on problems.topics serves. Other databases (tests)
+    check each topic with json_each.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return type_coerce(Problem.topics, JSONB).contains(list(topics))
+    conditions = []
+    for topic in topics:
+        each = func.json_each(Problem.topics).table_valued("value")
+        conditions.append(select(literal(1)).select_from(each).where(each.c.value == topic).exists())
+    return and_(*conditions)
 
 def get_problem(db: Session, problem_id: int) -> Optional[Problem]:
     """Get a single problem by ID."""
     return db.query(Problem).filter(Problem.id == problem_id).first()
 
-def get_problems(db: Session, skip: int = 0, limit: int = 100) -> List[Problem]:
-    """Get a list of problems."""
-    return db.query(Problem).offset(skip).limit(limit).all()
+def get_problems(db: Session, skip: int = 0, limit: int = 100, topics: Optional[List[str]] = None, after_id: Optional[int] = None) -> List[Problem]:
+    """
+    Get a list of problems in ID order, optionally only those tagged with all of `topics`.
+
+    Pass `after_id` (the last ID of the previous page) for keyset
+    pagination; `skip` is ignored then.
+    """
+    query = db.query(Problem).order_by(Problem.id)
+    if topics:
+        query = query.filter(topics_filter(db, topics))
+    if after_id is not None:
+        query = query.filter(Problem.id > after_id)
+    else:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+def get_catalog_version_cached(db: Session) -> int:
+    """The catalog version behind get_problem_cached, without a round-trip on most calls."""
+    return get_problem_cache().current_version(db)
+
+def get_problem_cached(db: Session, problem_id: int) -> Optional[ProblemSnapshot]:
+    """get_problem through the catalog cache, as an immutable snapshot."""
+    def load():
+        problem = get_problem(db, problem_id)
+        return ProblemSnapshot.from_model(problem) if problem is not None else None
+    return get_problem_cache().get_or_load(db, ("problem", problem_id), load)
+
+def get_problems_cached(db: Session, skip: int = 0, limit: int = 100, topics: Optional[List[str]] = None, after_id: Optional[int] = None) -> List[ProblemSnapshot]:
+    """get_problems through the catalog cache, as immutable snapshots."""
+    key = ("problems", skip if after_id is None else None, limit, tuple(topics or ()), after_id)
+    def load():
+        problems = get_problems(db, skip=skip, limit=limit, topics=topics, after_id=after_id)
+        return tuple(ProblemSnapshot.from_model(problem) for problem in problems)
+    return list(get_problem_cache().get_or_load(db, key, load))
 
 def create_problem(db: Session, *, problem_in: ProblemCreate) -> Problem:
     """Create a new problem."""
@@ -20,4 +199,22 @@ def create_problem(db: Session, *, problem_in: ProblemCreate) -> Problem:
     db.refresh(db_problem)
     return db_problem
 
-# Add update_problem and delete_problem later if needed 
\ No newline at end of file
+def update_problem(db: Session, *, problem_id: int, problem_in: ProblemUpdate) -> Optional[Problem]:
+    """Update the fields set on `problem_in`. Returns None if the problem does not exist."""
+    db_problem = get_problem(db, problem_id)
+    if db_problem is None:
+        return None
+    for field, value in problem_in.model_dump(exclude_unset=True).items():
+        setattr(db_problem, field, value)
+    db.commit()
+    db.refresh(db_problem)
+    return db_problem
+
+def delete_problem(db: Session, *, problem_id: int) -> bool:
+    """Delete a problem and its submissions. Returns False if it does not exist."""
+    db_problem = get_problem(db, problem_id)
+    if db_problem is None:
+        return False
+    db.delete(db_problem)
+    db.commit()
+    return True
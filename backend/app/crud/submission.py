@@ -1,27 +1,45 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.orm import Session, selectinload
 import logging
-from typing import Optional, List, Dict, Any
-import copy
-from sqlalchemy.orm.attributes import flag_modified
+from typing import Optional, List, Dict, Any, Sequence, Tuple
+from datetime import datetime
 
 from app.db.models.submission import Submission, SubmissionStatus
+from app.db.models.submission_error import SubmissionError
 from app.schemas.submission import SubmissionCreate, ErrorAppeal, ErrorDetail
 from app.evaluation.interfaces import EvaluationResult # Use TypedDict for result structure
+from app.crud.outbox import enqueue_message
+from app.core.rabbitmq import APPEAL_QUEUE, EVALUATION_QUEUE, OCR_QUEUE
+from app.core import events # noqa: registers the status change listeners
+from app.core.pagination import keyset_after
 
 logger = logging.getLogger(__name__)
 
-def create_submission(db: Session, *, submission_in: SubmissionCreate) -> Submission:
-    """Create a new submission record."""
+def create_submission(db: Session, *, submission_in: SubmissionCreate, image_data: Optional[bytes] = None) -> Submission:
+    """
+    Create a new submission record and its outbox message in one transaction.
+    The outbox relay dispatches it to the judge worker.
+
+    When `image_data` is given the submission starts in 'ocr_pending' with the
+    image stored on the row, and the message goes to the OCR worker instead;
+    it forwards the submission to evaluation once the LaTeX is extracted.
+    """
     try:
         db_submission = Submission(
             problem_id=submission_in.problem_id,
             solution_text=submission_in.solution_text,
-            status=SubmissionStatus.pending # Always start as pending
+            status=SubmissionStatus.ocr_pending if image_data is not None else SubmissionStatus.pending,
+            image_data=image_data,
         )
         db.add(db_submission)
+        db.flush() # Assign the ID for the outbox payload
+        enqueue_message(db, OCR_QUEUE if image_data is not None else EVALUATION_QUEUE, {
+            "submission_id": db_submission.id,
+            "problem_id": db_submission.problem_id,
+        })
         db.commit()
         db.refresh(db_submission)
-        logger.info(f"Created submission ID: {db_submission.id} for problem: {submission_in.problem_id}")
+        logger.info(f"Created submission ID: {db_submission.id} for problem: {submission_in.problem_id} (status: {db_submission.status})")
         return db_submission
     except Exception as e:
         db.rollback()
@@ -41,74 +59,308 @@ def get_submission(db: Session, submission_id: int) -> Optional[Submission]:
         logger.error(f"Error retrieving submission {submission_id}: {str(e)}", exc_info=True)
         raise
 
-def get_submissions(db: Session, skip: int = 0, limit: int = 20) -> List[Submission]:
-    """Get all submissions with pagination."""
+# Columns a submission list can be narrowed to with get_submission_fields
+SUBMISSION_LIST_FIELDS = ("id", "problem_id", "solution_text", "submitted_at", "status", "score", "feedback", "appeal_attempts")
+# What list pages display; excludes the potentially large solution_text
+SUBMISSION_SUMMARY_FIELDS = ("id", "problem_id", "status", "score", "submitted_at", "appeal_attempts")
+
+def _paginate(query, skip: int, limit: int, after: Optional[Tuple[datetime, int]]):
+    """Newest first; `after` is the (submitted_at, id) of the previous page's last row."""
+    query = query.order_by(Submission.submitted_at.desc(), Submission.id.desc())
+    if after is not None:
+        query = query.filter(keyset_after((Submission.submitted_at, Submission.id), after))
+    else:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+def get_submissions(db: Session, skip: int = 0, limit: int = 20, after: Optional[Tuple[datetime, int]] = None) -> List[Submission]:
+    """
+    Get all submissions with pagination, newest first.
+
+    Pass `after` (the submitted_at and id of the last submission of the
+    previous page) for keyset pagination; `skip` is ignored then.
+    """
     try:
-        submissions = db.query(Submission).order_by(Submission.submitted_at.desc()).offset(skip).limit(limit).all()
-        logger.debug(f"Retrieved {len(submissions)} submissions (skip={skip}, limit={limit})")
+        query = db.query(Submission).options(selectinload(Submission.error_rows))
+        submissions = _paginate(query, skip, limit, after)
+        logger.debug(f"Retrieved {len(submissions)} submissions (skip={skip}, limit={limit}, after={after})")
         return submissions
     except Exception as e:
         logger.error(f"Error retrieving submissions: {str(e)}", exc_info=True)
         raise
 
-def get_submissions_for_problem(db: Session, problem_id: int, skip: int = 0, limit: int = 100) -> List[Submission]:
-    """Get submissions for a specific problem."""
+def get_submissions_for_problem(db: Session, problem_id: int, skip: int = 0, limit: int = 100, after: Optional[Tuple[datetime, int]] = None) -> List[Submission]:
+    """Get submissions for a specific problem, newest first (see get_submissions for `after`)."""
     try:
-        submissions = db.query(Submission).filter(Submission.problem_id == problem_id).order_by(Submission.submitted_at.desc()).offset(skip).limit(limit).all()
+        query = (
+            db.query(Submission)
+            .options(selectinload(Submission.error_rows))
+            .filter(Submission.problem_id == problem_id)
+        )
+        submissions = _paginate(query, skip, limit, after)
         logger.debug(f"Retrieved {len(submissions)} submissions for problem {problem_id}")
         return submissions
     except Exception as e:
         logger.error(f"Error retrieving submissions for problem {problem_id}: {str(e)}", exc_info=True)
         raise
 
-def update_submission_status(db: Session, submission_id: int, status: SubmissionStatus) -> Optional[Submission]:
-    """Update the status of a submission."""
+def get_submission_fields(
+    db: Session,
+    fields: Sequence[str] = SUBMISSION_SUMMARY_FIELDS,
+    problem_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 20,
+    after: Optional[Tuple[datetime, int]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    List submissions like get_submissions, selecting only the given columns.
+
+    No ORM objects or error rows are loaded. Returns one dict per
+    submission with the requested `fields` (from SUBMISSION_LIST_FIELDS),
+    plus id and submitted_at, the pagination key.
+    """
+    unknown = set(fields) - set(SUBMISSION_LIST_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown submission fields: {sorted(unknown)}")
+    try:
+        # id and submitted_at are the keyset; callers need them for the next cursor
+        selected = list(dict.fromkeys(["id", "submitted_at", *fields]))
+        query = db.query(*(getattr(Submission, name) for name in selected))
+        if problem_id is not None:
+            query = query.filter(Submission.problem_id == problem_id)
+        rows = _paginate(query, skip, limit, after)
+        logger.debug(f"Retrieved {len(rows)} submission rows with fields {selected}")
+        return [row._asdict() for row in rows]
+    except Exception as e:
+        logger.error(f"Error retrieving submission fields {list(fields)}: {str(e)}", exc_info=True)
+        raise
+
+def get_submission_image(db: Session, submission_id: int) -> Optional[bytes]:
+    """Get the stored image of a submission that is still waiting for OCR."""
+    try:
+        return (
+            db.query(Submission.image_data)
+            .filter(Submission.id == submission_id, Submission.status == SubmissionStatus.ocr_pending)
+            .scalar()
+        )
+    except Exception as e:
+        logger.error(f"Error retrieving image for submission {submission_id}: {str(e)}", exc_info=True)
+        raise
+
+def complete_ocr(db: Session, submission_id: int, solution_text: str) -> Optional[Submission]:
+    """
+    Store the extracted LaTeX, drop the image and hand the submission to
+    evaluation: status becomes 'pending' and its evaluation_queue outbox
+    message is written in the same transaction.
+
+    Returns None if the submission is missing or no longer 'ocr_pending'
+    (e.g. a redelivered message for a submission already converted).
+    """
     try:
-        submission = get_submission(db, submission_id)
+        submission = (
+            db.query(Submission)
+            .filter(Submission.id == submission_id, Submission.status == SubmissionStatus.ocr_pending)
+            .with_for_update()
+            .first()
+        )
         if not submission:
-            logger.warning(f"Cannot update status: Submission {submission_id} not found")
+            logger.warning(f"Cannot complete OCR: Submission {submission_id} not found or not awaiting OCR")
             return None
-        
-        previous_status = submission.status
-        # Avoid accidentally changing away from a final state if logic elsewhere dictates it
-        if submission.status != status:
-            submission.status = status
-            db.add(submission)
+
+        submission.solution_text = solution_text
+        submission.image_data = None
+        submission.status = SubmissionStatus.pending
+        enqueue_message(db, EVALUATION_QUEUE, {
+            "submission_id": submission.id,
+            "problem_id": submission.problem_id,
+        })
+        db.commit()
+        db.refresh(submission)
+        logger.info(f"OCR complete for submission {submission_id}; queued for evaluation")
+        return submission
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to complete OCR for submission {submission_id}: {str(e)}", exc_info=True)
+        raise
+
+def fail_ocr(db: Session, submission_id: int) -> Optional[Submission]:
+    """Mark a submission whose image could not be converted as evaluation_error."""
+    try:
+        submission = (
+            db.query(Submission)
+            .filter(Submission.id == submission_id, Submission.status == SubmissionStatus.ocr_pending)
+            .first()
+        )
+        if not submission:
+            return None
+        submission.image_data = None
+        submission.status = SubmissionStatus.evaluation_error
+        db.commit()
+        db.refresh(submission)
+        logger.info(f"OCR failed for submission {submission_id}; marked as evaluation_error")
+        return submission
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to record OCR failure for submission {submission_id}: {str(e)}", exc_info=True)
+        raise
+
+def claim_stale_submissions(db: Session, pending_before: datetime, processing_before: Optional[datetime] = None, limit: int = 10) -> List[int]:
+    """
+    Claim submissions the judge worker's sweeper should (re)judge:
+
+    * stuck in 'pending' since before `pending_before`: their queue message
+      has not arrived (broker or relay outage);
+    * with `processing_before`, first evaluations claimed before it and still
+      'processing': their worker crashed or gave up on them after the
+      processing timeout.
+
+    Claimed submissions are set to 'processing' with a fresh claimed_at.
+    Appeal rounds are left alone, since the appeals live only in their queue
+    message: the broker redelivers it if the worker dies, and a worker that
+    times out on it hands the round back with release_timed_out_appeal.
+
+    Rows are locked with SKIP LOCKED so concurrent sweepers never claim the
+    same submission.
+
+    Returns:
+        IDs of the claimed submissions, oldest first.
+    """
+    try:
+        stale = and_(Submission.status == SubmissionStatus.pending, Submission.submitted_at < pending_before)
+        if processing_before is not None:
+            stale = or_(stale, and_(
+                Submission.status == SubmissionStatus.processing,
+                Submission.appeal_attempts == 0,
+                # Rows claimed before claimed_at existed count from submission
+                func.coalesce(Submission.claimed_at, Submission.submitted_at) < processing_before,
+            ))
+        submissions = (
+            db.query(Submission)
+            .filter(stale)
+            .order_by(Submission.submitted_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        claimed_at = datetime.utcnow()
+        for submission in submissions:
+            submission.status = SubmissionStatus.processing
+            submission.claimed_at = claimed_at
+        db.commit()
+        claimed = [submission.id for submission in submissions]
+        if claimed:
+            logger.info(f"Claimed {len(claimed)} stale submission(s): {claimed}")
+        return claimed
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to claim stale submissions: {str(e)}", exc_info=True)
+        raise
+
+def _compare_and_set(db: Session, submission_id: int, values: Dict[str, Any], *conditions) -> Optional[Submission]:
+    """
+    Apply `values` to a submission in a single UPDATE ... RETURNING, provided
+    `conditions` (e.g. an expected status) still hold for the row.
+
+    Returns the updated submission, or None if the row is missing or the
+    conditions no longer hold. Does not commit. Core UPDATEs bypass the flush,
+    so status changes are announced here.
+    """
+    stmt = (
+        update(Submission)
+        .where(Submission.id == submission_id, *conditions)
+        .values(**values)
+        .returning(Submission)
+        .execution_options(populate_existing=True)
+    )
+    submission = db.scalars(stmt).first()
+    if submission is not None and "status" in values:
+        events.announce_status_change(db, submission.id, submission.status)
+    return submission
+
+def update_submission_status(db: Session, submission_id: int, status: SubmissionStatus, expected_status: Optional[SubmissionStatus] = None) -> Optional[Submission]:
+    """
+    Update the status of a submission.
+
+    With `expected_status` the update only happens if the submission is
+    still in that status (compare-and-set); otherwise None is returned.
+    """
+    try:
+        conditions = [Submission.status != status]
+        if expected_status is not None:
+            conditions.append(Submission.status == expected_status)
+        submission = _compare_and_set(db, submission_id, {"status": status}, *conditions)
+        if submission:
             db.commit()
-            db.refresh(submission)
-            logger.info(f"Updated submission {submission_id} status from {previous_status} to {status}")
-        else:
+            logger.info(f"Updated submission {submission_id} status to {status}")
+            return submission
+
+        # Nothing matched: tell "already there" apart from "missing" or "moved on"
+        submission = db.get(Submission, submission_id, populate_existing=True)
+        if not submission:
+            logger.warning(f"Cannot update status: Submission {submission_id} not found")
+            return None
+        if expected_status is None and submission.status == status:
             logger.debug(f"Submission {submission_id} status already {status}, no update performed.")
-        return submission
+            return submission
+        logger.warning(f"Cannot update status of submission {submission_id} to {status}: expected {expected_status}, found {submission.status}")
+        return None
     except Exception as e:
         db.rollback()
         logger.error(f"Failed to update status for submission {submission_id}: {str(e)}", exc_info=True)
         raise
 
-def update_submission_after_initial_evaluation(db: Session, submission_id: int, errors: List[ErrorDetail], score: Optional[int] = None) -> Optional[Submission]:
-    """Update submission after the initial find_errors call from the worker."""
+def claim_submission(db: Session, submission_id: int, reclaim: bool = False) -> Optional[Submission]:
+    """
+    Move a submission from 'pending' to 'processing' for judging.
+
+    The transition is a compare-and-set, so of several workers handed the
+    same submission only one gets it; the others get None. With `reclaim`
+    a submission already 'processing' is taken over as well: the sweeper
+    has claimed it, or a redelivered message's previous worker died.
+    """
     try:
-        submission = get_submission(db, submission_id)
+        expected = [SubmissionStatus.pending]
+        if reclaim:
+            expected.append(SubmissionStatus.processing)
+        submission = _compare_and_set(
+            db, submission_id, {"status": SubmissionStatus.processing, "claimed_at": datetime.utcnow()},
+            Submission.status.in_(expected),
+        )
         if not submission:
-            logger.warning(f"Cannot update initial evaluation: Submission {submission_id} not found")
+            logger.info(f"Submission {submission_id} not claimed: missing or no longer pending")
             return None
+        db.commit()
+        logger.info(f"Claimed submission {submission_id} for processing")
+        return submission
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to claim submission {submission_id}: {str(e)}", exc_info=True)
+        raise
+
+def update_submission_after_initial_evaluation(db: Session, submission_id: int, errors: List[ErrorDetail], score: Optional[int] = None, expected_status: Optional[SubmissionStatus] = None) -> Optional[Submission]:
+    """
+    Update submission after the initial find_errors call from the worker.
 
-        submission.errors = errors # Update errors list
-        
+    With `expected_status` (the worker passes 'processing') the result is
+    only stored if the submission is still in that status.
+    """
+    try:
         # Determine status based on errors
         # Logic might need refinement based on how 'severity' is defined/used
         has_significant_errors = any(e.get('severity', False) for e in errors) # Example check
 
         if has_significant_errors:
-            submission.status = SubmissionStatus.appealing
-            submission.score = score if score is not None else 0 # Default score for appealable state
+            values = {"status": SubmissionStatus.appealing, "score": score if score is not None else 0} # Default score for appealable state
         else:
-            submission.status = SubmissionStatus.completed
-            submission.score = score if score is not None else 100 # Default score for completed state
+            values = {"status": SubmissionStatus.completed, "score": score if score is not None else 100} # Default score for completed state
 
-        db.add(submission)
+        conditions = [Submission.status == expected_status] if expected_status is not None else []
+        submission = _compare_and_set(db, submission_id, values, *conditions)
+        if not submission:
+            logger.warning(f"Cannot update initial evaluation: Submission {submission_id} not found or no longer {expected_status}")
+            return None
+        submission.errors = errors
         db.commit()
-        db.refresh(submission)
         logger.info(f"Updated submission {submission_id} after initial eval: status={submission.status}, score={submission.score}, errors={len(errors)}")
         return submission
     except Exception as e:
@@ -121,97 +373,179 @@ def update_submission_after_initial_evaluation(db: Session, submission_id: int,
             logger.error(f"Failed even to set evaluation_error status for {submission_id}: {inner_e}")
         raise e # Re-raise original exception
 
-def update_submission_after_appeal(db: Session, submission_id: int, evaluation_result: EvaluationResult, updated_errors: List[ErrorDetail]) -> Optional[Submission]:
-    """Update a submission after appeal processing and re-evaluation. Does NOT set final status."""
+# Error statuses that can still be appealed
+APPEALABLE_ERROR_STATUSES = ("active", "rejected")
+
+def status_after_appeal(errors: List[ErrorDetail], appeal_attempts: int, max_attempts: int) -> SubmissionStatus:
+    """
+    Status of a submission once an appeal batch is decided: 'completed' when
+    the attempts are used up or no error can be appealed any more (active or
+    rejected), otherwise back to 'appealing'.
+    """
+    has_appealable_errors = any(
+        e.get('status') in APPEALABLE_ERROR_STATUSES for e in (errors or []) if isinstance(e, dict)
+    )
+    if appeal_attempts >= max_attempts or not has_appealable_errors:
+        return SubmissionStatus.completed
+    return SubmissionStatus.appealing
+
+def queue_appeal(db: Session, submission_id: int, appeals: List[ErrorAppeal], max_attempts: int) -> Optional[Submission]:
+    """
+    Accept an appeal batch for asynchronous judging.
+
+    In one transaction: the submission moves from 'appealing' to
+    'processing' and its appeal_attempts is incremented (only while below
+    `max_attempts`), the appealed errors that are still active or rejected
+    become 'appealing', and an appeal_queue outbox message carrying the
+    appeals and those errors' previous statuses is written. The judge worker decides the batch and stores the
+    result with update_submission_after_appeal.
+
+    Returns None if the submission is missing, not 'appealing' or at the limit.
+    """
     try:
-        submission = get_submission(db, submission_id)
+        submission = _compare_and_set(
+            db, submission_id,
+            {"status": SubmissionStatus.processing, "appeal_attempts": Submission.appeal_attempts + 1, "claimed_at": datetime.utcnow()},
+            Submission.status == SubmissionStatus.appealing,
+            Submission.appeal_attempts < max_attempts,
+        )
         if not submission:
-            logger.warning(f"Cannot update after appeal: Submission {submission_id} not found")
+            logger.warning(f"Cannot queue appeal: Submission {submission_id} not found, not appealing or at the limit of {max_attempts}")
             return None
-        
-        # Update fields from the final evaluation result
-        submission.score = evaluation_result.get("score")
-        submission.feedback = evaluation_result.get("feedback")
-        submission.errors = updated_errors # Store the list with updated statuses
-        # submission.status = SubmissionStatus.completed # DO NOT set status here, endpoint logic will decide
-        
-        # Explicitly mark the 'errors' field as modified for SQLAlchemy
-        flag_modified(submission, "errors")
-        
-        db.add(submission)
+        appealed_ids = {appeal.error_id for appeal in appeals}
+        # Statuses the stored score was computed from, for incremental re-evaluation
+        error_statuses = {}
+        for row in submission.error_rows:
+            if row.error_id in appealed_ids and row.status in APPEALABLE_ERROR_STATUSES:
+                error_statuses[row.error_id] = row.status
+                row.status = "appealing"
+        enqueue_message(db, APPEAL_QUEUE, {
+            "submission_id": submission.id,
+            # Identifies this appeal round, so a redelivered message is not judged twice
+            "appeal_attempt": submission.appeal_attempts,
+            "appeals": [appeal.model_dump() for appeal in appeals],
+            "error_statuses": error_statuses,
+        })
         db.commit()
-        db.refresh(submission)
-        
-        logger.info(f"Updated submission {submission_id} after appeal/re-eval: score={submission.score}")
+        logger.info(f"Queued appeal {submission.appeal_attempts} of submission {submission_id} with {len(appeals)} item(s)")
         return submission
     except Exception as e:
         db.rollback()
-        logger.error(f"Failed to update submission {submission_id} after appeal: {str(e)}", exc_info=True)
+        logger.error(f"Failed to queue appeal for submission {submission_id}: {str(e)}", exc_info=True)
         raise
 
-def increment_appeal_attempts(db: Session, submission_id: int) -> Optional[Submission]:
-    """Increment the appeal attempt counter for a submission."""
+def update_submission_after_appeal(
+    db: Session,
+    submission_id: int,
+    evaluation_result: EvaluationResult,
+    updated_errors: List[ErrorDetail],
+    status: Optional[SubmissionStatus] = None,
+    expected_status: Optional[SubmissionStatus] = None,
+    expected_attempts: Optional[int] = None,
+) -> Optional[Submission]:
+    """
+    Update a submission after appeal processing and re-evaluation.
+
+    The final `status` is set in the same statement when given. With
+    `expected_status` / `expected_attempts` (the judge worker passes
+    'processing' and the appeal round from its message) the result is only
+    stored if the submission is still in that state.
+    """
     try:
-        submission = get_submission(db, submission_id)
+        values = {
+            "score": evaluation_result.get("score"),
+            "feedback": evaluation_result.get("feedback"),
+        }
+        if status is not None:
+            values["status"] = status
+        conditions = []
+        if expected_status is not None:
+            conditions.append(Submission.status == expected_status)
+        if expected_attempts is not None:
+            conditions.append(Submission.appeal_attempts == expected_attempts)
+        submission = _compare_and_set(db, submission_id, values, *conditions)
         if not submission:
-            logger.warning(f"Cannot increment appeal attempts: Submission {submission_id} not found")
+            logger.warning(f"Cannot update after appeal: Submission {submission_id} not found or no longer awaiting this appeal")
             return None
-            
-        submission.appeal_attempts += 1
-        db.add(submission)
+        # Only the error rows whose fields changed are written
+        submission.errors = updated_errors
         db.commit()
-        db.refresh(submission)
-        logger.info(f"Incremented appeal attempts for submission {submission_id} to {submission.appeal_attempts}")
+        logger.info(f"Updated submission {submission_id} after appeal/re-eval: score={submission.score}, status={submission.status}")
         return submission
     except Exception as e:
         db.rollback()
-        logger.error(f"Failed to increment appeal attempts for {submission_id}: {str(e)}", exc_info=True)
+        logger.error(f"Failed to update submission {submission_id} after appeal: {str(e)}", exc_info=True)
         raise
 
-def update_errors_batch(db: Session, submission_id: int, errors_with_new_status: List[ErrorDetail]) -> Optional[Submission]:
-    """ Efficiently update the status of multiple errors within a submission's error list."""
+def release_timed_out_appeal(db: Session, submission_id: int, appeal_attempt: int, error_statuses: Dict[str, str], max_attempts: int) -> Optional[Submission]:
+    """
+    Give up on an appeal round the judge worker could not decide in time.
+
+    If the submission is still awaiting round `appeal_attempt`, the appealed
+    errors get back the statuses they had when the appeal was queued
+    (`error_statuses` from the appeal message, 'active' if unknown) and the
+    submission leaves 'processing' for the status status_after_appeal
+    gives. The round stays counted, so a verdict for it that arrives late
+    is no longer stored. Returns None if the round is no longer awaited.
+    """
     try:
-        submission = get_submission(db, submission_id)
-        if not submission or not submission.errors:
-            logger.warning(f"Cannot update errors batch: Submission {submission_id} not found or has no errors")
+        awaited = (Submission.status == SubmissionStatus.processing, Submission.appeal_attempts == appeal_attempt)
+        submission = db.query(Submission).filter(Submission.id == submission_id, *awaited).first()
+        if not submission:
+            db.commit()
+            logger.info(f"Appeal {appeal_attempt} of submission {submission_id} is no longer awaited; nothing to release")
             return None
-            
-        # Create a map for quick lookup
-        errors_to_update = {e['id']: e for e in errors_with_new_status}
-        
-        # Make a deep copy to ensure SQLAlchemy detects the change
-        current_errors = copy.deepcopy(submission.errors)
-        updated_list = []
-        updated_count = 0
-        
-        for error in current_errors:
-            error_id = error.get('id')
-            if error_id in errors_to_update:
-                # Only update the status field from the input
-                new_status = errors_to_update[error_id].get('status')
-                if new_status:
-                    error['status'] = new_status
-                    updated_count += 1
-            updated_list.append(error)
-            
-        if updated_count > 0:
-            submission.errors = updated_list
-            db.add(submission)
+        errors = submission.errors
+        for error in errors:
+            if error.get("status") == "appealing":
+                error["status"] = error_statuses.get(error.get("id"), "active")
+        status = status_after_appeal(errors, appeal_attempt, max_attempts)
+        submission = _compare_and_set(db, submission_id, {"status": status}, *awaited)
+        if not submission:
             db.commit()
-            db.refresh(submission)
-            logger.info(f"Batch updated {updated_count} error statuses for submission {submission_id}")
-        else:
-            logger.info(f"No matching errors found for batch update in submission {submission_id}")
-            
+            return None
+        submission.errors = errors
+        db.commit()
+        logger.warning(f"Released timed-out appeal {appeal_attempt} of submission {submission_id}; status is now {submission.status}")
         return submission
     except Exception as e:
         db.rollback()
-        logger.error(f"Failed to batch update errors for {submission_id}: {str(e)}", exc_info=True)
+        logger.error(f"Failed to release appeal {appeal_attempt} of submission {submission_id}: {str(e)}", exc_info=True)
+        raise
+
+def get_errors_for_problem(
+    db: Session,
+    problem_id: int,
+    status: Optional[str] = None,
+    error_type: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> List[SubmissionError]:
+    """
+    Get errors across all submissions of a problem, optionally filtered by
+    error status and type (e.g. all rejected logical errors), without
+    loading the submissions themselves.
+    """
+    try:
+        query = (
+            db.query(SubmissionError)
+            .join(Submission, Submission.id == SubmissionError.submission_id)
+            .filter(Submission.problem_id == problem_id)
+        )
+        if status is not None:
+            query = query.filter(SubmissionError.status == status)
+        if error_type is not None:
+            query = query.filter(SubmissionError.type == error_type)
+        errors = query.order_by(SubmissionError.submission_id, SubmissionError.position).offset(skip).limit(limit).all()
+        logger.debug(f"Retrieved {len(errors)} errors for problem {problem_id} (status={status}, type={error_type})")
+        return errors
+    except Exception as e:
+        logger.error(f"Error retrieving errors for problem {problem_id}: {str(e)}", exc_info=True)
         raise
 
 # Note: The old `update_error` and `process_appeal` might be deprecated or removed
 # as the new flow handles updates differently (via evaluator modifying list
-# or using `update_errors_batch`). Leaving them for now. 
+# or queue_appeal). Leaving them for now. 
 
 # Placeholder for legacy update_error (may become redundant)
 # def update_error(...) 
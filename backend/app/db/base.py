@@ -5,5 +5,9 @@ from app.db.base_class import Base
 # Import all models so that they are registered with SQLAlchemy
 from app.db.models.problem import Problem
 from app.db.models.submission import Submission
+from app.db.models.submission_error import SubmissionError
+from app.db.models.outbox import OutboxMessage
+from app.db.models.cache import CacheEntry
+from app.db.models.catalog import CatalogVersion
 
 # Additional models can be imported here 
\ No newline at end of file
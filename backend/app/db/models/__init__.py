@@ -2,4 +2,8 @@
 from app.db.base_class import Base # noqa
 from .problem import Problem # noqa
 from .submission import Submission # noqa
+from .submission_error import SubmissionError # noqa
+from .outbox import OutboxMessage # noqa
+from .cache import CacheEntry # noqa
+from .catalog import CatalogVersion # noqa
 # Import other models here as they're created
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, Text, DateTime
+from datetime import datetime
+
+from app.db.base_class import Base
+
+class CacheEntry(Base):
+    """
+    A shared cache entry (see app.core.cache.DatabaseCache).
+
+    Keys are namespaced strings such as "ocr:<sha256>"; values are JSON text.
+    """
+    __tablename__ = "cache_entries"
+
+    key = Column(String, primary_key=True)
+    value = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # NULL means the entry never expires
+    expires_at = Column(DateTime, nullable=True, index=True)
+
+    def __repr__(self):
+        return f"<CacheEntry(key={self.key}, expires_at={self.expires_at})>"
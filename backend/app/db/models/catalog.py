@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String
+
+from app.db.base_class import Base
+
+class CatalogVersion(Base):
+    """
+    Version counter of a cached catalog, e.g. "problems".
+
+    Writers bump it in the same transaction as their change; every process
+    holding an in-process copy of the catalog compares it against the version
+    it loaded and drops its copy when they differ (see crud.problem).
+    """
+    __tablename__ = "catalog_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<CatalogVersion(name={self.name}, version={self.version})>"
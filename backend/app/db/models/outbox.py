@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
+from datetime import datetime
+
+from app.db.base_class import Base
+
+class OutboxMessage(Base):
+    """
+    A queue message written in the same transaction as the row it refers to.
+
+    The outbox relay publishes pending rows to RabbitMQ and deletes them once
+    the broker has confirmed them, so nothing committed is ever lost. A
+    message the broker keeps refusing while others go through is
+    dead-lettered instead of blocking the rows behind it.
+    """
+    __tablename__ = "outbox_messages"
+
+    id = Column(Integer, primary_key=True, index=True)
+    queue = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Failed publish attempts, kept for visibility when the broker is down
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    # Set once the relay gives up on the message; dead letters are kept for inspection
+    dead_lettered_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<OutboxMessage(id={self.id}, queue={self.queue}, attempts={self.attempts})>"
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, Float
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, Float, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -6,12 +7,16 @@ from app.db.base_class import Base
 
 class Problem(Base):
     __tablename__ = "problems"
+    __table_args__ = (
+        # Serves the topic containment filter (topics @> '["algebra"]') on PostgreSQL
+        Index("ix_problems_topics", "topics", postgresql_using="gin", postgresql_ops={"topics": "jsonb_path_ops"}),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True, nullable=False)
     statement = Column(Text, nullable=False)
     difficulty = Column(Float, nullable=False)
-    topics = Column(JSON)  # Use JSON for list data
+    topics = Column(JSON().with_variant(JSONB(), "postgresql"))  # List of topic strings; JSONB on PostgreSQL
     is_published = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
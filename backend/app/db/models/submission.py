@@ -1,13 +1,17 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, LargeBinary, Index, Enum as SQLEnum, desc
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
+from typing import List, Optional
+import copy
 import enum
 
 from app.db.base_class import Base
+from app.db.models.submission_error import SubmissionError
 
 # Define Enum for submission status
 # Inherit from str to ensure compatibility with Pydantic/FastAPI serialization
 class SubmissionStatus(str, enum.Enum):
+    ocr_pending = "ocr_pending" # Uploaded image waiting for the OCR worker
     pending = "pending"
     processing = "processing"
     appealing = "appealing"
@@ -16,6 +20,11 @@ class SubmissionStatus(str, enum.Enum):
 
 class Submission(Base):
     __tablename__ = "submissions"
+    __table_args__ = (
+        # Keyset pagination of the submission lists, newest first
+        Index("ix_submissions_submitted_at_id", desc("submitted_at"), desc("id")),
+        Index("ix_submissions_problem_id_submitted_at_id", "problem_id", desc("submitted_at"), desc("id")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     problem_id = Column(Integer, ForeignKey("problems.id"), nullable=False, index=True)
@@ -24,13 +33,24 @@ class Submission(Base):
     solution_text = Column(Text, nullable=False)
     submitted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     status = Column(SQLEnum(SubmissionStatus), default=SubmissionStatus.pending, nullable=False, index=True)
+    # When the submission last moved to 'processing'; the sweeper reclaims claims that went stale
+    claimed_at = Column(DateTime, nullable=True)
     appeal_attempts = Column(Integer, default=0, nullable=False)
+    # Uploaded image kept until the OCR worker has extracted solution_text.
+    # Deferred so ordinary submission queries never load the bytes.
+    image_data = deferred(Column(LargeBinary, nullable=True))
     
     # Fields to store evaluation results (nullable initially)
     score = Column(Integer, nullable=True)
     feedback = Column(Text, nullable=True) # Can store markdown
-    # Store errors as JSON array of objects (matching Error Object schema)
-    errors = Column(JSON, nullable=True)
+    # Errors are rows of submission_errors; `errors` below is the list-of-dicts view
+    error_rows = relationship(
+        "SubmissionError",
+        back_populates="submission",
+        order_by=SubmissionError.position,
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
     
     # Relationship back to the problem
     problem = relationship("Problem", back_populates="submissions")
@@ -41,5 +61,36 @@ class Submission(Base):
     # Relationship to appeals (if needed later)
     # appeals = relationship("Appeal", back_populates="submission")
 
+    @property
+    def errors(self) -> List[dict]:
+        """
+        The errors as a list of dicts (schemas.ErrorDetail shape), in order.
+
+        The same list is returned until the stored rows change, so evaluators
+        can edit it in place; assign it back to `errors` to persist the edits.
+        """
+        stored = [row.to_dict() for row in self.error_rows]
+        view = getattr(self, "_errors_view", None)
+        if view is None or view[0] != stored:
+            view = (stored, copy.deepcopy(stored))
+            self._errors_view = view
+        return view[1]
+
+    @errors.setter
+    def errors(self, errors: Optional[List[dict]]):
+        """Sync the rows with `errors`: matching error IDs are updated in place, others added or deleted."""
+        existing = {row.error_id: row for row in self.error_rows}
+        rows = []
+        for position, error in enumerate(errors or []):
+            row = existing.pop(str(error.get("id")), None)
+            if row is None:
+                row = SubmissionError.from_dict(error, position)
+            else:
+                row.update_from_dict(error)
+                row.position = position
+            rows.append(row)
+        self.error_rows = rows
+        self._errors_view = None
+
     def __repr__(self):
         return f"<Submission(id={self.id}, problem_id={self.problem_id}, status={self.status})>" 
\ No newline at end of file
@@ -0,0 +1,74 @@
+from typing import Any, Optional
+
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Index
+from sqlalchemy.orm import relationship
+
+from app.db.base_class import Base
+
+# Columns of an error, in the shape of schemas.ErrorDetail ("id" is error_id)
+ERROR_FIELDS = ("type", "location", "description", "severity", "status")
+
+def normalize_severity(value: Any) -> Optional[str]:
+    """
+    Severity as stored: a string such as "low", "medium" or "high" (see
+    interfaces.ErrorDetail). Booleans from older evaluators map to "high"
+    (non-trivial) and "low" (trivial).
+    """
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "high" if value else "low"
+    return str(value)
+
+class SubmissionError(Base):
+    """
+    One error found in a submission (see schemas.ErrorDetail).
+
+    Rows are exposed on the submission as `Submission.errors`, a list of
+    dicts in `position` order.
+    """
+    __tablename__ = "submission_errors"
+    __table_args__ = (
+        # Per-status lookups within a submission, and the join for
+        # cross-submission queries such as "rejected errors for problem X"
+        Index("ix_submission_errors_submission_id_status", "submission_id", "status"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    submission_id = Column(Integer, ForeignKey("submissions.id", ondelete="CASCADE"), nullable=False)
+    # Evaluator-assigned identifier, unique within the submission
+    error_id = Column(String, nullable=False)
+    # Order of the error in the evaluator's output
+    position = Column(Integer, default=0, nullable=False)
+    type = Column(String, nullable=True)
+    location = Column(Text, nullable=True)
+    description = Column(Text, nullable=True)
+    severity = Column(String, nullable=True)
+    status = Column(String, default="active", nullable=False)
+
+    submission = relationship("Submission", back_populates="error_rows")
+
+    def to_dict(self) -> dict:
+        error = {"id": self.error_id}
+        error.update({field: getattr(self, field) for field in ERROR_FIELDS})
+        return error
+
+    def update_from_dict(self, error: dict):
+        for field in ERROR_FIELDS:
+            if field not in error:
+                continue
+            value = normalize_severity(error[field]) if field == "severity" else error[field]
+            # Only touch changed fields so unchanged rows are not rewritten
+            if getattr(self, field) != value:
+                setattr(self, field, value)
+        if self.status is None:
+            self.status = "active"
+
+    @classmethod
+    def from_dict(cls, error: dict, position: int = 0) -> "SubmissionError":
+        row = cls(error_id=str(error.get("id")), position=position, status="active")
+        row.update_from_dict(error)
+        return row
+
+    def __repr__(self):
+        return f"<SubmissionError(submission_id={self.submission_id}, error_id={self.error_id}, status={self.status})>"
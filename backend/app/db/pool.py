@@ -0,0 +1,101 @@
+"""
+Connection pool instrumentation.
+
+InstrumentedQueuePool is a drop-in QueuePool that counts checkouts, how many
+of them had to wait for a free connection (pool and overflow exhausted), how
+long they waited, and how many timed out. `pool_status` reports those counters
+together with the live pool occupancy for the health endpoints.
+"""
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+class PoolStats:
+    """Thread-safe counters shared by a pool and the pools it is recreated as."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.overflow_peak = 0
+
+    def record(self, waited: bool, elapsed: float, overflow: int, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            if waited:
+                self.waits += 1
+                self.wait_seconds_total += elapsed
+                self.wait_seconds_max = max(self.wait_seconds_max, elapsed)
+            self.overflow_peak = max(self.overflow_peak, overflow)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "overflow_peak": self.overflow_peak,
+            }
+
+class _InstrumentedPoolMixin:
+    """Times `_do_get`, the point where a checkout blocks on an exhausted pool."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool; keep counting across it
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _in_use_overflow(self) -> int:
+        return max(0, self.overflow())
+
+    def _do_get(self):
+        # Nothing idle and no overflow headroom: this checkout will block
+        waited = self.checkedin() == 0 and self.overflow() >= self._max_overflow
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record(waited, time.perf_counter() - start, self._in_use_overflow(), timed_out=True)
+            raise
+        self.stats.record(waited, time.perf_counter() - start, self._in_use_overflow())
+        return connection
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def pool_status(pool: Pool) -> Dict[str, Any]:
+    """Live occupancy and counters of a pool, for health checks."""
+    if not isinstance(pool, QueuePool):
+        # SQLite and other non-queue pools have nothing meaningful to report
+        return {"pool": type(pool).__name__}
+    status = {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        "max_overflow": pool._max_overflow,
+    }
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(stats.as_dict())
+    return status
@@ -3,6 +3,8 @@ from sqlalchemy.orm import Session
 
 from app.db.session import SessionLocal
 from app.db.models.problem import Problem
+# Registers the listeners that bump the problem catalog version on writes
+import app.crud.problem # noqa
 
 def create_sample_problem(db: Session):
     """Create a sample problem for testing."""
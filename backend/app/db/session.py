@@ -1,12 +1,86 @@
+from typing import Any, Dict, Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
+from app.db.pool import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool
+
+def engine_options(database_url: str, role: Optional[str] = None, is_async: bool = False) -> Dict[str, Any]:
+    """
+    create_engine keyword arguments for this process's pool profile.
+
+    SQLite (tests, local scripts) keeps SQLAlchemy's defaults: it has no
+    server-side pool to tune and no statement timeout.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        return {}
+
+    profile = settings.db_pool_profile(role)
+    options: Dict[str, Any] = {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": profile["pool_size"],
+        "max_overflow": profile["max_overflow"],
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if url.get_backend_name() == "postgresql" and profile["statement_timeout_ms"]:
+        timeout = str(profile["statement_timeout_ms"])
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
 
 engine = create_engine(
     settings.DATABASE_URL,
+    **engine_options(settings.DATABASE_URL),
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Crud functions return the state written by UPDATE ... RETURNING; expiring
+# it on commit would cost a second SELECT on the next attribute access
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Async drivers used in place of the sync ones for the asyncio worker
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+class AsyncWorkerSession(Session):
+    """Sync session class behind the async sessions, so session listeners can target them."""
+
+_async_sessionmaker = None
+_async_engine = None
+
+def get_async_engine():
+    """Return the async engine, or None if no async session has been used yet."""
+    return _async_engine
+
+def get_async_sessionmaker():
+    """
+    Return the sessionmaker for AsyncSession, creating the async engine on first use.
+
+    Built lazily so processes that only use SessionLocal (API, scripts, the
+    threaded worker) don't need an async DB driver installed.
+    """
+    global _async_sessionmaker, _async_engine
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+        url = make_url(settings.DATABASE_URL)
+        url = url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+        async_engine = create_async_engine(url, **engine_options(settings.DATABASE_URL, is_async=True))
+        # Objects returned from crud calls are read after the commit, outside
+        # of a greenlet, so they must not expire
+        _async_sessionmaker = async_sessionmaker(
+            async_engine, autoflush=False, expire_on_commit=False, sync_session_class=AsyncWorkerSession
+        )
+        _async_engine = async_engine
+    return _async_sessionmaker
 
 # Dependency to get DB session
 def get_db():
@@ -14,4 +88,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close() 
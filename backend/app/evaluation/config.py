@@ -22,7 +22,30 @@ DEFAULT_EVALUATOR_CONFIG: Dict[str, Any] = {
         "max_errors": 4,
         
         # Probability of appeal success (0-1)
-        "appeal_success_rate": 0.5
+        "appeal_success_rate": 0.5,
+
+        # Appealed errors adjudicated concurrently (see BaseEvaluator.process_appeal_concurrently)
+        "appeal_concurrency": 4
+    },
+
+    # Memoized find_errors results, keyed on problem, normalized solution
+    # text and evaluator name/version. Opt in to "shared" (e.g. through
+    # EVALUATOR_CONFIG in deployments) to back the in-process LRU with the
+    # cache_entries table so all API and worker processes share results.
+    "result_cache": {
+        "enabled": True,
+        "max_entries": 1024,
+        "ttl_seconds": 3600,
+        "shared": False
+    },
+
+    # Collapse concurrent identical find_errors calls into one evaluation.
+    # "distributed" (opt-in, needs result_cache.shared) also coordinates
+    # across processes with PostgreSQL advisory locks
+    "single_flight": {
+        "enabled": True,
+        "distributed": False,
+        "lock_timeout_seconds": 120
     }
     
     # Add configuration for other evaluators as they are implemented
@@ -1,14 +1,23 @@
 """
 Abstract base class that all evaluator implementations must inherit from.
 """
+import asyncio
+import copy
+import logging
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, TYPE_CHECKING
 
 # Use TYPE_CHECKING to avoid circular imports at runtime
 if TYPE_CHECKING:
     from app.db.models.submission import Submission
     from app.db.models.problem import Problem
     from app.schemas.submission import ErrorAppeal, ErrorDetail, EvaluationResult
+    from app.evaluation.interfaces import ErrorStatusChange
+    from app.evaluation.llm import ScopedLLMClient
+
+logger = logging.getLogger(__name__)
 
 class BaseEvaluator(ABC):
     """
@@ -16,7 +25,27 @@ class BaseEvaluator(ABC):
     
     All evaluator implementations should inherit from this class and implement
     all abstract methods.
+
+    Evaluators that can decide each appealed error on its own (e.g. one LLM
+    call per error) should also implement `adjudicate_appeal`. The router then
+    uses the concurrent batch mode (`process_appeal_concurrently`) instead of
+    `process_appeal`.
+
+    Each operation also has an `async` counterpart (`find_errors_async`,
+    `evaluate_async`, `evaluate_incremental_async`, `process_appeal_async`)
+    for callers on an event loop. By default they run the blocking method
+    on the loop's thread pool; network-bound evaluators should override
+    them with native coroutines. The blocking methods remain required, as
+    the threaded judge worker calls them (an async-native evaluator can
+    implement them with `asyncio.run`).
+
+    Evaluators calling an LLM provider should use `llm_client()`, which
+    pools connections and applies the shared concurrency, rate and retry
+    limits (see app.evaluation.llm).
     """
+
+    # Appealed errors adjudicated at once per evaluator (config key "appeal_concurrency")
+    DEFAULT_APPEAL_CONCURRENCY = 4
     
     @abstractmethod
     def find_errors(self, submission: 'Submission', problem: 'Problem') -> List['ErrorDetail']:
@@ -76,4 +105,155 @@ class BaseEvaluator(ABC):
         Returns:
             Dictionary containing evaluator metadata.
         """
-        pass 
\ No newline at end of file
+        pass
+
+    def evaluate_incremental(self, submission: 'Submission', problem: 'Problem',
+                             changes: List['ErrorStatusChange'],
+                             previous: Optional['EvaluationResult'] = None) -> 'EvaluationResult':
+        """
+        Update a previous evaluation result after some error statuses changed.
+
+        `changes` lists every error whose status differs from when `previous`
+        was computed (e.g. the verdicts of an appeal batch); all other errors
+        are as they were. Evaluators whose evaluation is expensive should
+        override this to reuse `previous` and only account for the delta.
+        The default re-evaluates the whole submission.
+
+        Args:
+            submission: The Submission model object (containing current errors).
+            problem: The associated Problem model object.
+            changes: The error status changes since `previous`.
+            previous: The previous result (score, feedback), or None if unknown.
+
+        Returns:
+            The updated evaluation result.
+        """
+        return self.evaluate(submission=submission, problem=problem)
+
+    async def find_errors_async(self, submission: 'Submission', problem: 'Problem') -> List['ErrorDetail']:
+        """Async counterpart of find_errors. Runs find_errors in a thread unless overridden."""
+        return await asyncio.to_thread(self.find_errors, submission=submission, problem=problem)
+
+    async def evaluate_async(self, submission: 'Submission', problem: 'Problem') -> 'EvaluationResult':
+        """Async counterpart of evaluate. Runs evaluate in a thread unless overridden."""
+        return await asyncio.to_thread(self.evaluate, submission=submission, problem=problem)
+
+    async def evaluate_incremental_async(self, submission: 'Submission', problem: 'Problem',
+                                         changes: List['ErrorStatusChange'],
+                                         previous: Optional['EvaluationResult'] = None) -> 'EvaluationResult':
+        """
+        Async counterpart of evaluate_incremental.
+
+        Runs an overridden evaluate_incremental in a thread; otherwise falls
+        back to evaluate_async, so a native async evaluate is used.
+        """
+        if type(self).evaluate_incremental is not BaseEvaluator.evaluate_incremental:
+            return await asyncio.to_thread(
+                self.evaluate_incremental, submission=submission, problem=problem, changes=changes, previous=previous
+            )
+        return await self.evaluate_async(submission=submission, problem=problem)
+
+    async def process_appeal_async(self, appeals: List['ErrorAppeal'], submission: 'Submission',
+                                   problem: 'Problem') -> None:
+        """Async counterpart of process_appeal. Runs process_appeal in a thread unless overridden."""
+        await asyncio.to_thread(self.process_appeal, appeals=appeals, submission=submission, problem=problem)
+
+    def llm_client(self) -> 'ScopedLLMClient':
+        """
+        The shared LLM client, limited to this evaluator's `llm_concurrency`
+        requests in flight (config key, default LLM_EVALUATOR_CONCURRENCY).
+        """
+        from app.core.config import settings
+        from app.evaluation.llm import get_llm_client
+        config = getattr(self, "config", None) or {}
+        name = type(self).get_evaluator_info().get("name") or type(self).__name__
+        return get_llm_client().scoped(name, max(1, int(config.get("llm_concurrency", settings.LLM_EVALUATOR_CONCURRENCY))))
+
+    def has_native_async(self, operation: str) -> bool:
+        """Whether `<operation>_async` is overridden rather than the thread adapter."""
+        name = f"{operation}_async"
+        return getattr(type(self), name) is not getattr(BaseEvaluator, name)
+
+    def adjudicate_appeal(self, appeal: 'ErrorAppeal', error: 'ErrorDetail', submission: 'Submission',
+                          problem: 'Problem') -> Optional[str]:
+        """
+        Decide a single appealed error, independently of the rest of the batch.
+
+        Called concurrently from worker threads, so implementations must not
+        modify `submission` or `problem`. `error` is a private copy.
+
+        Args:
+            appeal: The appeal (error_id and justification) for this error.
+            error: Copy of the appealed error, currently 'appealing'.
+            submission: The Submission model object (read-only).
+            problem: The associated Problem model object (read-only).
+
+        Returns:
+            The new error status ('resolved' or 'rejected'), or None to leave it unchanged.
+        """
+        raise NotImplementedError
+
+    def supports_concurrent_appeals(self) -> bool:
+        """Whether this evaluator implements adjudicate_appeal."""
+        return type(self).adjudicate_appeal is not BaseEvaluator.adjudicate_appeal
+
+    def appeal_concurrency(self) -> int:
+        config = getattr(self, "config", None) or {}
+        return max(1, int(config.get("appeal_concurrency", self.DEFAULT_APPEAL_CONCURRENCY)))
+
+    def _appeal_executor(self) -> ThreadPoolExecutor:
+        # One pool per evaluator, so concurrent batches share the limit
+        executor = self.__dict__.get("_appeal_pool")
+        if executor is None:
+            with _appeal_pool_lock:
+                executor = self.__dict__.get("_appeal_pool")
+                if executor is None:
+                    executor = ThreadPoolExecutor(max_workers=self.appeal_concurrency(), thread_name_prefix="appeal")
+                    self._appeal_pool = executor
+        return executor
+
+    def process_appeal_concurrently(self, appeals: List['ErrorAppeal'], submission: 'Submission',
+                                    problem: 'Problem') -> None:
+        """
+        Concurrent batch mode of process_appeal.
+
+        Each appealed error in the 'appealing' state is adjudicated with
+        `adjudicate_appeal` on a bounded thread pool (`appeal_concurrency`
+        at a time), so a batch takes about as long as its slowest error.
+        The verdicts are merged into `submission.errors` on the calling
+        thread once all of them are in. If any adjudication fails, the
+        exception is raised and no verdict is applied.
+        """
+        errors = submission.errors or []
+        error_map = {str(error.get('id')): error for error in errors if isinstance(error, dict)}
+
+        pending = []
+        for appeal in appeals:
+            error = error_map.get(str(appeal.error_id))
+            if error is None:
+                logger.warning(f"Error ID {appeal.error_id} from appeal not found in submission {submission.id}")
+                continue
+            if error.get('status') != 'appealing':
+                logger.warning(f"Skipping appeal for error {appeal.error_id} in submission {submission.id}: status is not 'appealing' (current: {error.get('status')})")
+                continue
+            pending.append((error, appeal))
+
+        executor = self._appeal_executor()
+        futures = [
+            executor.submit(self.adjudicate_appeal, appeal, copy.deepcopy(error), submission, problem)
+            for error, appeal in pending
+        ]
+        try:
+            verdicts = [future.result() for future in futures]
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+
+        for (error, appeal), verdict in zip(pending, verdicts):
+            if verdict is not None:
+                error['status'] = verdict
+        logger.info(f"Adjudicated {len(pending)} appeal(s) for submission {submission.id} concurrently")
+
+# Guards the lazy creation of per-evaluator appeal pools
+_appeal_pool_lock = threading.Lock()
@@ -16,13 +16,30 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+def adjudicate_appeal(appeal: 'ErrorAppeal', error: 'ErrorDetail', submission: 'Submission',
+                      problem: 'Problem', config: Dict[str, Any]) -> str:
+    """
+    Decide one appealed error deterministically.
+
+    Appeal succeeds if justification contains "correct", fails otherwise.
+
+    Returns:
+        'resolved' or 'rejected'.
+    """
+    justification = appeal.justification
+    if justification and re.search(r'correct', justification, re.IGNORECASE):
+        logger.info(f"Appeal for error {appeal.error_id} in submission {submission.id} resolved.")
+        return 'resolved'
+    logger.info(f"Appeal for error {appeal.error_id} in submission {submission.id} rejected.")
+    return 'rejected'
+
 def process_appeal(appeals: List['ErrorAppeal'], submission: 'Submission', 
                    problem: 'Problem', config: Dict[str, Any]) -> None:
     """
-    Process a batch of appeals deterministically.
+    Process a batch of appeals deterministically, one error after another.
 
-    Modifies the submission.errors list directly.
-    Appeal succeeds if justification contains "correct", fails otherwise.
+    Modifies the submission.errors list directly. The router normally uses
+    the concurrent batch mode with adjudicate_appeal instead.
 
     Args:
         appeals: List of appeal objects with error_id and justification.
@@ -46,22 +63,10 @@ def process_appeal(appeals: List['ErrorAppeal'], submission: 'Submission',
             
             # Only process if it was marked as 'appealing'
             if error_to_update.get('status') == 'appealing':
-                justification = appeal.justification
-                
-                # Deterministic rule: check for "correct" in justification
-                if justification and re.search(r'correct', justification, re.IGNORECASE):
-                    # Appeal successful
-                    error_to_update['status'] = 'resolved'
-                    # Optionally downgrade severity if needed by logic
-                    # error_to_update['severity'] = False 
-                    logger.info(f"Appeal for error {error_id_str} in submission {submission.id} resolved.")
-                else:
-                    # Appeal failed
-                    error_to_update['status'] = 'rejected'
-                    logger.info(f"Appeal for error {error_id_str} in submission {submission.id} rejected.")
+                error_to_update['status'] = adjudicate_appeal(appeal, error_to_update, submission, problem, config)
             else:
                  logger.warning(f"Skipping appeal for error {error_id_str} in submission {submission.id}: status is not 'appealing' (current: {error_to_update.get('status')})")
         else:
             logger.warning(f"Error ID {error_id_str} from appeal not found in submission {submission.id}")
 
-    # No return value, modifications are made directly to submission.errors
\ No newline at end of file
+    # No return value, modifications are made directly to submission.errors
@@ -3,10 +3,10 @@ Evaluation implementation for the placeholder evaluator.
 
 Generates deterministic evaluation results based on errors.
 """
-from typing import List, Dict, Any, TYPE_CHECKING
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
 import logging
 
-from app.evaluation.interfaces import EvaluationResult, ErrorDetail # ErrorDetail for type hint clarity
+from app.evaluation.interfaces import EvaluationResult, ErrorDetail, ErrorStatusChange # ErrorDetail for type hint clarity
 
 if TYPE_CHECKING:
     from app.db.models.submission import Submission
@@ -14,6 +14,17 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Error statuses that keep the score at 0
+BLOCKING_STATUSES = ('active', 'rejected')
+
+def _result(score: int) -> EvaluationResult:
+    feedback = "No active or rejected errors found." if score == 100 else "Active or rejected errors identified. Please review the feedback below."
+    return {
+        "score": score,
+        "feedback": feedback
+        # Status (like completed/appealing) is determined by the worker based on score/errors
+    }
+
 def evaluate(submission: 'Submission', problem: 'Problem', config: Dict[str, Any]) -> EvaluationResult:
     """
     Generate a deterministic evaluation result based on current errors.
@@ -34,20 +45,46 @@ def evaluate(submission: 'Submission', problem: 'Problem', config: Dict[str, Any
 
     # Determine if there are any active or rejected errors
     has_active_or_rejected_errors = any(
-        error.get('status') in ['active', 'rejected']
+        error.get('status') in BLOCKING_STATUSES
         for error in errors if isinstance(error, dict)
     )
 
     score = 0 if has_active_or_rejected_errors else 100
-    feedback = "No active or rejected errors found." if score == 100 else "Active or rejected errors identified. Please review the feedback below."
     
     logger.info(f"Evaluation complete for submission {submission.id}. Score: {score}")
 
     # Return the result structure - Note: errors are part of the submission object,
     # the evaluator usually just returns score/status/feedback.
     # The worker then updates the submission with these.
-    return {
-        "score": score,
-        "feedback": feedback
-        # Status (like completed/appealing) is determined by the worker based on score/errors
-    } 
\ No newline at end of file
+    return _result(score)
+
+def evaluate_incremental(submission: 'Submission', problem: 'Problem', changes: List[ErrorStatusChange],
+                         previous: Optional[EvaluationResult], config: Dict[str, Any]) -> EvaluationResult:
+    """
+    Update the previous result from the error status changes alone where possible.
+
+    The score only depends on whether any blocking (active or rejected)
+    error exists, so:
+    - a change to a blocking status means score 0;
+    - changes that neither add nor remove a blocking error keep the result;
+    - only when a blocking error went away are the remaining errors scanned.
+
+    Args:
+        submission: The Submission object (contains current errors).
+        problem: The associated Problem object.
+        changes: Error status changes since `previous`.
+        previous: The previous result, or None to evaluate from scratch.
+        config: Evaluator configuration (not used).
+
+    Returns:
+        Evaluation result (score, feedback).
+    """
+    if previous is None or previous.get('score') is None:
+        return evaluate(submission, problem, config)
+    if any(change['new_status'] in BLOCKING_STATUSES for change in changes):
+        logger.info(f"Incremental evaluation of submission {submission.id}: blocking error remains. Score: 0")
+        return _result(0)
+    if not any(change['old_status'] in BLOCKING_STATUSES for change in changes):
+        logger.info(f"Incremental evaluation of submission {submission.id}: no blocking change, result kept.")
+        return {"score": previous['score'], "feedback": previous.get('feedback')}
+    return evaluate(submission, problem, config) 
\ No newline at end of file
@@ -9,19 +9,19 @@ This evaluator provides a simple implementation that:
 It serves as a demonstration of the evaluator architecture and a starting
 point for more sophisticated implementations.
 """
-from typing import Dict, List, Any, TYPE_CHECKING
+from typing import Dict, List, Any, Optional, TYPE_CHECKING
 import logging
 
 from app.evaluation.evaluators.base import BaseEvaluator
-from app.evaluation.interfaces import EvaluationResult
+from app.evaluation.interfaces import EvaluationResult, ErrorStatusChange
 # AppealResult is removed, ErrorAppeal/ErrorDetail are used via TYPE_CHECKING
 
 from app.evaluation.config import get_evaluator_config
 
 # Import the actual implementations from submodules
 from .find_errors import find_errors as find_errors_impl
-from .evaluate import evaluate as evaluate_impl
-from .appeal import process_appeal as process_appeal_impl # Will need update
+from .evaluate import evaluate as evaluate_impl, evaluate_incremental as evaluate_incremental_impl
+from .appeal import adjudicate_appeal as adjudicate_appeal_impl, process_appeal as process_appeal_impl
 
 if TYPE_CHECKING:
     from app.db.models.submission import Submission
@@ -82,6 +82,29 @@ class PlaceholderEvaluator(BaseEvaluator):
             config=self.config
         )
     
+    def evaluate_incremental(self, submission: 'Submission', problem: 'Problem',
+                             changes: List['ErrorStatusChange'],
+                             previous: Optional['EvaluationResult'] = None) -> 'EvaluationResult':
+        """
+        Update the previous evaluation result from error status changes (placeholder version).
+        
+        Args:
+            submission: The Submission object (contains current errors).
+            problem: The associated Problem object.
+            changes: Error status changes since `previous`.
+            previous: The previous result, or None.
+            
+        Returns:
+            Evaluation result (score, feedback).
+        """
+        return evaluate_incremental_impl(
+            submission=submission,
+            problem=problem,
+            changes=changes,
+            previous=previous,
+            config=self.config
+        )
+    
     def process_appeal(self, appeals: List['ErrorAppeal'], submission: 'Submission', 
                        problem: 'Problem') -> None:
         """
@@ -103,6 +126,28 @@ class PlaceholderEvaluator(BaseEvaluator):
             config=self.config
         )
     
+    def adjudicate_appeal(self, appeal: 'ErrorAppeal', error: 'ErrorDetail', submission: 'Submission',
+                          problem: 'Problem') -> Optional[str]:
+        """
+        Decide one appealed error (placeholder version), for the concurrent batch mode.
+        
+        Args:
+            appeal: The appeal for this error.
+            error: Copy of the appealed error.
+            submission: The Submission object (read-only).
+            problem: The associated Problem object.
+            
+        Returns:
+            'resolved' or 'rejected'.
+        """
+        return adjudicate_appeal_impl(
+            appeal=appeal,
+            error=error,
+            submission=submission,
+            problem=problem,
+            config=self.config
+        )
+    
     @classmethod
     def get_evaluator_info(cls) -> Dict[str, Any]:
         """
@@ -115,5 +160,5 @@ class PlaceholderEvaluator(BaseEvaluator):
             "name": "placeholder",
             "version": "1.0.0",
             "description": "Placeholder evaluator with random error generation",
-            "capabilities": ["error_generation", "appeal_processing", "batch_appeal"]
+            "capabilities": ["error_generation", "appeal_processing", "batch_appeal", "concurrent_appeal", "incremental_evaluation"]
         } 
\ No newline at end of file
@@ -1,8 +1,13 @@
 """
 Module for converting handwritten math images to LaTeX using OCR.
+
+Results are cached by the SHA-256 of the image bytes, so re-uploads of the
+same scan skip Tesseract entirely.
 """
+import hashlib
 import io
 import logging
+import threading
 from typing import Optional
 
 import pytesseract
@@ -11,9 +16,64 @@ from PIL import Image
 # Set up logging
 logger = logging.getLogger(__name__)
 
+_ocr_cache = None
+_ocr_cache_lock = threading.Lock()
+
+def get_ocr_cache():
+    """
+    Return the process-wide OCR result cache: an in-process LRU in front of
+    the shared `cache_entries` table. Built on first use so OCR pool worker
+    processes, which only call run_ocr, never open a database connection.
+    """
+    global _ocr_cache
+    if _ocr_cache is None:
+        with _ocr_cache_lock:
+            if _ocr_cache is None:
+                from app.core.cache import DatabaseCache, LRUCache, TieredCache
+                from app.core.config import settings
+                from app.db.session import SessionLocal
+
+                _ocr_cache = TieredCache(
+                    "ocr",
+                    LRUCache(max_entries=settings.OCR_CACHE_MAX_ENTRIES),
+                    DatabaseCache(SessionLocal, ttl=settings.OCR_CACHE_TTL_SECONDS),
+                )
+    return _ocr_cache
+
+def image_cache_key(image_bytes: bytes) -> str:
+    """Content address of an image: the hex SHA-256 of its bytes."""
+    return hashlib.sha256(image_bytes).hexdigest()
+
 def convert_image_to_latex(image_bytes: bytes) -> str:
+    """
+    Convert an image to LaTeX, reusing the cached result for identical images.
+
+    Args:
+        image_bytes: Raw bytes of the image file
+
+    Returns:
+        str: Extracted LaTeX string from the image
+
+    Raises:
+        ValueError: If image processing fails
+    """
+    cache = get_ocr_cache()
+    key = image_cache_key(image_bytes)
+    latex_text = cache.get(key)
+    if latex_text is not None:
+        logger.info(f"OCR cache hit for image {key[:12]}")
+        return latex_text
+
+    latex_text = run_ocr(image_bytes)
+    # Empty results are not cached: they usually mean a bad scan worth retrying
+    if latex_text:
+        cache.set(key, latex_text)
+    return latex_text
+
+def run_ocr(image_bytes: bytes) -> str:
     """
     Convert an image containing math notation to LaTeX string using OCR.
+    Uncached; this is the function OCR pool processes execute.
     
     Args:
         image_bytes: Raw bytes of the image file
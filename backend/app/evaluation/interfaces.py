@@ -44,6 +44,15 @@ class EvaluationResult(TypedDict):
 # class AppealResult(TypedDict):
 #     ...
 
+class ErrorStatusChange(TypedDict):
+    """
+    One error whose status changed since the previous evaluation (e.g. an
+    appeal verdict: 'active' -> 'resolved'). Input of evaluate_incremental.
+    """
+    error_id: str
+    old_status: Optional[str]
+    new_status: Optional[str]
+
 class ErrorAppeal(TypedDict):
     """
     Structure for a single appeal within a batch (matches schemas.ErrorAppeal).
@@ -0,0 +1,27 @@
+"""
+LLM client subsystem for evaluators.
+
+Evaluators get a client scoped to their own concurrency limit from
+BaseEvaluator.llm_client(); all of them share one keep-alive connection pool,
+process-wide concurrency and rate limits, and the retry policy.
+"""
+from app.evaluation.llm.client import (
+    LLMClient,
+    LLMError,
+    LLMNotConfigured,
+    RetryPolicy,
+    ScopedLLMClient,
+    get_llm_client,
+)
+from app.evaluation.llm.limits import ConcurrencyLimiter, TokenBucket
+
+__all__ = [
+    "ConcurrencyLimiter",
+    "LLMClient",
+    "LLMError",
+    "LLMNotConfigured",
+    "RetryPolicy",
+    "ScopedLLMClient",
+    "TokenBucket",
+    "get_llm_client",
+]
@@ -0,0 +1,275 @@
+"""
+Shared HTTP client for LLM-backed evaluators.
+
+One LLMClient per process holds keep-alive connection pools to the provider
+(httpx.Client for worker threads, one httpx.AsyncClient per event loop) and
+schedules every request through the same limits:
+
+1. the calling evaluator's concurrency limit (ScopedLLMClient);
+2. the process-wide concurrency limit;
+3. the token-bucket request rate;
+
+retrying timeouts, connection errors, 429 and 5xx responses with jittered
+exponential backoff (honouring Retry-After). Slots are released while
+backing off, so a struggling request does not hold up the others.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+import weakref
+from contextlib import ExitStack
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.evaluation.llm.limits import ConcurrencyLimiter, TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: rate limited or the provider is struggling
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+class LLMError(Exception):
+    """An LLM request failed for good (non-retryable response or retries exhausted)."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+class LLMNotConfigured(LLMError):
+    """LLM_API_ENDPOINT is not set."""
+
+class RetryPolicy:
+    """Exponential backoff with full jitter: sleep U(0, min(max_delay, base * 2**retry))."""
+
+    def __init__(self, max_retries: int = 4, base_delay: float = 0.5, max_delay: float = 30.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, retry: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retry number `retry` (0-based)."""
+        if retry_after is not None:
+            # The provider said when to come back; add jitter so callers do not return together
+            return min(self.max_delay, retry_after + random.uniform(0, self.base_delay))
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** retry)))
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        # HTTP-date form; fall back to the backoff schedule
+        return None
+
+class _RetryableFailure(Exception):
+    def __init__(self, error: LLMError, retry_after: Optional[float] = None):
+        self.error = error
+        self.retry_after = retry_after
+
+class LLMClient:
+    """
+    Pooled, rate-limited client for the LLM provider at `endpoint`.
+
+    Evaluators should use `scoped(name, concurrency)` (see
+    BaseEvaluator.llm_client) rather than this object directly.
+    """
+
+    def __init__(self, endpoint: Optional[str], api_key: Optional[str] = None, *,
+                 max_connections: int = 20, max_keepalive_connections: int = 10,
+                 keepalive_expiry: float = 30.0, timeout: float = 60.0,
+                 max_concurrency: int = 16, requests_per_second: float = 0, burst: Optional[int] = None,
+                 retry: Optional[RetryPolicy] = None):
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout)
+        self.concurrency = ConcurrencyLimiter(max_concurrency)
+        self.rate_limiter = TokenBucket(requests_per_second, burst) if requests_per_second > 0 else None
+        self.retry = retry or RetryPolicy()
+        self._client: Optional[httpx.Client] = None
+        # httpx.AsyncClient connections belong to the loop that opened them
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+        self._clients_lock = threading.Lock()
+        self._scoped_limiters: Dict[str, ConcurrencyLimiter] = {}
+
+    @classmethod
+    def from_settings(cls) -> "LLMClient":
+        return cls(
+            endpoint=settings.LLM_API_ENDPOINT,
+            api_key=settings.LLM_API_KEY,
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY_SECONDS,
+            timeout=settings.LLM_TIMEOUT_SECONDS,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            requests_per_second=settings.LLM_REQUESTS_PER_SECOND,
+            burst=settings.LLM_BURST,
+            retry=RetryPolicy(settings.LLM_MAX_RETRIES, settings.LLM_RETRY_BASE_SECONDS, settings.LLM_RETRY_MAX_SECONDS),
+        )
+
+    def scoped(self, name: str, concurrency: int) -> "ScopedLLMClient":
+        """
+        View of this client limited to `concurrency` requests in flight for
+        `name`, on top of the process-wide limit. Views with the same name
+        share their limit; the first call fixes it.
+        """
+        with self._clients_lock:
+            limiter = self._scoped_limiters.get(name)
+            if limiter is None:
+                limiter = self._scoped_limiters[name] = ConcurrencyLimiter(concurrency)
+        return ScopedLLMClient(self, limiter)
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Accept": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def _url(self, path: str) -> str:
+        if not self.endpoint:
+            raise LLMNotConfigured("LLM_API_ENDPOINT is not configured")
+        if not path:
+            return self.endpoint
+        return f"{self.endpoint.rstrip('/')}/{path.lstrip('/')}"
+
+    def _get_client(self) -> httpx.Client:
+        if self._client is None:
+            with self._clients_lock:
+                if self._client is None:
+                    self._client = httpx.Client(limits=self.limits, timeout=self.timeout, headers=self._headers())
+        return self._client
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout, headers=self._headers())
+                self._async_clients[loop] = client
+        return client
+
+    @staticmethod
+    def _parse(response: httpx.Response) -> Any:
+        """JSON body of a response, or the failure to retry or raise."""
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            raise _RetryableFailure(
+                LLMError(f"LLM provider returned {response.status_code}", status_code=response.status_code),
+                _retry_after(response),
+            )
+        if response.is_error:
+            raise LLMError(f"LLM provider returned {response.status_code}: {response.text[:200]}", status_code=response.status_code)
+        try:
+            return response.json()
+        except ValueError as e:
+            raise LLMError("LLM provider returned a non-JSON response", status_code=response.status_code) from e
+
+    def _backoff(self, retry: int, failure: _RetryableFailure, url: str) -> float:
+        if retry >= self.retry.max_retries:
+            raise failure.error
+        delay = self.retry.delay(retry, failure.retry_after)
+        logger.warning(f"LLM request to {url} failed ({failure.error}); retry {retry + 1}/{self.retry.max_retries} in {delay:.2f}s")
+        return delay
+
+    def post_json(self, payload: Dict[str, Any], path: str = "",
+                  limiter: Optional[ConcurrencyLimiter] = None) -> Any:
+        """
+        POST `payload` as JSON and return the decoded response (blocking).
+
+        Raises:
+            LLMNotConfigured: If no endpoint is configured.
+            LLMError: On a non-retryable response or when retries are exhausted.
+        """
+        url = self._url(path)
+        client = self._get_client()
+        retry = 0
+        while True:
+            try:
+                with ExitStack() as slots:
+                    if limiter is not None:
+                        slots.enter_context(limiter)
+                    slots.enter_context(self.concurrency)
+                    if self.rate_limiter is not None:
+                        self.rate_limiter.acquire()
+                    try:
+                        response = client.post(url, json=payload)
+                    except httpx.TransportError as e:
+                        raise _RetryableFailure(LLMError(f"LLM request failed: {type(e).__name__}: {e}"))
+                    return self._parse(response)
+            except _RetryableFailure as failure:
+                time.sleep(self._backoff(retry, failure, url))
+                retry += 1
+
+    async def post_json_async(self, payload: Dict[str, Any], path: str = "",
+                              limiter: Optional[ConcurrencyLimiter] = None) -> Any:
+        """Async counterpart of post_json; waits on limits without blocking the loop."""
+        url = self._url(path)
+        client = self._get_async_client()
+        retry = 0
+        while True:
+            try:
+                if limiter is not None:
+                    await limiter.acquire_async()
+                try:
+                    async with self.concurrency:
+                        if self.rate_limiter is not None:
+                            await self.rate_limiter.acquire_async()
+                        try:
+                            response = await client.post(url, json=payload)
+                        except httpx.TransportError as e:
+                            raise _RetryableFailure(LLMError(f"LLM request failed: {type(e).__name__}: {e}"))
+                        return self._parse(response)
+                finally:
+                    if limiter is not None:
+                        limiter.release()
+            except _RetryableFailure as failure:
+                await asyncio.sleep(self._backoff(retry, failure, url))
+                retry += 1
+
+    def close(self):
+        """Close the blocking client's connections; a later request reopens them."""
+        with self._clients_lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+
+    async def aclose(self):
+        """Close the current event loop's async client."""
+        with self._clients_lock:
+            client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+class ScopedLLMClient:
+    """LLMClient view that also holds one of its owner's per-evaluator slots per request."""
+
+    def __init__(self, client: LLMClient, limiter: ConcurrencyLimiter):
+        self.client = client
+        self.limiter = limiter
+
+    def post_json(self, payload: Dict[str, Any], path: str = "") -> Any:
+        return self.client.post_json(payload, path=path, limiter=self.limiter)
+
+    async def post_json_async(self, payload: Dict[str, Any], path: str = "") -> Any:
+        return await self.client.post_json_async(payload, path=path, limiter=self.limiter)
+
+_llm_client: Optional[LLMClient] = None
+_llm_client_lock = threading.Lock()
+
+def get_llm_client() -> LLMClient:
+    """Return the process-wide LLM client, creating it on first use."""
+    global _llm_client
+    if _llm_client is None:
+        with _llm_client_lock:
+            if _llm_client is None:
+                _llm_client = LLMClient.from_settings()
+    return _llm_client
@@ -0,0 +1,157 @@
+"""
+Concurrency and rate limits shared by threads and coroutines.
+
+Evaluators call the LLM client both from worker threads (the blocking
+evaluator methods) and from event loops (the `_async` counterparts), so these
+limits keep their state behind a threading lock and let coroutines wait on
+futures instead of blocking the loop.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+class ConcurrencyLimiter:
+    """
+    Semaphore usable from threads (`with limiter:`) and coroutines
+    (`async with limiter:`). Released slots are handed to waiters in FIFO
+    order, so a steady stream of new callers cannot starve an old one.
+    """
+
+    class _Waiter:
+        __slots__ = ("event", "loop", "future", "handed")
+
+        def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+            self.loop = loop
+            self.future = loop.create_future() if loop is not None else None
+            self.event = threading.Event() if loop is None else None
+            self.handed = False
+
+    def __init__(self, limit: int):
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._waiters = deque()
+
+    @property
+    def in_use(self) -> int:
+        with self._lock:
+            return self._in_use
+
+    def _try_acquire(self, waiter_factory) -> Optional["ConcurrencyLimiter._Waiter"]:
+        """Take a free slot (None) or queue and return a waiter."""
+        with self._lock:
+            if self._in_use < self.limit and not self._waiters:
+                self._in_use += 1
+                return None
+            waiter = waiter_factory()
+            self._waiters.append(waiter)
+            return waiter
+
+    def _abandon(self, waiter: "ConcurrencyLimiter._Waiter") -> bool:
+        """Withdraw a waiter that gave up; False if a slot was already handed to it."""
+        with self._lock:
+            if waiter.handed:
+                return False
+            self._waiters.remove(waiter)
+            return True
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take a slot, blocking up to `timeout` seconds. Returns False on timeout."""
+        waiter = self._try_acquire(self._Waiter)
+        if waiter is None:
+            return True
+        if waiter.event.wait(timeout):
+            return True
+        return not self._abandon(waiter)
+
+    async def acquire_async(self):
+        """Take a slot without blocking the event loop."""
+        waiter = self._try_acquire(lambda: self._Waiter(asyncio.get_running_loop()))
+        if waiter is None:
+            return
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if not self._abandon(waiter) and not waiter.future.cancelled():
+                # The slot arrived together with the cancellation; a handoff
+                # to a cancelled future is passed on by _wake instead
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            if not self._waiters:
+                self._in_use -= 1
+                return
+            # The slot passes straight to the next waiter; _in_use is unchanged
+            waiter = self._waiters.popleft()
+            waiter.handed = True
+        if waiter.event is not None:
+            waiter.event.set()
+        else:
+            waiter.loop.call_soon_threadsafe(self._wake, waiter)
+
+    def _wake(self, waiter: "ConcurrencyLimiter._Waiter"):
+        if waiter.future.done():
+            # Cancelled before the handoff ran: pass the slot on
+            self.release()
+        else:
+            waiter.future.set_result(None)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    async def __aenter__(self):
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter: `rate` tokens per second, up to `capacity`
+    in a burst.
+
+    Callers reserve a token and then sleep until it is due, so waiting
+    callers are served in arrival order and the lock is never held while
+    sleeping.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1.0, capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take `tokens` (possibly on credit) and return the seconds until they are due."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1.0):
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: float = 1.0):
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
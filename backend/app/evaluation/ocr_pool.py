@@ -0,0 +1,122 @@
+"""
+Managed process pool for OCR.
+
+Tesseract is CPU-bound and blocking, so the OCR worker
+(judge-worker/ocr_worker.py) runs it in worker processes. The pool bounds
+how many jobs may be queued or running and rejects new work when saturated,
+or makes it wait for a free slot, so OCR messages apply backpressure instead
+of piling up behind each other.
+
+Cache lookups happen in the parent process (see image_to_latex.get_ocr_cache),
+so a cache hit never occupies a pool slot.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+
+from app.evaluation.image_to_latex import run_ocr, image_cache_key
+
+logger = logging.getLogger(__name__)
+
+class OCRPoolSaturated(Exception):
+    """Raised when the pool already holds its maximum number of jobs."""
+
+class OCRTimeout(Exception):
+    """Raised when an OCR job does not finish within the pool timeout."""
+
+class OCRPool:
+    """
+    Bounded ProcessPoolExecutor for image-to-LaTeX conversion.
+
+    A slot is taken when a job is submitted and only given back when the job
+    actually finishes, so a job that timed out still counts against capacity
+    until its process is free again.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 8, timeout: float = 30,
+                 func: Callable[[bytes], str] = run_ocr, cache: Optional[Any] = None):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.func = func
+        # Optional result cache keyed by image SHA-256 (get/set interface)
+        self.cache = cache
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    # spawn: forking a multi-threaded server process is unsafe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                    logger.info(f"Started OCR process pool with {self.max_workers} worker(s)")
+        return self._executor
+
+    def submit(self, image_bytes: bytes, wait: float = 0) -> Future:
+        """
+        Queue an OCR job, waiting up to `wait` seconds for a free slot.
+
+        Raises:
+            OCRPoolSaturated: if `max_pending` jobs are still queued or running.
+        """
+        acquired = self._slots.acquire(timeout=wait) if wait > 0 else self._slots.acquire(blocking=False)
+        if not acquired:
+            raise OCRPoolSaturated(f"OCR pool is saturated ({self.max_pending} jobs pending)")
+        try:
+            future = self._get_executor().submit(self.func, image_bytes)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def convert(self, image_bytes: bytes, wait: float = 0) -> str:
+        """
+        Run OCR in the pool and block until done.
+
+        `wait` is how long to wait for a free slot, e.g. while a job that
+        timed out earlier is still running.
+
+        Raises:
+            OCRPoolSaturated: if the pool is still full after `wait` seconds.
+            OCRTimeout: if the job exceeds the timeout.
+        """
+        key = image_cache_key(image_bytes)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        future = self.submit(image_bytes, wait=wait)
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise OCRTimeout(f"OCR did not finish within {self.timeout}s")
+        self._store(key, result)
+        return result
+
+    def _cached(self, key: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+        result = self.cache.get(key)
+        if result is not None:
+            logger.info(f"OCR cache hit for image {key[:12]}")
+        return result
+
+    def _store(self, key: str, result: str):
+        # Empty results are not cached: they usually mean a bad scan worth retrying
+        if self.cache is not None and result:
+            self.cache.set(key, result)
+
+    def shutdown(self):
+        """Stop the worker processes; a later submit starts a new pool."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -1,11 +1,20 @@
 """
 Router for selecting and instantiating evaluators.
 """
+import asyncio
+import copy
+import hashlib
 import logging
 from typing import Dict, Any, Optional, Type, List, TYPE_CHECKING
 
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.cache import DatabaseCache, LRUCache, TieredCache
 from app.evaluation.evaluators.base import BaseEvaluator
-from app.evaluation.interfaces import EvaluationResult # AppealResult removed
+from app.evaluation.interfaces import EvaluationResult, ErrorStatusChange # AppealResult removed
+from app.evaluation.single_flight import AdvisoryLock, SingleFlight
+from app.evaluation.utils import generate_error_id
 # Use TYPE_CHECKING to avoid circular imports at runtime
 if TYPE_CHECKING:
     from app.db.models.submission import Submission
@@ -34,6 +43,42 @@ class EvaluatorRouter:
         self.config = config or {}
         self.default_evaluator = self.config.get("default_evaluator", "placeholder")
         self._evaluator_cache = {}
+        self.result_cache = self._build_result_cache(self.config.get("result_cache", {}))
+        self.single_flight = self._build_single_flight(self.config.get("single_flight", {}))
+    
+    @staticmethod
+    def _build_result_cache(cache_config: Dict[str, Any]):
+        """In-process LRU, backed by the shared cache_entries table when `shared` is set."""
+        if not cache_config.get("enabled", False):
+            return None
+        local = LRUCache(
+            max_entries=cache_config.get("max_entries", 1024),
+            ttl=cache_config.get("ttl_seconds"),
+        )
+        if not cache_config.get("shared", False):
+            return local
+        from app.db.session import SessionLocal
+        return TieredCache("find_errors", local, DatabaseCache(SessionLocal, ttl=cache_config.get("ttl_seconds")))
+    
+    def _build_single_flight(self, flight_config: Dict[str, Any]) -> Optional[SingleFlight]:
+        """
+        Deduplicate concurrent identical find_errors calls, per process by
+        default. With `distributed` (opt-in) leaders in different processes
+        also serialize on PostgreSQL advisory locks, which only helps when
+        the shared cache tier lets waiters read the leader's result.
+        """
+        if not flight_config.get("enabled", False):
+            return None
+        if not flight_config.get("distributed", False) or not isinstance(self.result_cache, TieredCache):
+            return SingleFlight()
+        from app.db.session import engine
+        if engine.dialect.name != "postgresql":
+            return SingleFlight()
+        # Lock holders get their own unpooled connections instead of taking
+        # them from the worker pool for the whole evaluation
+        lock_engine = create_engine(engine.url, poolclass=NullPool)
+        timeout = flight_config.get("lock_timeout_seconds", 120)
+        return SingleFlight(lock_factory=lambda key: AdvisoryLock(lock_engine, f"find_errors:{key}", timeout=timeout))
     
     def get_evaluator(self, name: Optional[str] = None) -> BaseEvaluator:
         """
@@ -102,7 +147,111 @@ class EvaluatorRouter:
             List of errors found.
         """
         evaluator = self.get_evaluator(evaluator_name)
-        return evaluator.find_errors(submission=submission, problem=problem)
+        key = self._result_key(evaluator, submission, problem)
+        if key is None:
+            return evaluator.find_errors(submission=submission, problem=problem)
+        
+        def compute() -> List['ErrorDetail']:
+            # Re-check: another process may have finished while we waited for the lock
+            errors = self._lookup_errors(key)
+            if errors is None:
+                errors = evaluator.find_errors(submission=submission, problem=problem)
+                self._store_errors(key, errors)
+            return errors
+        
+        errors = self._lookup_errors(key)
+        if errors is None:
+            errors = self.single_flight.do(key, compute) if self.single_flight else compute()
+        return self._fresh_copy(errors)
+    
+    async def find_errors_async(self, submission: 'Submission', problem: 'Problem',
+                                evaluator_name: Optional[str] = None) -> List['ErrorDetail']:
+        """
+        Async variant of find_errors for callers running on an event loop.
+        
+        Evaluators that provide a native `find_errors_async` coroutine are awaited
+        directly; blocking evaluators are run on the loop's default thread pool
+        (see BaseEvaluator.find_errors_async).
+        
+        Args:
+            submission: The Submission object.
+            problem: The associated Problem object.
+            evaluator_name: Optional name of the evaluator to use.
+            
+        Returns:
+            List of errors found.
+        """
+        evaluator = self.get_evaluator(evaluator_name)
+        
+        async def run_evaluator() -> List['ErrorDetail']:
+            return await evaluator.find_errors_async(submission=submission, problem=problem)
+        
+        key = self._result_key(evaluator, submission, problem)
+        if key is None:
+            return await run_evaluator()
+        
+        async def compute() -> List['ErrorDetail']:
+            # The shared cache tier does blocking database I/O
+            errors = await asyncio.to_thread(self._lookup_errors, key)
+            if errors is None:
+                errors = await run_evaluator()
+                await asyncio.to_thread(self._store_errors, key, errors)
+            return errors
+        
+        errors = await asyncio.to_thread(self._lookup_errors, key)
+        if errors is None:
+            errors = await (self.single_flight.do_async(key, compute) if self.single_flight else compute())
+        return self._fresh_copy(errors)
+    
+    @staticmethod
+    def normalize_solution_text(solution_text: str) -> str:
+        """Collapse whitespace, which does not change the meaning of LaTeX."""
+        return " ".join((solution_text or "").split())
+    
+    def _result_key(self, evaluator: BaseEvaluator, submission: 'Submission',
+                    problem: 'Problem') -> Optional[str]:
+        """
+        Cache and single-flight key for a find_errors call, or None when both
+        are disabled.
+        
+        The problem statement is part of the key so editing a problem never
+        serves errors computed against the old statement.
+        """
+        if self.result_cache is None and self.single_flight is None:
+            return None
+        info = type(evaluator).get_evaluator_info()
+        material = "\0".join([
+            str(info.get("name")),
+            str(info.get("version")),
+            str(problem.id),
+            getattr(problem, "statement", "") or "",
+            self.normalize_solution_text(submission.solution_text),
+        ])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+    
+    def _lookup_errors(self, key: str) -> Optional[List['ErrorDetail']]:
+        if self.result_cache is None:
+            return None
+        errors = self.result_cache.get(key)
+        if errors is not None:
+            logger.info(f"find_errors cache hit ({key[:12]})")
+        return errors
+    
+    def _store_errors(self, key: str, errors: List['ErrorDetail']):
+        if self.result_cache is not None:
+            self.result_cache.set(key, copy.deepcopy(errors))
+    
+    @staticmethod
+    def _fresh_copy(errors: List['ErrorDetail']) -> List['ErrorDetail']:
+        """
+        Copy shared errors with new IDs and 'active' status, so appeals on one
+        submission never affect another.
+        """
+        errors = copy.deepcopy(errors)
+        for error in errors:
+            error["id"] = generate_error_id()
+            error["status"] = "active"
+        return errors
     
     # Updated evaluate signature
     def evaluate(self, submission: 'Submission', problem: 'Problem',
@@ -121,11 +270,58 @@ class EvaluatorRouter:
         evaluator = self.get_evaluator(evaluator_name)
         return evaluator.evaluate(submission=submission, problem=problem)
     
+    async def evaluate_async(self, submission: 'Submission', problem: 'Problem',
+                             evaluator_name: Optional[str] = None) -> 'EvaluationResult':
+        """Async variant of evaluate (native coroutine or thread adapter)."""
+        evaluator = self.get_evaluator(evaluator_name)
+        return await evaluator.evaluate_async(submission=submission, problem=problem)
+    
+    def evaluate_incremental(self, submission: 'Submission', problem: 'Problem',
+                             changes: List[ErrorStatusChange],
+                             previous: Optional[EvaluationResult] = None,
+                             evaluator_name: Optional[str] = None) -> EvaluationResult:
+        """
+        Update a previous evaluation result after error status changes.
+        
+        Args:
+            submission: The Submission object (contains current errors).
+            problem: The associated Problem object.
+            changes: Error status changes since `previous` (see utils.diff_error_statuses).
+            previous: The previous result, or None to evaluate from scratch.
+            evaluator_name: Optional name of the evaluator to use.
+            
+        Returns:
+            Evaluation result (score, feedback).
+        """
+        if previous is not None and not changes:
+            # Nothing changed since the previous result
+            return previous
+        evaluator = self.get_evaluator(evaluator_name)
+        if previous is None:
+            return evaluator.evaluate(submission=submission, problem=problem)
+        return evaluator.evaluate_incremental(submission=submission, problem=problem, changes=changes, previous=previous)
+    
+    async def evaluate_incremental_async(self, submission: 'Submission', problem: 'Problem',
+                                         changes: List[ErrorStatusChange],
+                                         previous: Optional[EvaluationResult] = None,
+                                         evaluator_name: Optional[str] = None) -> EvaluationResult:
+        """Async variant of evaluate_incremental (native coroutine or thread adapter)."""
+        if previous is not None and not changes:
+            return previous
+        evaluator = self.get_evaluator(evaluator_name)
+        if previous is None:
+            return await evaluator.evaluate_async(submission=submission, problem=problem)
+        return await evaluator.evaluate_incremental_async(submission=submission, problem=problem, changes=changes, previous=previous)
+    
     # Updated process_appeal signature
     def process_appeal(self, appeals: List['ErrorAppeal'], submission: 'Submission', 
                        problem: 'Problem', evaluator_name: Optional[str] = None) -> None:
         """
         Process a batch of appeals using the specified evaluator.
+
+        Evaluators implementing adjudicate_appeal get the concurrent batch
+        mode (each appealed error decided in parallel, bounded by the
+        evaluator's `appeal_concurrency`); others their own process_appeal.
         
         Args:
             appeals: List of appeal objects.
@@ -134,8 +330,25 @@ class EvaluatorRouter:
             evaluator_name: Optional name of the evaluator to use.
         """
         evaluator = self.get_evaluator(evaluator_name)
-        # process_appeal now returns None and modifies submission.errors directly
-        evaluator.process_appeal(appeals=appeals, submission=submission, problem=problem)
+        # Both modes return None and modify submission.errors directly
+        if evaluator.supports_concurrent_appeals():
+            evaluator.process_appeal_concurrently(appeals=appeals, submission=submission, problem=problem)
+        else:
+            evaluator.process_appeal(appeals=appeals, submission=submission, problem=problem)
+    
+    async def process_appeal_async(self, appeals: List['ErrorAppeal'], submission: 'Submission',
+                                   problem: 'Problem', evaluator_name: Optional[str] = None) -> None:
+        """
+        Async variant of process_appeal.
+        
+        A native `process_appeal_async` coroutine takes precedence; otherwise
+        the same mode as process_appeal runs in a thread.
+        """
+        evaluator = self.get_evaluator(evaluator_name)
+        if not evaluator.has_native_async("process_appeal") and evaluator.supports_concurrent_appeals():
+            await asyncio.to_thread(evaluator.process_appeal_concurrently, appeals=appeals, submission=submission, problem=problem)
+        else:
+            await evaluator.process_appeal_async(appeals=appeals, submission=submission, problem=problem)
     
     def get_evaluator_info(self, evaluator_name: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -0,0 +1,221 @@
+"""
+Single-flight coordination for duplicate evaluations.
+
+Concurrent calls with the same key are collapsed into one computation: the
+first caller (the leader) computes, the others wait for its result. Within a
+process this is done with futures; across processes (optional, only useful
+with the shared cache tier) the leader additionally holds a PostgreSQL
+advisory lock while computing, so leaders in other processes wait for it and
+then find the result in the shared cache tier.
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Backoff between pg_try_advisory_lock attempts while another process computes
+ADVISORY_LOCK_POLL_SECONDS = 0.05
+ADVISORY_LOCK_MAX_POLL_SECONDS = 1.0
+# Threads for the blocking lock calls of async callers, kept off the loop's
+# default executor so many waiting coroutines cannot starve it
+ADVISORY_LOCK_THREADS = 4
+
+_lock_executor: Optional[ThreadPoolExecutor] = None
+_lock_executor_lock = threading.Lock()
+
+def get_lock_executor() -> ThreadPoolExecutor:
+    """Return the bounded executor for advisory lock calls, creating it on first use."""
+    global _lock_executor
+    if _lock_executor is None:
+        with _lock_executor_lock:
+            if _lock_executor is None:
+                _lock_executor = ThreadPoolExecutor(max_workers=ADVISORY_LOCK_THREADS, thread_name_prefix="advisory-lock")
+    return _lock_executor
+
+class AdvisoryLock:
+    """
+    Session-level PostgreSQL advisory lock.
+
+    Waiters do not hold a connection: each attempt is one short
+    pg_try_advisory_lock call, and only the holder keeps its connection
+    until release. Pass an engine that is not the request/worker pool (e.g.
+    a NullPool engine), so lock holders never take connections from it.
+
+    Waiting is bounded by `timeout`; when it expires the caller proceeds
+    without the lock (a duplicate computation is better than a stuck worker).
+    """
+
+    def __init__(self, engine: Engine, key: str, timeout: float = 120):
+        self.engine = engine
+        # Advisory locks take a signed 64-bit key
+        self.lock_id = int.from_bytes(hashlib.sha256(key.encode("utf-8")).digest()[:8], "big", signed=True)
+        self.timeout = timeout
+        self._connection = None
+
+    def try_acquire(self) -> bool:
+        """One lock attempt. True if held, or if the database is unreachable (proceed without it)."""
+        try:
+            connection = self.engine.connect()
+        except Exception as e:
+            # Coordination is an optimization; never fail the evaluation over it
+            logger.warning(f"Could not connect for advisory lock {self.lock_id}; computing without it: {type(e).__name__}: {e}")
+            return True
+        try:
+            acquired = connection.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": self.lock_id}).scalar()
+        except Exception:
+            connection.close()
+            raise
+        if not acquired:
+            connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    def _poll_delays(self):
+        """Backoff delays until the timeout, then None."""
+        deadline = time.monotonic() + self.timeout
+        delay = ADVISORY_LOCK_POLL_SECONDS
+        while time.monotonic() < deadline:
+            yield min(delay, max(0.0, deadline - time.monotonic()))
+            delay = min(delay * 2, ADVISORY_LOCK_MAX_POLL_SECONDS)
+        logger.warning(f"Timed out waiting for advisory lock {self.lock_id}; computing without it")
+
+    def release(self):
+        if self._connection is None:
+            return
+        try:
+            self._connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": self.lock_id})
+            self._connection.commit()
+        finally:
+            # Closing the connection also releases the lock if the unlock failed
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self) -> "AdvisoryLock":
+        if self.try_acquire():
+            return self
+        for delay in self._poll_delays():
+            time.sleep(delay)
+            if self.try_acquire():
+                break
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    async def _try_acquire_async(self) -> bool:
+        executor = get_lock_executor()
+        attempt = asyncio.get_running_loop().run_in_executor(executor, self.try_acquire)
+        try:
+            return await asyncio.shield(attempt)
+        except asyncio.CancelledError:
+            # The attempt still runs; give the lock back if it ends up taking it
+            def release_if_acquired(done: "asyncio.Future"):
+                if not done.cancelled() and done.exception() is None and done.result():
+                    executor.submit(self.release)
+            attempt.add_done_callback(release_if_acquired)
+            raise
+
+    async def __aenter__(self) -> "AdvisoryLock":
+        if await self._try_acquire_async():
+            return self
+        for delay in self._poll_delays():
+            await asyncio.sleep(delay)
+            if await self._try_acquire_async():
+                break
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await asyncio.get_running_loop().run_in_executor(get_lock_executor(), self.release)
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one computation.
+
+    Args:
+        lock_factory: Optional callable returning a (sync and async) context
+            manager that serializes leaders across processes (e.g. AdvisoryLock).
+    """
+
+    def __init__(self, lock_factory: Optional[Callable[[str], Any]] = None):
+        self.lock_factory = lock_factory
+        self._calls: Dict[str, Future] = {}
+        self._async_calls: Dict[str, "asyncio.Future"] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run `fn` once for all concurrent callers with this key and return its result."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        if not leader:
+            logger.debug(f"Waiting on in-flight computation {key[:12]}")
+            return future.result()
+
+        try:
+            if self.lock_factory is not None:
+                with self.lock_factory(key):
+                    result = fn()
+            else:
+                result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Coroutine variant of `do` for callers on one event loop.
+
+        If the leader is cancelled, its followers do not inherit the
+        cancellation: one of them becomes the new leader.
+        """
+        while True:
+            future = self._async_calls.get(key)
+            if future is None:
+                break
+            try:
+                # shield: a cancelled follower must not cancel the leader's result
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    # This follower itself was cancelled
+                    raise
+                logger.debug(f"Leader of {key[:12]} was cancelled; retrying")
+
+        future = asyncio.get_running_loop().create_future()
+        self._async_calls[key] = future
+        try:
+            if self.lock_factory is not None:
+                # Lock calls run on a dedicated executor, see AdvisoryLock.__aenter__
+                async with self.lock_factory(key):
+                    result = await fn()
+            else:
+                result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            self._async_calls.pop(key, None)
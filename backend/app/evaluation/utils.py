@@ -2,9 +2,11 @@
 Utility functions for the evaluation system.
 """
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, List, Optional
 import uuid
 
+from app.evaluation.interfaces import ErrorStatusChange
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,6 +20,31 @@ def generate_error_id() -> str:
     return f"err-{uuid.uuid4()}"
 
 
+def diff_error_statuses(previous_statuses: Dict[str, Optional[str]], errors: Iterable[Dict[str, Any]]) -> List[ErrorStatusChange]:
+    """
+    Status changes of the errors listed in `previous_statuses`.
+
+    Args:
+        previous_statuses: Error ID -> status at the previous evaluation
+        errors: The current errors
+        
+    Returns:
+        One change per listed error whose status differs, in `errors` order
+    """
+    changes: List[ErrorStatusChange] = []
+    for error in errors:
+        if not isinstance(error, dict):
+            continue
+        error_id = str(error.get('id'))
+        if error_id in previous_statuses and previous_statuses[error_id] != error.get('status'):
+            changes.append({
+                "error_id": error_id,
+                "old_status": previous_statuses[error_id],
+                "new_status": error.get('status'),
+            })
+    return changes
+
+
 def is_valid_justification(justification: str) -> bool:
     """
     Check if a justification is valid for an appeal.
@@ -1,4 +1,5 @@
 import sys
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -9,8 +10,13 @@ from app.db import models # This imports the model definitions
 
 # Use the centralized settings from core.config
 from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER
 from app.api.v1.api import api_router
 from app.db.session import engine
+from app.core.rabbitmq import close_publisher
+from app.core.events import get_event_hub
+
+logger = logging.getLogger(__name__)
 
 # No need to call create_all here; handled by test setup/teardown or migrations
 
@@ -32,6 +38,8 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Let browser clients read the keyset pagination cursor
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 
 # Root endpoint
@@ -50,19 +58,14 @@ async def health_check():
 # This import happens *after* models are known to Base
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
-# Add other application setup like event handlers if needed
-# Example:
-# @app.on_event("startup")
-# async def startup_event():
-#     # Actions to perform on startup
-#     pass
-
-# Example startup event (uncomment and modify if needed)
-# @app.on_event("startup")
-# async def startup_event():
-#     print("Starting up...")
+@app.on_event("startup")
+def startup_event():
+    # The API no longer publishes to RabbitMQ (the outbox relay does), so no
+    # publisher is opened here; the queue health probe connects on demand.
+    # Fan out submission status NOTIFYs to event stream subscribers
+    get_event_hub().start()
 
-# Example shutdown event (uncomment and modify if needed)
-# @app.on_event("shutdown")
-# async def shutdown_event():
-#     print("Shutting down...")
+@app.on_event("shutdown")
+def shutdown_event():
+    close_publisher()
+    get_event_hub().stop()
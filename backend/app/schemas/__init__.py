@@ -6,10 +6,10 @@
 # Import other schema modules as they are created
 
 # Problem
-from .problem import Problem, ProblemCreate
+from .problem import Problem, ProblemCreate, ProblemUpdate
 
 # Submission
-from .submission import Submission, SubmissionCreate, AppealCreate, MultiAppealCreate
+from .submission import Submission, SubmissionCreate, SubmissionListItem, AppealCreate, ErrorAppeal, MultiAppealCreate
 
 # Submission (Keep if exists and relevant)
 # from .submission import Submission, SubmissionCreate, ...
@@ -14,6 +14,14 @@ class ProblemBase(BaseModel):
 class ProblemCreate(ProblemBase):
     pass # For now, identical to ProblemBase, but can add specific create fields later
 
+# Properties to receive on item update (only fields that are set are changed)
+class ProblemUpdate(BaseModel):
+    title: Optional[str] = None
+    statement: Optional[str] = None
+    difficulty: Optional[float] = None
+    topics: Optional[List[str]] = None
+    is_published: Optional[bool] = None
+
 # Properties shared by models stored in DB
 class ProblemInDBBase(ProblemBase):
     id: int
@@ -5,6 +5,7 @@ import enum
 
 # Replicate Enum from models for schema validation
 class SubmissionStatus(str, enum.Enum):
+    ocr_pending = "ocr_pending"
     pending = "pending"
     processing = "processing"
     appealing = "appealing"
@@ -17,7 +18,7 @@ class ErrorDetail(BaseModel):
     type: Optional[str] = None
     location: Optional[str] = None
     description: str
-    severity: Optional[bool] = None
+    severity: Optional[str] = None # e.g. low, medium, high
     status: Optional[str] = 'active'
 
 # Base properties shared by submission schemas
@@ -50,6 +51,22 @@ class SubmissionInDBBase(SubmissionBase):
 class Submission(SubmissionInDBBase):
     pass
 
+# Properties returned by the submission list. Only `id` is always present:
+# with `fields=` the list carries just the requested fields, and unset
+# fields are left out of the response (response_model_exclude_unset)
+class SubmissionListItem(BaseModel):
+    id: int
+    problem_id: Optional[int] = None
+    solution_text: Optional[str] = None
+    submitted_at: Optional[datetime] = None
+    status: Optional[SubmissionStatus] = None
+    score: Optional[int] = None
+    feedback: Optional[str] = None
+    errors: Optional[List[ErrorDetail]] = None
+    appeal_attempts: Optional[int] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
 # Optional: Properties stored directly in DB (if different from response)
 # class SubmissionInDB(SubmissionInDBBase):
 #     pass
@@ -0,0 +1,54 @@
+from app import crud, schemas
+from app.db.models.outbox import OutboxMessage
+from app.db.models.submission import SubmissionStatus
+
+
+def make_appealing_submission(db_session):
+    problem = crud.problem.create_problem(
+        db=db_session, problem_in=schemas.ProblemCreate(title="Appeals", statement="x", difficulty=1.0)
+    )
+    submission = crud.submission.create_submission(
+        db_session, submission_in=schemas.SubmissionCreate(problem_id=problem.id, solution_text="x = 1")
+    )
+    submission.status = SubmissionStatus.appealing
+    submission.errors = [
+        {"id": "e1", "description": "Step 2 does not follow", "severity": True, "status": "active"},
+        {"id": "e2", "description": "Typo", "severity": False, "status": "resolved"},
+    ]
+    db_session.commit()
+    return submission
+
+
+def test_appeal_is_queued_for_the_judge_worker(client, db_session):
+    submission = make_appealing_submission(db_session)
+    url = f"/api/v1/submissions/{submission.id}/appeals"
+    body = {"appeals": [
+        {"error_id": "e1", "justification": "correct"},
+        {"error_id": "e2", "justification": "already resolved"},
+    ]}
+
+    response = client.post(url, json=body)
+
+    assert response.status_code == 202
+    result = response.json()
+    assert result["status"] == "processing"
+    assert result["appeal_attempts"] == 1
+    assert [e["status"] for e in result["errors"]] == ["appealing", "resolved"]
+    # Only the appealable error is sent to the worker
+    message = db_session.query(OutboxMessage).filter(OutboxMessage.queue == "appeal_queue").one()
+    assert [a["error_id"] for a in message.payload["appeals"]] == ["e1"]
+
+    # Until the worker has decided the batch, no further appeals are accepted
+    assert client.post(url, json=body).status_code == 409
+
+
+def test_appeal_without_appealable_errors_is_rejected(client, db_session):
+    submission = make_appealing_submission(db_session)
+
+    response = client.post(
+        f"/api/v1/submissions/{submission.id}/appeals",
+        json={"appeals": [{"error_id": "e2", "justification": "already resolved"}]},
+    )
+
+    assert response.status_code == 400
+    assert db_session.query(OutboxMessage).filter(OutboxMessage.queue == "appeal_queue").count() == 0
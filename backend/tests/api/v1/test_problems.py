@@ -0,0 +1,61 @@
+from app import crud, schemas
+
+
+def test_problem_list_cursor_pagination(client, db_session):
+    ids = [
+        crud.problem.create_problem(
+            db=db_session, problem_in=schemas.ProblemCreate(title=f"P{i}", statement="x", difficulty=1.0)
+        ).id
+        for i in range(3)
+    ]
+
+    first = client.get("/api/v1/problems/", params={"limit": 2})
+    assert first.status_code == 200
+    assert [p["id"] for p in first.json()] == ids[:2]
+
+    second = client.get("/api/v1/problems/", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+    assert [p["id"] for p in second.json()] == ids[2:]
+    # A short page is the last one
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/api/v1/problems/", params={"cursor": "garbage"}).status_code == 400
+    assert client.get("/api/v1/submissions/", params={"cursor": "garbage"}).status_code == 400
+
+
+def test_problem_responses_are_revalidated_with_etags(client, db_session):
+    problem = crud.problem.create_problem(
+        db=db_session, problem_in=schemas.ProblemCreate(title="Cached", statement="x", difficulty=1.0)
+    )
+    url = f"/api/v1/problems/{problem.id}"
+
+    first = client.get(url)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"].startswith("public, max-age=")
+
+    again = client.get(url, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["ETag"] == etag
+    assert client.get(url, headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+
+    # Lists and other queries have their own validators
+    listing = client.get("/api/v1/problems/")
+    assert listing.headers["ETag"] != etag
+    assert client.get("/api/v1/problems/", headers={"If-None-Match": listing.headers["ETag"]}).status_code == 304
+    assert client.get("/api/v1/problems/?limit=1", headers={"If-None-Match": listing.headers["ETag"]}).status_code == 200
+
+    # Any problem write changes the catalog version, and with it every ETag
+    crud.problem.update_problem(db_session, problem_id=problem.id, problem_in=schemas.ProblemUpdate(title="Edited"))
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["title"] == "Edited"
+    assert changed.headers["ETag"] != etag
+
+
+def test_missing_problem_is_not_cacheable(client):
+    response = client.get("/api/v1/problems/999999")
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
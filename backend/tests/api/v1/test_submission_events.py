@@ -0,0 +1,83 @@
+import json
+import threading
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+from app.core import events
+from app.core.events import SubmissionEventHub
+from app.db.session import AsyncWorkerSession, SessionLocal
+from app.db.models.submission import SubmissionStatus
+
+
+@pytest.fixture
+def submission(db_session):
+    problem = crud.problem.create_problem(
+        db=db_session, problem_in=schemas.ProblemCreate(title="Events", statement="x + 1 = 2", difficulty=1.0)
+    )
+    return crud.submission.create_submission(
+        db_session, submission_in=schemas.SubmissionCreate(problem_id=problem.id, solution_text="x = 1")
+    )
+
+
+def read_events(body: str):
+    return [
+        json.loads(line[len("data: "):])
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+@pytest.mark.api
+def test_stream_ends_immediately_for_final_submission(client, db_session, submission):
+    crud.submission.update_submission_status(db_session, submission.id, SubmissionStatus.completed)
+
+    response = client.get(f"/api/v1/submissions/{submission.id}/events")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert read_events(response.text) == [{"submission_id": submission.id, "status": "completed"}]
+
+
+@pytest.mark.api
+def test_stream_pushes_status_transitions(client, db_session, submission):
+    submission_id = submission.id
+
+    def judge():
+        crud.submission.update_submission_status(db_session, submission_id, SubmissionStatus.processing)
+        crud.submission.update_submission_status(db_session, submission_id, SubmissionStatus.completed)
+
+    # The worker commits while the stream is open
+    threading.Timer(0.5, judge).start()
+    response = client.get(f"/api/v1/submissions/{submission_id}/events")
+
+    assert [e["status"] for e in read_events(response.text)] == ["pending", "processing", "completed"]
+
+
+@pytest.mark.api
+def test_stream_for_missing_submission_returns_404(client):
+    response = client.get("/api/v1/submissions/999999/events")
+
+    assert response.status_code == 404
+
+
+@pytest.mark.api
+@pytest.mark.parametrize("database_url, listen", [
+    ("postgresql://postgres:postgres@db:5432/mooj", False),
+    ("sqlite:///:memory:", True),
+])
+def test_hub_listens_only_when_enabled_on_postgres(database_url, listen):
+    hub = SubmissionEventHub(database_url, listen=listen)
+
+    hub.start()
+
+    assert hub._listener is None
+
+
+@pytest.mark.api
+def test_status_listeners_are_scoped_to_registered_factories():
+    for target in (SessionLocal, AsyncWorkerSession):
+        assert event.contains(target, "after_flush", events._collect_status_changes)
+    assert not event.contains(Session, "after_flush", events._collect_status_changes)
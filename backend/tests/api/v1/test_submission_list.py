@@ -0,0 +1,43 @@
+from app import crud, schemas
+
+
+def make_submissions(db_session, count):
+    problem = crud.problem.create_problem(
+        db=db_session, problem_in=schemas.ProblemCreate(title="List", statement="x", difficulty=1.0)
+    )
+    return [
+        crud.submission.create_submission(
+            db_session, submission_in=schemas.SubmissionCreate(problem_id=problem.id, solution_text="$x$" * 1000)
+        )
+        for _ in range(count)
+    ]
+
+
+def test_summary_fields_exclude_solution_text(client, db_session):
+    submissions = make_submissions(db_session, 3)
+
+    response = client.get("/api/v1/submissions/", params={"fields": "summary", "limit": 2})
+
+    assert response.status_code == 200
+    items = response.json()
+    assert [item["id"] for item in items] == [s.id for s in reversed(submissions)][:2]
+    assert set(items[0]) == {"id", "problem_id", "status", "score", "submitted_at", "appeal_attempts"}
+
+    # Cursors work the same way for projections
+    rest = client.get(
+        "/api/v1/submissions/",
+        params={"fields": "summary", "limit": 2, "cursor": response.headers["X-Next-Cursor"]},
+    ).json()
+    assert [item["id"] for item in rest] == [submissions[0].id]
+
+
+def test_fields_selector(client, db_session):
+    make_submissions(db_session, 1)
+
+    items = client.get("/api/v1/submissions/", params={"fields": "status"}).json()
+    assert set(items[0]) == {"id", "submitted_at", "status"}
+
+    full = client.get("/api/v1/submissions/").json()
+    assert "solution_text" in full[0] and "errors" in full[0]
+
+    assert client.get("/api/v1/submissions/", params={"fields": "status,password"}).status_code == 400
@@ -1,5 +1,9 @@
 import pytest
 import os
+
+# Tests run on SQLite; keep the app from opening a Postgres LISTEN connection
+os.environ.setdefault("SUBMISSION_EVENTS_LISTEN", "false")
+
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -8,6 +12,8 @@ from sqlalchemy.pool import StaticPool
 from app.main import app
 from app.db.base_class import Base
 from app.db.session import get_db
+from app.crud.problem import register_catalog_listeners
+from app.core.events import register_status_listeners
 
 # Use in-memory SQLite for all testing (simpler, no external dependencies)
 TEST_SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -32,6 +38,9 @@ engine = create_engine(
     poolclass=poolclass,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Test sessions track problem writes and announce status changes like SessionLocal's
+register_catalog_listeners(TestingSessionLocal)
+register_status_listeners(TestingSessionLocal)
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -90,4 +99,11 @@ def client(test_client):
 @pytest.fixture(scope="function")
 def db(db_session):
     """Alias for db_session for backward compatibility with existing tests."""
-    return db_session 
\ No newline at end of file
+    return db_session
+
+@pytest.fixture(autouse=True)
+def clear_problem_cache():
+    """Problem IDs are reused after each test's rollback; start every test with an empty catalog cache."""
+    from app.crud.problem import get_problem_cache
+    get_problem_cache().invalidate()
+    yield
@@ -0,0 +1,97 @@
+import time
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.cache import DatabaseCache, LRUCache, TieredCache, VersionedCache
+from app.db.models.cache import CacheEntry
+
+
+@pytest.fixture
+def database_cache(db_session):
+    # Sessions joined to the test transaction, so entries are rolled back
+    return DatabaseCache(lambda: Session(bind=db_session.get_bind()), ttl=60)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_entries_expire():
+    cache = LRUCache(max_entries=2, ttl=0.05)
+    cache.set("a", 1)
+    time.sleep(0.1)
+
+    assert cache.get("a", "missing") == "missing"
+
+
+def test_database_cache_round_trip(database_cache, db_session):
+    database_cache.set("ocr:abc", "x + 1 = 2")
+    database_cache.set("ocr:abc", "x + 1 = 3")
+
+    assert database_cache.get("ocr:abc") == "x + 1 = 3"
+    assert database_cache.get("ocr:missing") is None
+    assert db_session.query(CacheEntry).count() == 1
+
+
+def test_database_cache_ignores_expired_entries(db_session):
+    cache = DatabaseCache(lambda: Session(bind=db_session.get_bind()), ttl=-1)
+    cache.set("ocr:old", "stale")
+
+    assert cache.get("ocr:old") is None
+    assert cache.purge_expired() == 1
+
+
+def test_tiered_cache_backfills_local_tier(database_cache):
+    writer = TieredCache("ocr", LRUCache(), database_cache)
+    reader = TieredCache("ocr", LRUCache(), database_cache)
+    writer.set("abc", "\\frac{1}{2}")
+
+    # Another process sees the entry through the shared tier...
+    assert reader.get("abc") == "\\frac{1}{2}"
+    # ...and afterwards serves it locally
+    assert reader.local.get("abc") == "\\frac{1}{2}"
+    assert database_cache.get("ocr:abc") == "\\frac{1}{2}"
+
+
+def test_versioned_cache_drops_entries_when_version_changes():
+    versions = {"current": 1}
+    loads = []
+    cache = VersionedCache(lambda db: versions["current"], check_interval=0)
+
+    def load():
+        loads.append(1)
+        return len(loads)
+
+    assert cache.get_or_load(None, "k", load) == 1
+    assert cache.get_or_load(None, "k", load) == 1
+    versions["current"] = 2
+    assert cache.get_or_load(None, "k", load) == 2
+
+
+def test_versioned_cache_checks_version_at_most_every_interval():
+    reads = []
+    cache = VersionedCache(lambda db: reads.append(1) or 1, check_interval=60)
+
+    for _ in range(3):
+        cache.get_or_load(None, "k", lambda: "v")
+    assert len(reads) == 1
+
+    cache.invalidate()
+    cache.get_or_load(None, "k", lambda: "v")
+    assert len(reads) == 2
+
+
+def test_versioned_cache_does_not_store_none():
+    cache = VersionedCache(lambda db: 1)
+    assert cache.get_or_load(None, "k", lambda: None) is None
+    assert cache.get_or_load(None, "k", lambda: "v") == "v"
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+import pytest
+
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    submitted_at = datetime(2026, 10, 17, 13, 41, 9, 275518)
+    cursor = encode_cursor(submitted_at, 42)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, 2) == [submitted_at, 42]
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", encode_cursor(1, 2, 3), "e30"])
+def test_invalid_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, 2)
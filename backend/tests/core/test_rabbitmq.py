@@ -0,0 +1,73 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pika
+import pytest
+
+from app.core.rabbitmq import RabbitMQPublisher, PublishError, EVALUATION_QUEUE, DECLARED_QUEUES
+
+
+def make_publisher(pool_size: int = 2) -> RabbitMQPublisher:
+    return RabbitMQPublisher(pika.ConnectionParameters(host="localhost"), pool_size=pool_size, acquire_timeout=0.1)
+
+
+@pytest.fixture
+def blocking_connection():
+    """Patch pika.BlockingConnection with a factory of open mock connections."""
+    with patch("app.core.rabbitmq.pika.BlockingConnection") as factory:
+        def new_connection(params):
+            connection = MagicMock()
+            connection.is_open = True
+            connection.channel.return_value.is_open = True
+            return connection
+        factory.side_effect = new_connection
+        yield factory
+
+
+def test_publish_reuses_connection_and_declares_once(blocking_connection):
+    publisher = make_publisher()
+
+    publisher.publish(EVALUATION_QUEUE, {"submission_id": 1})
+    publisher.publish(EVALUATION_QUEUE, {"submission_id": 2})
+
+    assert blocking_connection.call_count == 1
+    connection = publisher._pool.get_nowait()
+    assert connection.channel.confirm_delivery.call_count == 1
+    assert connection.channel.queue_declare.call_count == len(DECLARED_QUEUES)
+    bodies = [json.loads(c.kwargs["body"]) for c in connection.channel.basic_publish.call_args_list]
+    assert bodies == [{"submission_id": 1}, {"submission_id": 2}]
+
+
+def test_publish_reconnects_after_dropped_channel(blocking_connection):
+    publisher = make_publisher(pool_size=1)
+    publisher.publish(EVALUATION_QUEUE, {"submission_id": 1})
+
+    stale = publisher._pool.get_nowait()
+    stale.channel.basic_publish.side_effect = pika.exceptions.StreamLostError("lost")
+    publisher._pool.put(stale)
+
+    publisher.publish(EVALUATION_QUEUE, {"submission_id": 2})
+
+    assert blocking_connection.call_count == 2
+    fresh = publisher._pool.get_nowait()
+    assert fresh is not stale
+    fresh.channel.basic_publish.assert_called_once()
+    # Queues are only declared on the very first connection
+    fresh.channel.queue_declare.assert_not_called()
+
+
+def test_publish_fails_when_broker_unreachable():
+    publisher = make_publisher(pool_size=1)
+    with patch("app.core.rabbitmq.pika.BlockingConnection", side_effect=pika.exceptions.AMQPConnectionError("down")):
+        with pytest.raises(PublishError):
+            publisher.publish(EVALUATION_QUEUE, {"submission_id": 1})
+    # The slot is returned to the pool so the next request can retry
+    assert publisher._pool.qsize() == 1
+
+
+def test_publish_fails_when_pool_exhausted(blocking_connection):
+    publisher = make_publisher(pool_size=1)
+    publisher._pool.get_nowait()
+
+    with pytest.raises(PublishError):
+        publisher.publish(EVALUATION_QUEUE, {"submission_id": 1})
@@ -0,0 +1,93 @@
+import pytest
+
+from app import crud, schemas
+from app.crud import outbox as outbox_crud
+from app.db.models.outbox import OutboxMessage
+
+
+@pytest.fixture
+def problem(db_session):
+    problem_in = schemas.ProblemCreate(title="Outbox", statement="x + 1 = 2", difficulty=1.0)
+    return crud.problem.create_problem(db=db_session, problem_in=problem_in)
+
+
+def create_submissions(db_session, problem, count):
+    return [
+        crud.submission.create_submission(
+            db_session, submission_in=schemas.SubmissionCreate(problem_id=problem.id, solution_text=f"x = {i}")
+        )
+        for i in range(count)
+    ]
+
+
+def test_create_submission_writes_outbox_message(db_session, problem):
+    submission = create_submissions(db_session, problem, 1)[0]
+
+    messages = db_session.query(OutboxMessage).all()
+    assert len(messages) == 1
+    assert messages[0].queue == "evaluation_queue"
+    assert messages[0].payload == {"submission_id": submission.id, "problem_id": problem.id}
+
+
+def test_relay_batch_publishes_in_order_and_deletes(db_session, problem):
+    submissions = create_submissions(db_session, problem, 3)
+    published = []
+
+    count, failed = outbox_crud.relay_batch(db_session, lambda q, p: published.append(p["submission_id"]), batch_size=2)
+
+    assert (count, failed) == (2, False)
+    assert published == [s.id for s in submissions[:2]]
+    assert db_session.query(OutboxMessage).count() == 1
+
+
+def test_relay_batch_keeps_message_when_publish_fails(db_session, problem):
+    create_submissions(db_session, problem, 2)
+
+    def broker_down(queue, payload):
+        raise ConnectionError("broker down")
+
+    count, failed = outbox_crud.relay_batch(db_session, broker_down)
+
+    assert (count, failed) == (0, True)
+    messages = db_session.query(OutboxMessage).order_by(OutboxMessage.id).all()
+    assert len(messages) == 2
+    assert messages[0].attempts == 1
+    assert "broker down" in messages[0].last_error
+    assert messages[1].attempts == 0
+
+
+def test_relay_batch_dead_letters_a_message_the_broker_keeps_refusing(db_session, problem):
+    poisoned, *rest = create_submissions(db_session, problem, 3)
+    published = []
+
+    def refuse_poisoned(queue, payload):
+        if payload["submission_id"] == poisoned.id:
+            raise ValueError("message refused")
+        published.append(payload["submission_id"])
+
+    # Below the attempt limit the failed row keeps its place
+    for _ in range(2):
+        assert outbox_crud.relay_batch(db_session, refuse_poisoned, max_attempts=3) == (0, True)
+    assert published == []
+
+    count, failed = outbox_crud.relay_batch(db_session, refuse_poisoned, max_attempts=3)
+
+    assert (count, failed) == (2, True)
+    assert published == [s.id for s in rest]
+    dead = db_session.query(OutboxMessage).one()
+    assert dead.attempts == 3
+    assert dead.dead_lettered_at is not None
+    # Dead letters are no longer relayed
+    assert outbox_crud.relay_batch(db_session, refuse_poisoned, max_attempts=3) == (0, False)
+
+
+def test_relay_batch_does_not_dead_letter_while_the_broker_is_down(db_session, problem):
+    create_submissions(db_session, problem, 2)
+
+    def broker_down(queue, payload):
+        raise ConnectionError("broker down")
+
+    for _ in range(3):
+        outbox_crud.relay_batch(db_session, broker_down, max_attempts=1)
+
+    assert db_session.query(OutboxMessage).filter(OutboxMessage.dead_lettered_at.isnot(None)).count() == 0
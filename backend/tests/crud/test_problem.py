@@ -0,0 +1,117 @@
+from types import SimpleNamespace
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+
+from app import crud, schemas
+from app.db.models.problem import Problem
+from app.db.session import SessionLocal
+
+
+def make_problem(db_session, title, topics):
+    problem_in = schemas.ProblemCreate(title=title, statement="x", difficulty=1.0, topics=topics)
+    return crud.problem.create_problem(db=db_session, problem_in=problem_in)
+
+
+def test_get_problems_filters_by_all_topics(db_session):
+    both = make_problem(db_session, "both", ["algebra", "proof"])
+    make_problem(db_session, "algebra only", ["algebra"])
+    make_problem(db_session, "untagged", None)
+
+    assert {p.title for p in crud.problem.get_problems(db_session, topics=["algebra"])} == {"both", "algebra only"}
+    assert [p.id for p in crud.problem.get_problems(db_session, topics=["proof", "algebra"])] == [both.id]
+    assert crud.problem.get_problems(db_session, topics=["geometry"]) == []
+    assert len(crud.problem.get_problems(db_session)) == 3
+
+
+def test_topics_filter_uses_jsonb_containment_on_postgresql():
+    # Only the dialect name of the session's bind is consulted
+    db = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=postgresql.dialect()))
+    condition = crud.problem.topics_filter(db, ["algebra", "proof"])
+
+    compiled = condition.compile(dialect=postgresql.dialect())
+    assert str(compiled) == "problems.topics @> %(param_1)s"
+    assert compiled.params == {"param_1": ["algebra", "proof"]}
+
+
+def test_topics_index_is_gin_on_postgresql():
+    index = next(i for i in Problem.__table__.indexes if i.name == "ix_problems_topics")
+    ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+
+    assert "USING gin (topics jsonb_path_ops)" in ddl
+    assert isinstance(Problem.__table__.c.topics.type.dialect_impl(postgresql.dialect()), postgresql.JSONB)
+
+
+def rename_behind_cache(db_session, problem_id, title):
+    # A raw write that skips the ORM listeners, like another process's commit before its bump is seen
+    db_session.connection().execute(
+        Problem.__table__.update().where(Problem.__table__.c.id == problem_id).values(title=title)
+    )
+    db_session.expire_all()
+
+
+def test_cached_problem_is_a_snapshot_served_from_cache(db_session):
+    problem = make_problem(db_session, "cached", ["algebra"])
+
+    snapshot = crud.problem.get_problem_cached(db_session, problem.id)
+    assert snapshot.title == "cached"
+    assert snapshot.topics == ("algebra",)
+
+    rename_behind_cache(db_session, problem.id, "renamed")
+    assert crud.problem.get_problem_cached(db_session, problem.id) is snapshot
+    assert crud.problem.get_problem_cached(db_session, problem.id + 1) is None
+
+
+def test_version_bump_from_another_process_invalidates(db_session):
+    problem = make_problem(db_session, "cached", None)
+    crud.problem.get_problem_cached(db_session, problem.id)
+    rename_behind_cache(db_session, problem.id, "renamed")
+    crud.problem.bump_catalog_version(db_session)
+
+    cache = crud.problem.get_problem_cache()
+    cache._checked_at -= cache.check_interval  # let the next read re-check the version
+    assert crud.problem.get_problem_cached(db_session, problem.id).title == "renamed"
+
+
+def test_writes_bump_the_version_and_refresh_the_cache(db_session):
+    problem = make_problem(db_session, "before", None)
+    version = crud.problem.read_catalog_version(db_session)
+    assert crud.problem.get_problems_cached(db_session)[0].title == "before"
+
+    crud.problem.update_problem(db_session, problem_id=problem.id, problem_in=schemas.ProblemUpdate(title="after"))
+    assert crud.problem.read_catalog_version(db_session) == version + 1
+    assert crud.problem.get_problems_cached(db_session)[0].title == "after"
+    assert crud.problem.get_problem_cached(db_session, problem.id).difficulty == 1.0
+
+    db_session.query(Problem).filter(Problem.id == problem.id).update({"is_published": True})
+    db_session.commit()
+    assert crud.problem.read_catalog_version(db_session) == version + 2
+    assert crud.problem.get_problem_cached(db_session, problem.id).is_published is True
+
+    assert crud.problem.delete_problem(db_session, problem_id=problem.id) is True
+    assert crud.problem.get_problem_cached(db_session, problem.id) is None
+    assert crud.problem.get_problems_cached(db_session) == []
+
+
+def test_unchanged_problem_does_not_bump_the_version(db_session):
+    problem = make_problem(db_session, "same", None)
+    version = crud.problem.read_catalog_version(db_session)
+
+    problem.title = "same"
+    db_session.commit()
+    assert crud.problem.read_catalog_version(db_session) == version
+
+
+def test_only_registered_session_factories_track_problem_writes(db_session):
+    problem = make_problem(db_session, "tracked", None)
+    version = crud.problem.read_catalog_version(db_session)
+
+    # Sessions outside SessionLocal (and the test factory) skip the bookkeeping
+    with Session(bind=db_session.connection()) as other:
+        other.get(Problem, problem.id).title = "untracked"
+        other.flush()
+        assert crud.problem.read_catalog_version(other) == version
+    assert event.contains(SessionLocal, "after_flush", crud.problem._track_problem_flush)
+    assert not event.contains(Session, "after_flush", crud.problem._track_problem_flush)
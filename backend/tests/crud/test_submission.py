@@ -0,0 +1,266 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import crud, schemas
+from app.db.models.submission import Submission, SubmissionStatus
+from app.db.models.outbox import OutboxMessage
+
+
+@pytest.fixture
+def problem(db_session):
+    problem_in = schemas.ProblemCreate(title="CRUD", statement="x + 1 = 2", difficulty=1.0)
+    return crud.problem.create_problem(db=db_session, problem_in=problem_in)
+
+
+def make_submission(db_session, problem, age_seconds: int = 0, status=SubmissionStatus.pending) -> Submission:
+    submission = crud.submission.create_submission(
+        db_session, submission_in=schemas.SubmissionCreate(problem_id=problem.id, solution_text="x = 1")
+    )
+    submission.submitted_at = datetime.utcnow() - timedelta(seconds=age_seconds)
+    submission.status = status
+    db_session.commit()
+    return submission
+
+
+def test_claim_stale_submissions(db_session, problem):
+    stale = make_submission(db_session, problem, age_seconds=600)
+    fresh = make_submission(db_session, problem, age_seconds=5)
+    done = make_submission(db_session, problem, age_seconds=600, status=SubmissionStatus.completed)
+
+    cutoff = datetime.utcnow() - timedelta(seconds=120)
+    claimed = crud.submission.claim_stale_submissions(db_session, pending_before=cutoff)
+
+    assert claimed == [stale.id]
+    db_session.expire_all()
+    assert db_session.get(Submission, stale.id).status == SubmissionStatus.processing
+    assert db_session.get(Submission, fresh.id).status == SubmissionStatus.pending
+    assert db_session.get(Submission, done.id).status == SubmissionStatus.completed
+    # Already claimed submissions are not handed out twice
+    assert crud.submission.claim_stale_submissions(db_session, pending_before=cutoff) == []
+
+
+def test_claim_stale_submissions_reclaims_abandoned_processing(db_session, problem):
+    abandoned = make_submission(db_session, problem, age_seconds=900, status=SubmissionStatus.processing)
+    abandoned.claimed_at = datetime.utcnow() - timedelta(seconds=800)
+    running = make_submission(db_session, problem, age_seconds=900, status=SubmissionStatus.processing)
+    running.claimed_at = datetime.utcnow() - timedelta(seconds=10)
+    appeal = make_submission(db_session, problem, age_seconds=900, status=SubmissionStatus.processing)
+    appeal.claimed_at = abandoned.claimed_at
+    appeal.appeal_attempts = 1
+    db_session.commit()
+
+    now = datetime.utcnow()
+    pending_before, processing_before = now - timedelta(seconds=120), now - timedelta(seconds=420)
+    claimed = crud.submission.claim_stale_submissions(
+        db_session, pending_before=pending_before, processing_before=processing_before
+    )
+
+    # Appeal rounds are recovered by redelivery of their message instead
+    assert claimed == [abandoned.id]
+    db_session.expire_all()
+    assert db_session.get(Submission, abandoned.id).claimed_at > processing_before
+    assert crud.submission.claim_stale_submissions(
+        db_session, pending_before=pending_before, processing_before=processing_before
+    ) == []
+
+
+def test_image_submission_goes_through_ocr_stage(db_session, problem):
+    submission = crud.submission.create_submission(
+        db_session,
+        submission_in=schemas.SubmissionCreate(problem_id=problem.id, solution_text=""),
+        image_data=b"\x89PNG fake image",
+    )
+    assert submission.status == SubmissionStatus.ocr_pending
+    assert [m.queue for m in db_session.query(OutboxMessage).all()] == ["ocr_queue"]
+    assert crud.submission.get_submission_image(db_session, submission.id) == b"\x89PNG fake image"
+
+    converted = crud.submission.complete_ocr(db_session, submission.id, "x = 1")
+
+    assert converted.status == SubmissionStatus.pending
+    assert converted.solution_text == "x = 1"
+    assert converted.image_data is None
+    assert [m.queue for m in db_session.query(OutboxMessage).order_by(OutboxMessage.id)] == ["ocr_queue", "evaluation_queue"]
+    # A redelivered OCR message does not forward the submission twice
+    assert crud.submission.complete_ocr(db_session, submission.id, "x = 1") is None
+    assert crud.submission.get_submission_image(db_session, submission.id) is None
+
+
+def test_failed_ocr_marks_evaluation_error(db_session, problem):
+    submission = crud.submission.create_submission(
+        db_session,
+        submission_in=schemas.SubmissionCreate(problem_id=problem.id, solution_text=""),
+        image_data=b"unreadable",
+    )
+
+    failed = crud.submission.fail_ocr(db_session, submission.id)
+
+    assert failed.status == SubmissionStatus.evaluation_error
+    assert failed.image_data is None
+
+
+def test_claim_submission_is_compare_and_set(db_session, problem):
+    submission = make_submission(db_session, problem)
+
+    claimed = crud.submission.claim_submission(db_session, submission.id)
+
+    assert claimed.status == SubmissionStatus.processing
+    # A second worker handed the same submission loses the race
+    assert crud.submission.claim_submission(db_session, submission.id) is None
+    # ...unless it is taking over a redelivered or swept submission
+    assert crud.submission.claim_submission(db_session, submission.id, reclaim=True).id == submission.id
+
+
+def test_update_submission_status_with_expected_status(db_session, problem):
+    submission = make_submission(db_session, problem, status=SubmissionStatus.appealing)
+
+    assert crud.submission.update_submission_status(
+        db_session, submission.id, SubmissionStatus.completed, expected_status=SubmissionStatus.processing
+    ) is None
+    updated = crud.submission.update_submission_status(
+        db_session, submission.id, SubmissionStatus.completed, expected_status=SubmissionStatus.appealing
+    )
+    assert updated.status == SubmissionStatus.completed
+    # Setting the current status again is a no-op, not a failure
+    assert crud.submission.update_submission_status(db_session, submission.id, SubmissionStatus.completed).id == submission.id
+    assert crud.submission.update_submission_status(db_session, 999999, SubmissionStatus.completed) is None
+
+
+def test_initial_evaluation_requires_processing(db_session, problem):
+    submission = make_submission(db_session, problem, status=SubmissionStatus.completed)
+    errors = [{"id": "e1", "type": "logical", "location": "l1", "description": "d", "severity": "high", "status": "active"}]
+
+    assert crud.submission.update_submission_after_initial_evaluation(
+        db_session, submission.id, errors, expected_status=SubmissionStatus.processing
+    ) is None
+
+    crud.submission.update_submission_status(db_session, submission.id, SubmissionStatus.processing)
+    updated = crud.submission.update_submission_after_initial_evaluation(
+        db_session, submission.id, errors, expected_status=SubmissionStatus.processing
+    )
+    assert updated.status == SubmissionStatus.appealing
+    assert updated.errors == errors
+
+
+def test_errors_are_stored_as_rows(db_session, problem):
+    submission = make_submission(db_session, problem, status=SubmissionStatus.processing)
+    other = make_submission(db_session, problem, status=SubmissionStatus.processing)
+    errors = [
+        {"id": "e1", "type": "logical", "location": "l1", "description": "gap", "severity": "high", "status": "active"},
+        {"id": "e2", "type": "calculation", "location": "l2", "description": "typo", "severity": "low", "status": "active"},
+    ]
+    crud.submission.update_submission_after_initial_evaluation(db_session, submission.id, errors)
+    crud.submission.update_submission_after_initial_evaluation(db_session, other.id, errors[:1])
+
+    # Evaluators edit the list in place and assign it back (see process_appeal)
+    appealed = submission.errors
+    appealed[0]["status"] = "rejected"
+    crud.submission.update_submission_after_appeal(db_session, submission.id, {"score": 50}, appealed)
+
+    db_session.expire_all()
+    assert db_session.get(Submission, submission.id).errors == [dict(errors[0], status="rejected"), errors[1]]
+    rejected = crud.submission.get_errors_for_problem(db_session, problem.id, status="rejected", error_type="logical")
+    assert [(e.submission_id, e.error_id) for e in rejected] == [(submission.id, "e1")]
+    assert len(crud.submission.get_errors_for_problem(db_session, problem.id, status="active")) == 2
+
+
+def test_error_severity_is_stored_as_string(db_session, problem):
+    submission = make_submission(db_session, problem, status=SubmissionStatus.processing)
+    errors = [
+        {"id": "e1", "description": "gap", "severity": "medium", "status": "active"},
+        # Legacy boolean severities from older evaluators
+        {"id": "e2", "description": "gap", "severity": True, "status": "active"},
+        {"id": "e3", "description": "typo", "severity": False, "status": "active"},
+    ]
+    crud.submission.update_submission_after_initial_evaluation(db_session, submission.id, errors)
+
+    db_session.expire_all()
+    assert [e["severity"] for e in db_session.get(Submission, submission.id).errors] == ["medium", "high", "low"]
+
+
+def test_keyset_pagination_matches_offset(db_session, problem):
+    # Two submissions share a timestamp; the id breaks the tie
+    submissions = [make_submission(db_session, problem, age_seconds=age) for age in (50, 40, 40, 30, 20)]
+    expected = [s.id for s in sorted(submissions, key=lambda s: (s.submitted_at, s.id), reverse=True)]
+
+    pages, after = [], None
+    while True:
+        page = crud.submission.get_submissions_for_problem(db_session, problem.id, limit=2, after=after)
+        if not page:
+            break
+        pages.append([s.id for s in page])
+        after = (page[-1].submitted_at, page[-1].id)
+
+    assert pages == [expected[0:2], expected[2:4], expected[4:5]]
+    assert [s.id for s in crud.submission.get_submissions_for_problem(db_session, problem.id, skip=2, limit=2)] == expected[2:4]
+
+
+def test_queue_appeal_and_store_verdict(db_session, problem):
+    submission = make_submission(db_session, problem, status=SubmissionStatus.appealing)
+    submission.errors = [{"id": "e1", "status": "active"}, {"id": "e2", "status": "active"}]
+    db_session.commit()
+    appeals = [schemas.ErrorAppeal(error_id="e2", justification="step 2 is fine")]
+
+    queued = crud.submission.queue_appeal(db_session, submission.id, appeals, max_attempts=3)
+
+    assert queued.status == SubmissionStatus.processing
+    assert queued.appeal_attempts == 1
+    assert [e["status"] for e in queued.errors] == ["active", "appealing"]
+    message = db_session.query(OutboxMessage).filter(OutboxMessage.queue == "appeal_queue").one()
+    assert message.payload == {
+        "submission_id": submission.id,
+        "appeal_attempt": 1,
+        "appeals": [{"error_id": "e2", "justification": "step 2 is fine", "image_justification": None}],
+        "error_statuses": {"e2": "active"},
+    }
+    # A second batch cannot be queued while this one is being judged
+    assert crud.submission.queue_appeal(db_session, submission.id, appeals, max_attempts=3) is None
+
+    errors = [{"id": "e1", "status": "active"}, {"id": "e2", "status": "resolved"}]
+    final_status = crud.submission.status_after_appeal(errors, queued.appeal_attempts, max_attempts=3)
+    store = lambda attempt: crud.submission.update_submission_after_appeal(
+        db_session, submission.id, {"score": 80, "feedback": "ok"}, errors,
+        status=final_status, expected_status=SubmissionStatus.processing, expected_attempts=attempt,
+    )
+    # A verdict for another appeal round is not stored
+    assert store(2) is None
+    updated = store(1)
+
+    assert updated.status == SubmissionStatus.appealing
+    assert updated.score == 80
+    assert [e["status"] for e in updated.errors] == ["active", "resolved"]
+    # Redelivered messages find the submission has moved on
+    assert store(1) is None
+
+
+def test_timed_out_appeal_is_released(db_session, problem):
+    submission = make_submission(db_session, problem, status=SubmissionStatus.appealing)
+    submission.errors = [{"id": "e1", "status": "active"}, {"id": "e2", "status": "rejected"}]
+    db_session.commit()
+    appeals = [schemas.ErrorAppeal(error_id="e2", justification="step 2 is fine")]
+    crud.submission.queue_appeal(db_session, submission.id, appeals, max_attempts=3)
+    payload = db_session.query(OutboxMessage).filter(OutboxMessage.queue == "appeal_queue").one().payload
+
+    # The worker gave up on the round before deciding it
+    released = crud.submission.release_timed_out_appeal(
+        db_session, submission.id, payload["appeal_attempt"], payload["error_statuses"], max_attempts=3
+    )
+
+    assert released.status == SubmissionStatus.appealing
+    assert released.appeal_attempts == 1
+    assert [e["status"] for e in released.errors] == ["active", "rejected"]
+    # A late verdict for the released round is not stored, nor is it released twice
+    assert crud.submission.update_submission_after_appeal(
+        db_session, submission.id, {"score": 80, "feedback": "ok"}, released.errors,
+        expected_status=SubmissionStatus.processing, expected_attempts=1,
+    ) is None
+    assert crud.submission.release_timed_out_appeal(db_session, submission.id, 1, {}, max_attempts=3) is None
+
+
+def test_status_after_appeal():
+    active = [{"id": "e1", "status": "active"}]
+    resolved = [{"id": "e1", "status": "resolved"}]
+
+    assert crud.submission.status_after_appeal(active, 1, max_attempts=3) == SubmissionStatus.appealing
+    assert crud.submission.status_after_appeal(active, 3, max_attempts=3) == SubmissionStatus.completed
+    assert crud.submission.status_after_appeal(resolved, 1, max_attempts=3) == SubmissionStatus.completed
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.config import settings
+from app.db.pool import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool, pool_status
+from app.db.session import engine_options
+
+def make_engine(tmp_path, pool_size=1, max_overflow=0, pool_timeout=5.0):
+    return create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+    )
+
+def test_pool_counts_checkouts_without_waits(tmp_path):
+    engine = make_engine(tmp_path, pool_size=2)
+    for _ in range(3):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    status = pool_status(engine.pool)
+    assert status["pool"] == "InstrumentedQueuePool"
+    assert status["checkouts"] == 3
+    assert status["waits"] == 0
+    assert status["checked_out"] == 0
+
+def test_pool_records_waits_on_exhaustion(tmp_path):
+    engine = make_engine(tmp_path, pool_size=1)
+    held = engine.connect()
+    waiting = threading.Event()
+
+    def checkout():
+        waiting.set()
+        with engine.connect():
+            pass
+
+    thread = threading.Thread(target=checkout)
+    thread.start()
+    waiting.wait()
+    # Give the second checkout time to block on the exhausted pool
+    thread.join(0.2)
+    held.close()
+    thread.join()
+
+    stats = pool_status(engine.pool)
+    assert stats["waits"] == 1
+    assert stats["wait_seconds_max"] > 0
+    assert stats["timeouts"] == 0
+
+def test_pool_records_timeouts(tmp_path):
+    engine = make_engine(tmp_path, pool_size=1, pool_timeout=0.05)
+    with engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    stats = pool_status(engine.pool)
+    assert stats["timeouts"] == 1
+    assert stats["waits"] == 1
+
+def test_pool_stats_survive_dispose(tmp_path):
+    engine = make_engine(tmp_path)
+    with engine.connect():
+        pass
+    engine.dispose()
+    with engine.connect():
+        pass
+
+    assert pool_status(engine.pool)["checkouts"] == 2
+
+def test_engine_options_by_role():
+    api = engine_options("postgresql://u:p@db/mooj", role="api")
+    worker = engine_options("postgresql://u:p@db/mooj", role="worker")
+
+    assert api["poolclass"] is InstrumentedQueuePool
+    assert api["pool_size"] == settings.DB_API_POOL_SIZE
+    assert worker["pool_size"] == settings.DB_WORKER_POOL_SIZE
+    assert api["connect_args"] == {"options": f"-c statement_timeout={settings.DB_API_STATEMENT_TIMEOUT_MS}"}
+
+def test_engine_options_async_uses_server_settings():
+    options = engine_options("postgresql+asyncpg://u:p@db/mooj", role="worker", is_async=True)
+
+    assert options["poolclass"] is InstrumentedAsyncAdaptedQueuePool
+    assert options["connect_args"] == {
+        "server_settings": {"statement_timeout": str(settings.DB_WORKER_STATEMENT_TIMEOUT_MS)}
+    }
+
+def test_engine_options_leave_sqlite_alone():
+    assert engine_options("sqlite:///:memory:") == {}
+
+def test_unknown_role_is_rejected():
+    with pytest.raises(ValueError):
+        settings.db_pool_profile("batch")
+
+def test_async_sessionmaker_runs_on_sqlite(tmp_path, monkeypatch):
+    from app.db import session
+
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{tmp_path / 'async.db'}")
+    monkeypatch.setattr(session, "_async_sessionmaker", None)
+    monkeypatch.setattr(session, "_async_engine", None)
+
+    async def query():
+        async with session.get_async_sessionmaker()() as db:
+            result = await db.scalar(text("SELECT 1"))
+        await session.get_async_engine().dispose()
+        return result
+
+    assert asyncio.run(query()) == 1
+    assert session.get_async_engine().url.drivername == "sqlite+aiosqlite"
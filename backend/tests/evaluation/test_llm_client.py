@@ -0,0 +1,228 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.evaluation.llm import ConcurrencyLimiter, LLMClient, LLMError, LLMNotConfigured, RetryPolicy, TokenBucket, get_llm_client
+from app.evaluation.router import EvaluatorRouter
+
+
+class StubLLMServer:
+    """Local HTTP/1.1 server answering JSON POSTs from a queue of canned responses."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.responses = []
+        self.requests = []
+        self.connections = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub.lock:
+                    stub.requests.append({"path": self.path, "body": body, "authorization": self.headers.get("Authorization")})
+                    stub.connections.add(self.client_address)
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    status, headers, payload = stub.responses.pop(0) if stub.responses else (200, {}, {"echo": body})
+                time.sleep(stub.delay)
+                with stub.lock:
+                    stub.in_flight -= 1
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubLLMServer()
+    yield server
+    server.close()
+
+
+def make_client(url, **kwargs):
+    kwargs.setdefault("retry", RetryPolicy(max_retries=3, base_delay=0.01, max_delay=0.05))
+    return LLMClient(url, api_key="secret", **kwargs)
+
+
+@pytest.mark.evaluation
+def test_requests_reuse_keepalive_connection(stub):
+    client = make_client(stub.url)
+
+    results = [client.post_json({"n": i}, path="chat") for i in range(5)]
+    client.close()
+
+    assert [r["echo"]["n"] for r in results] == list(range(5))
+    assert {r["path"] for r in stub.requests} == {"/v1/chat"}
+    assert {r["authorization"] for r in stub.requests} == {"Bearer secret"}
+    assert len(stub.connections) == 1
+
+
+@pytest.mark.evaluation
+def test_retryable_responses_are_retried(stub):
+    stub.responses = [(503, {}, {}), (429, {"Retry-After": "0"}, {}), (200, {}, {"ok": True})]
+    client = make_client(stub.url)
+
+    assert client.post_json({"q": 1}) == {"ok": True}
+    assert len(stub.requests) == 3
+    # Slots are released while backing off
+    assert client.concurrency.in_use == 0
+
+
+@pytest.mark.evaluation
+def test_client_errors_are_not_retried(stub):
+    stub.responses = [(400, {}, {"error": "bad request"})]
+    client = make_client(stub.url)
+
+    with pytest.raises(LLMError) as exc_info:
+        client.post_json({"q": 1})
+
+    assert exc_info.value.status_code == 400
+    assert len(stub.requests) == 1
+
+
+@pytest.mark.evaluation
+def test_retries_are_bounded(stub):
+    stub.responses = [(503, {}, {})] * 5
+    client = make_client(stub.url, retry=RetryPolicy(max_retries=2, base_delay=0.01))
+
+    with pytest.raises(LLMError) as exc_info:
+        client.post_json({"q": 1})
+
+    assert exc_info.value.status_code == 503
+    assert len(stub.requests) == 3
+
+
+@pytest.mark.evaluation
+def test_connection_errors_are_retried_then_raised():
+    client = make_client("http://127.0.0.1:9/v1", retry=RetryPolicy(max_retries=1, base_delay=0.01))
+
+    with pytest.raises(LLMError):
+        client.post_json({"q": 1})
+
+
+@pytest.mark.evaluation
+def test_missing_endpoint_raises_not_configured():
+    with pytest.raises(LLMNotConfigured):
+        LLMClient(None).post_json({"q": 1})
+
+
+@pytest.mark.evaluation
+def test_scoped_client_limits_concurrency_per_evaluator():
+    server = StubLLMServer(delay=0.05)
+    try:
+        client = make_client(server.url, max_concurrency=8)
+        scoped = client.scoped("slow", 2)
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            list(pool.map(lambda i: scoped.post_json({"n": i}), range(6)))
+    finally:
+        server.close()
+
+    assert len(server.requests) == 6
+    assert server.max_in_flight == 2
+    # Views of the same evaluator share its limit
+    assert client.scoped("slow", 5).limiter is scoped.limiter
+
+
+@pytest.mark.evaluation
+def test_async_requests_share_global_limit():
+    server = StubLLMServer(delay=0.05)
+
+    async def run():
+        client = make_client(server.url, max_concurrency=3)
+        try:
+            return await asyncio.gather(*(client.scoped("a", 4).post_json_async({"n": i}) for i in range(8)))
+        finally:
+            await client.aclose()
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        server.close()
+
+    assert sorted(r["echo"]["n"] for r in results) == list(range(8))
+    assert server.max_in_flight == 3
+
+
+@pytest.mark.evaluation
+def test_rate_limit_spaces_requests(stub):
+    client = make_client(stub.url, requests_per_second=20, burst=1)
+
+    start = time.perf_counter()
+    for i in range(5):
+        client.post_json({"n": i})
+    elapsed = time.perf_counter() - start
+
+    # The first request uses the burst token, the other four wait 50ms each
+    assert elapsed >= 0.18
+
+
+@pytest.mark.evaluation
+def test_token_bucket_reserves_in_arrival_order():
+    bucket = TokenBucket(rate=10, capacity=2)
+
+    delays = [bucket.reserve() for _ in range(4)]
+
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2] == pytest.approx(0.1, abs=0.02)
+    assert delays[3] == pytest.approx(0.2, abs=0.02)
+
+
+@pytest.mark.evaluation
+def test_concurrency_limiter_cancelled_waiter_does_not_leak_slot():
+    limiter = ConcurrencyLimiter(1)
+
+    async def run():
+        await limiter.acquire_async()
+        waiter = asyncio.ensure_future(limiter.acquire_async())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release()
+        # The slot is free again for the next caller
+        await asyncio.wait_for(limiter.acquire_async(), timeout=1)
+        limiter.release()
+
+    asyncio.run(run())
+
+    assert limiter.in_use == 0
+    assert limiter.acquire(timeout=0)
+
+
+@pytest.mark.evaluation
+def test_evaluators_get_a_scoped_shared_client():
+    router = EvaluatorRouter({"default_evaluator": "placeholder", "placeholder": {"llm_concurrency": 3}})
+
+    scoped = router.get_evaluator().llm_client()
+
+    assert scoped.client is get_llm_client()
+    assert scoped.limiter.limit == 3
@@ -0,0 +1,81 @@
+import time
+
+import pytest
+
+from app.core.cache import LRUCache
+from app.evaluation.image_to_latex import image_cache_key
+from app.evaluation.ocr_pool import OCRPool, OCRPoolSaturated, OCRTimeout
+
+
+# Module-level so the spawned worker processes can import them
+def echo_ocr(image_bytes: bytes) -> str:
+    return image_bytes.decode()
+
+
+def slow_ocr(image_bytes: bytes) -> str:
+    time.sleep(2)
+    return "slow"
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def factory(**kwargs):
+        pool = OCRPool(**kwargs)
+        pools.append(pool)
+        return pool
+
+    yield factory
+    for pool in pools:
+        pool.shutdown()
+
+
+@pytest.mark.evaluation
+def test_convert_runs_in_pool(make_pool):
+    pool = make_pool(max_workers=1, max_pending=2, timeout=30, func=echo_ocr)
+
+    assert pool.convert(b"x + 1 = 2") == "x + 1 = 2"
+    assert pool.convert(b"\\frac{a}{b}") == "\\frac{a}{b}"
+
+
+@pytest.mark.evaluation
+def test_saturated_pool_rejects_new_jobs(make_pool):
+    pool = make_pool(max_workers=1, max_pending=1, timeout=30, func=slow_ocr)
+    pool.submit(b"first")
+
+    with pytest.raises(OCRPoolSaturated):
+        pool.submit(b"second")
+
+
+@pytest.mark.evaluation
+def test_timed_out_job_keeps_its_slot(make_pool):
+    pool = make_pool(max_workers=1, max_pending=1, timeout=0.1, func=slow_ocr)
+
+    with pytest.raises(OCRTimeout):
+        pool.convert(b"image")
+    # The job is still running, so the pool stays saturated until it finishes
+    with pytest.raises(OCRPoolSaturated):
+        pool.submit(b"next")
+
+
+@pytest.mark.evaluation
+def test_cached_images_skip_the_pool(make_pool):
+    cache = LRUCache()
+    cache.set(image_cache_key(b"seen before"), "cached latex")
+    pool = make_pool(max_workers=1, max_pending=1, timeout=30, func=echo_ocr, cache=cache)
+
+    assert pool.convert(b"seen before") == "cached latex"
+    assert pool._executor is None  # No worker process was needed
+    assert pool.convert(b"new image") == "new image"
+    assert cache.get(image_cache_key(b"new image")) == "new image"
+
+
+@pytest.mark.evaluation
+def test_submit_can_wait_for_a_timed_out_job_to_finish(make_pool):
+    pool = make_pool(max_workers=1, max_pending=1, timeout=0.1, func=slow_ocr)
+
+    with pytest.raises(OCRTimeout):
+        pool.convert(b"image")
+    # The slot comes back once the timed-out job's process finishes
+    assert pool.submit(b"next", wait=10).result(timeout=10) == "slow"
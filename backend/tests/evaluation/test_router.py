@@ -0,0 +1,342 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.core.cache import LRUCache
+from app.evaluation.config import DEFAULT_EVALUATOR_CONFIG
+from app.evaluation.evaluators.base import BaseEvaluator
+from app.evaluation.router import EvaluatorRouter
+from app.evaluation.utils import diff_error_statuses
+
+
+def make_submission(solution_text: str, submission_id: int = 1):
+    return SimpleNamespace(id=submission_id, problem_id=1, solution_text=solution_text, errors=[])
+
+
+PROBLEM = SimpleNamespace(id=1, title="Test", statement="Prove it.")
+
+
+@pytest.mark.evaluation
+def test_find_errors_async_matches_sync():
+    """The async variant should run sync evaluators and return the same errors."""
+    router = EvaluatorRouter({"default_evaluator": "placeholder"})
+    submission = make_submission("this contains an error")
+
+    sync_errors = router.find_errors(submission=submission, problem=PROBLEM)
+    async_errors = asyncio.run(router.find_errors_async(submission=submission, problem=PROBLEM))
+
+    assert len(async_errors) == len(sync_errors) == 4
+    assert [e["description"] for e in async_errors] == [e["description"] for e in sync_errors]
+
+
+def make_cached_router(**cache_config):
+    return EvaluatorRouter({
+        "default_evaluator": "placeholder",
+        "result_cache": {"enabled": True, "max_entries": 16, "ttl_seconds": 60, **cache_config},
+    })
+
+
+@pytest.mark.evaluation
+def test_find_errors_reuses_cached_result_for_identical_solution():
+    router = make_cached_router()
+    evaluator = router.get_evaluator()
+
+    with patch.object(evaluator, "find_errors", wraps=evaluator.find_errors) as find_errors:
+        first = router.find_errors(submission=make_submission("x = 1 \\quad error"), problem=PROBLEM)
+        first[0]["status"] = "appealing"
+        # Whitespace-only differences normalize to the same solution
+        second = router.find_errors(submission=make_submission("  x = 1   \\quad\nerror "), problem=PROBLEM)
+
+    assert find_errors.call_count == 1
+    assert [e["description"] for e in second] == [e["description"] for e in first]
+    # Cached errors are handed out with fresh IDs and untouched status
+    assert {e["id"] for e in first}.isdisjoint(e["id"] for e in second)
+    assert all(e["status"] == "active" for e in second)
+
+
+@pytest.mark.evaluation
+def test_find_errors_cache_is_scoped_to_problem():
+    router = make_cached_router()
+    evaluator = router.get_evaluator()
+    other_problem = SimpleNamespace(id=2, title="Other", statement="Prove something else.")
+
+    with patch.object(evaluator, "find_errors", wraps=evaluator.find_errors) as find_errors:
+        router.find_errors(submission=make_submission("x = 1"), problem=PROBLEM)
+        router.find_errors(submission=make_submission("x = 1"), problem=other_problem)
+        router.find_errors(submission=make_submission("x = 2"), problem=PROBLEM)
+
+    assert find_errors.call_count == 3
+
+
+@pytest.mark.evaluation
+def test_find_errors_without_result_cache_always_evaluates():
+    router = EvaluatorRouter({"default_evaluator": "placeholder"})
+    evaluator = router.get_evaluator()
+
+    with patch.object(evaluator, "find_errors", wraps=evaluator.find_errors) as find_errors:
+        router.find_errors(submission=make_submission("x = 1"), problem=PROBLEM)
+        router.find_errors(submission=make_submission("x = 1"), problem=PROBLEM)
+
+    assert router.result_cache is None
+    assert find_errors.call_count == 2
+
+
+@pytest.mark.evaluation
+def test_default_config_keeps_caching_in_process():
+    router = EvaluatorRouter(DEFAULT_EVALUATOR_CONFIG)
+
+    # The shared database tier is opt-in
+    assert isinstance(router.result_cache, LRUCache)
+
+
+@pytest.mark.evaluation
+def test_distributed_single_flight_needs_the_shared_cache():
+    router = make_cached_router()
+    router = EvaluatorRouter({**router.config, "single_flight": {"enabled": True, "distributed": True}})
+
+    # Without the shared tier other processes could not read the leader's result
+    assert router.single_flight.lock_factory is None
+
+
+@pytest.mark.evaluation
+def test_concurrent_identical_find_errors_evaluate_once():
+    router = EvaluatorRouter({"default_evaluator": "placeholder", "single_flight": {"enabled": True, "distributed": False}})
+    evaluator = router.get_evaluator()
+    original = evaluator.find_errors
+
+    def slow_find_errors(**kwargs):
+        time.sleep(0.2)
+        return original(**kwargs)
+
+    with patch.object(evaluator, "find_errors", side_effect=slow_find_errors) as find_errors:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(
+                lambda _: router.find_errors(submission=make_submission("x = 1 error"), problem=PROBLEM),
+                range(4),
+            ))
+
+    assert find_errors.call_count == 1
+    assert len({e["id"] for errors in results for e in errors}) == sum(len(errors) for errors in results)
+
+
+def make_appealed_submission(count: int):
+    submission = make_submission("x = 1")
+    submission.errors = [{"id": f"e{i}", "description": "gap", "status": "appealing"} for i in range(count)]
+    return submission
+
+
+def make_appeals(count: int, justification: str = "this is correct"):
+    return [SimpleNamespace(error_id=f"e{i}", justification=justification) for i in range(count)]
+
+
+@pytest.mark.evaluation
+def test_process_appeal_adjudicates_errors_concurrently():
+    router = EvaluatorRouter({"default_evaluator": "placeholder", "placeholder": {"appeal_concurrency": 5}})
+    evaluator = router.get_evaluator()
+    submission = make_appealed_submission(5)
+    adjudicate = evaluator.adjudicate_appeal
+
+    def slow_adjudicate(appeal, error, submission, problem):
+        time.sleep(0.2)
+        return adjudicate(appeal, error, submission, problem)
+
+    with patch.object(evaluator, "adjudicate_appeal", side_effect=slow_adjudicate):
+        start = time.perf_counter()
+        router.process_appeal(appeals=make_appeals(5), submission=submission, problem=PROBLEM)
+        elapsed = time.perf_counter() - start
+
+    assert [e["status"] for e in submission.errors] == ["resolved"] * 5
+    # Five adjudications ran side by side, not one after another
+    assert elapsed < 0.6
+
+
+@pytest.mark.evaluation
+def test_concurrent_appeals_skip_errors_not_under_appeal():
+    router = EvaluatorRouter({"default_evaluator": "placeholder"})
+    submission = make_appealed_submission(2)
+    submission.errors[1]["status"] = "active"
+
+    router.process_appeal(appeals=make_appeals(3, "no"), submission=submission, problem=PROBLEM)
+
+    assert [e["status"] for e in submission.errors] == ["rejected", "active"]
+
+
+@pytest.mark.evaluation
+def test_failed_adjudication_applies_no_verdicts():
+    router = EvaluatorRouter({"default_evaluator": "placeholder"})
+    evaluator = router.get_evaluator()
+    submission = make_appealed_submission(3)
+
+    def flaky(appeal, error, submission, problem):
+        if appeal.error_id == "e1":
+            raise RuntimeError("provider unavailable")
+        return "resolved"
+
+    with patch.object(evaluator, "adjudicate_appeal", side_effect=flaky):
+        with pytest.raises(RuntimeError):
+            router.process_appeal(appeals=make_appeals(3), submission=submission, problem=PROBLEM)
+
+    assert [e["status"] for e in submission.errors] == ["appealing"] * 3
+
+
+def make_evaluated_submission(*statuses: str):
+    submission = make_submission("x = 1")
+    submission.errors = [{"id": f"e{i}", "description": "gap", "status": status} for i, status in enumerate(statuses)]
+    return submission
+
+
+@pytest.mark.evaluation
+def test_diff_error_statuses_lists_changed_errors_only():
+    submission = make_evaluated_submission("resolved", "rejected", "active")
+
+    changes = diff_error_statuses({"e0": "active", "e1": "rejected"}, submission.errors)
+
+    assert changes == [{"error_id": "e0", "old_status": "active", "new_status": "resolved"}]
+
+
+@pytest.mark.evaluation
+def test_incremental_evaluation_without_changes_keeps_previous_result():
+    router = EvaluatorRouter({"default_evaluator": "placeholder"})
+    evaluator = router.get_evaluator()
+    previous = {"score": 0, "feedback": "earlier"}
+
+    with patch.object(evaluator, "evaluate") as evaluate:
+        result = router.evaluate_incremental(submission=make_evaluated_submission("active"), problem=PROBLEM, changes=[], previous=previous)
+
+    assert result == previous
+    evaluate.assert_not_called()
+
+
+@pytest.mark.evaluation
+def test_incremental_evaluation_with_rejected_appeal_skips_full_evaluation():
+    router = EvaluatorRouter({"default_evaluator": "placeholder"})
+    evaluator = router.get_evaluator()
+    submission = make_evaluated_submission("rejected", "active")
+    changes = [{"error_id": "e0", "old_status": "active", "new_status": "rejected"}]
+
+    with patch.object(evaluator, "evaluate") as evaluate:
+        result = router.evaluate_incremental(submission=submission, problem=PROBLEM, changes=changes, previous={"score": 0, "feedback": "x"})
+
+    assert result["score"] == 0
+    evaluate.assert_not_called()
+
+
+@pytest.mark.evaluation
+def test_incremental_evaluation_rescans_when_blocking_error_is_resolved():
+    router = EvaluatorRouter({"default_evaluator": "placeholder"})
+    changes = [{"error_id": "e0", "old_status": "active", "new_status": "resolved"}]
+
+    still_blocked = router.evaluate_incremental(
+        submission=make_evaluated_submission("resolved", "active"), problem=PROBLEM, changes=changes, previous={"score": 0, "feedback": "x"}
+    )
+    cleared = router.evaluate_incremental(
+        submission=make_evaluated_submission("resolved", "resolved"), problem=PROBLEM, changes=changes, previous={"score": 0, "feedback": "x"}
+    )
+
+    assert still_blocked["score"] == 0
+    assert cleared["score"] == 100
+
+
+class NativeAsyncEvaluator(BaseEvaluator):
+    """Evaluator whose async methods are coroutines; its blocking ones must not be used."""
+
+    def __init__(self, config=None):
+        self.config = config or {}
+        self.threads = []
+
+    def find_errors(self, submission, problem):
+        raise AssertionError("blocking find_errors called")
+
+    def evaluate(self, submission, problem):
+        raise AssertionError("blocking evaluate called")
+
+    def process_appeal(self, appeals, submission, problem):
+        raise AssertionError("blocking process_appeal called")
+
+    async def find_errors_async(self, submission, problem):
+        self.threads.append(threading.get_ident())
+        await asyncio.sleep(0)
+        return [{"id": "n1", "description": "native", "status": "active"}]
+
+    async def evaluate_async(self, submission, problem):
+        self.threads.append(threading.get_ident())
+        return {"score": 42, "feedback": "native"}
+
+    async def process_appeal_async(self, appeals, submission, problem):
+        self.threads.append(threading.get_ident())
+        for error in submission.errors:
+            error["status"] = "resolved"
+
+    @classmethod
+    def get_evaluator_info(cls):
+        return {"name": "native", "version": "1.0.0", "description": "Native async", "capabilities": []}
+
+
+def make_native_router():
+    router = EvaluatorRouter({"default_evaluator": "native"})
+    router._evaluator_cache["native"] = NativeAsyncEvaluator()
+    return router
+
+
+@pytest.mark.evaluation
+def test_native_async_evaluator_is_awaited_on_the_loop():
+    router = make_native_router()
+    evaluator = router.get_evaluator()
+    submission = make_evaluated_submission("appealing")
+
+    async def run():
+        loop_thread = threading.get_ident()
+        errors = await router.find_errors_async(submission=make_submission("x"), problem=PROBLEM)
+        changes = [{"error_id": "e0", "old_status": "active", "new_status": "resolved"}]
+        await router.process_appeal_async(appeals=make_appeals(1), submission=submission, problem=PROBLEM)
+        result = await router.evaluate_incremental_async(submission=submission, problem=PROBLEM, changes=changes, previous={"score": 0, "feedback": "x"})
+        return loop_thread, errors, result
+
+    loop_thread, errors, result = asyncio.run(run())
+
+    assert [e["description"] for e in errors] == ["native"]
+    assert submission.errors[0]["status"] == "resolved"
+    # No incremental override: the native evaluate_async is used
+    assert result == {"score": 42, "feedback": "native"}
+    assert evaluator.threads == [loop_thread] * 3
+
+
+@pytest.mark.evaluation
+def test_sync_evaluator_runs_in_thread_from_async_callers():
+    router = EvaluatorRouter({"default_evaluator": "placeholder"})
+    evaluator = router.get_evaluator()
+    evaluate = evaluator.evaluate
+    threads = []
+
+    def record_thread(submission, problem):
+        threads.append(threading.get_ident())
+        return evaluate(submission=submission, problem=problem)
+
+    async def run():
+        submission = make_evaluated_submission("resolved")
+        with patch.object(evaluator, "evaluate", side_effect=record_thread):
+            result = await router.evaluate_async(submission=submission, problem=PROBLEM)
+        return threading.get_ident(), result
+
+    loop_thread, result = asyncio.run(run())
+
+    assert result["score"] == 100
+    assert threads and threads[0] != loop_thread
+
+
+@pytest.mark.evaluation
+def test_process_appeal_async_keeps_concurrent_mode_for_sync_evaluators():
+    router = EvaluatorRouter({"default_evaluator": "placeholder"})
+    evaluator = router.get_evaluator()
+    submission = make_appealed_submission(3)
+
+    with patch.object(evaluator, "process_appeal_concurrently", wraps=evaluator.process_appeal_concurrently) as concurrent:
+        asyncio.run(router.process_appeal_async(appeals=make_appeals(3), submission=submission, problem=PROBLEM))
+
+    concurrent.assert_called_once()
+    assert [e["status"] for e in submission.errors] == ["resolved"] * 3
@@ -0,0 +1,168 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.evaluation.single_flight import AdvisoryLock, SingleFlight
+
+
+@pytest.mark.evaluation
+def test_concurrent_calls_share_one_computation():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return ["result"]
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        leader = pool.submit(flight.do, "key", compute)
+        started.wait()
+        followers = [pool.submit(flight.do, "key", compute) for _ in range(4)]
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    # Once finished, the next call computes again
+    flight.do("key", compute)
+    assert len(calls) == 2
+
+
+@pytest.mark.evaluation
+def test_leader_failure_propagates_to_followers():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def compute():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("evaluator down")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flight.do, "key", compute)
+        started.wait()
+        follower = pool.submit(flight.do, "key", compute)
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError):
+                future.result()
+
+
+@pytest.mark.evaluation
+def test_async_calls_share_one_computation():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return ["result"]
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async("key", compute) for _ in range(5)))
+
+    results = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert results == [["result"]] * 5
+
+
+@pytest.mark.evaluation
+def test_cancelled_async_leader_hands_over_to_a_follower():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return ["result"]
+
+    async def main():
+        leader = asyncio.ensure_future(flight.do_async("key", compute))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(flight.do_async("key", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == ["result"]
+    # The follower became the leader and computed again
+    assert len(calls) == 2
+
+
+class FakeLockConnection:
+    def __init__(self, engine):
+        self.engine = engine
+        self.closed = False
+
+    def execute(self, statement, params):
+        if "pg_try_advisory_lock" in str(statement):
+            self.engine.attempts += 1
+            return SimpleNamespace(scalar=lambda: self.engine.attempts > self.engine.busy_attempts)
+        self.engine.unlocked = True
+        return SimpleNamespace(scalar=lambda: True)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        self.closed = True
+        self.engine.open_connections -= 1
+
+
+class FakeLockEngine:
+    """Advisory lock held elsewhere for the first `busy_attempts` tries."""
+
+    def __init__(self, busy_attempts: int):
+        self.busy_attempts = busy_attempts
+        self.attempts = 0
+        self.open_connections = 0
+        self.max_open_connections = 0
+        self.unlocked = False
+
+    def connect(self):
+        self.open_connections += 1
+        self.max_open_connections = max(self.max_open_connections, self.open_connections)
+        return FakeLockConnection(self)
+
+
+@pytest.mark.evaluation
+def test_advisory_lock_waiters_do_not_hold_connections():
+    engine = FakeLockEngine(busy_attempts=3)
+
+    with AdvisoryLock(engine, "key", timeout=5):
+        assert engine.attempts == 4
+        assert engine.open_connections == 1
+
+    assert engine.unlocked
+    assert engine.open_connections == 0
+    assert engine.max_open_connections == 1
+
+
+@pytest.mark.evaluation
+def test_advisory_lock_async_uses_dedicated_executor():
+    engine = FakeLockEngine(busy_attempts=2)
+    threads = set()
+    try_acquire = AdvisoryLock.try_acquire
+
+    def recording_try_acquire(lock):
+        threads.add(threading.current_thread().name)
+        return try_acquire(lock)
+
+    async def main():
+        with patch.object(AdvisoryLock, "try_acquire", recording_try_acquire):
+            async with AdvisoryLock(engine, "key", timeout=5):
+                assert engine.open_connections == 1
+
+    asyncio.run(main())
+
+    assert engine.open_connections == 0
+    assert all(name.startswith("advisory-lock") for name in threads)
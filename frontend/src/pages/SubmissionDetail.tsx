@@ -547,14 +547,20 @@ const SubmissionDetail: React.FC = () => {
   const theme = useTheme();
   const submissionId = Number(id);
   
+  // Status changes are pushed over Server-Sent Events; fall back to polling
+  // when the browser or the connection does not support the stream
+  const [streamUnavailable, setStreamUnavailable] = useState(typeof EventSource === 'undefined');
   const { data: submission, error: fetchError, isLoading: isFetchingSubmission, isFetching, refetch } = useGetSubmissionByIdQuery(
     submissionId, 
     {
       skip: isNaN(submissionId),
-      pollingInterval: 5000, // Re-enable polling
+      // While streaming, a slow poll is only a safety net for missed events
+      pollingInterval: streamUnavailable ? 5000 : 30000,
       refetchOnMountOrArgChange: true,
     }
   );
+  const currentStatusRef = useRef<SubmissionStatus | undefined>(undefined);
+  currentStatusRef.current = submission?.status;
   const [appealSubmissionBatch, { isLoading, error: appealError }] = useAppealSubmissionBatchMutation();
   const [acceptScore, { isLoading: isAccepting, error: acceptError }] = useAcceptScoreMutation();
 
@@ -569,8 +575,25 @@ const SubmissionDetail: React.FC = () => {
   };
 
   useEffect(() => {
-    // Optional: could stop polling explicitly if status becomes final
-  }, [submission?.status]);
+    if (isNaN(submissionId) || streamUnavailable) return;
+    let lastStatus: string | undefined;
+    const source = new EventSource(`/api/v1/submissions/${submissionId}/events`);
+    source.addEventListener('status', (event) => {
+      lastStatus = JSON.parse((event as MessageEvent).data).status;
+      // Events only carry the status; fetch the full submission when it changed
+      if (lastStatus !== currentStatusRef.current) {
+        refetch();
+      }
+    });
+    source.onerror = () => {
+      source.close();
+      // The server ends the stream once the submission is final; anything else is a failure
+      if (lastStatus !== SubmissionStatus.Completed && lastStatus !== SubmissionStatus.EvaluationError) {
+        setStreamUnavailable(true);
+      }
+    };
+    return () => source.close();
+  }, [submissionId, streamUnavailable, refetch]);
 
   const handleAppealBatchSubmit = async (appealsToSubmit: ErrorAppeal[], appealState: AppealState) => {
     if (!submission) return;
@@ -617,7 +640,7 @@ const SubmissionDetail: React.FC = () => {
           submission_id: submissionId, 
           appeal_batch: { appeals: processedAppeals } 
       }).unwrap();
-      handleShowSnackbar("Appeal batch submitted successfully!", 'success');
+      handleShowSnackbar("Appeal submitted. The verdicts will appear here once it has been judged.", 'success');
       refetch();
     } catch (err: any) {
       console.error("Failed to submit appeal batch:", err);
@@ -678,7 +701,7 @@ const SubmissionDetail: React.FC = () => {
     );
   }
 
-  const isBeingJudged = submission.status === SubmissionStatus.Pending || submission.status === SubmissionStatus.Processing;
+  const isBeingJudged = submission.status === SubmissionStatus.OcrPending || submission.status === SubmissionStatus.Pending || submission.status === SubmissionStatus.Processing;
   const isAwaitingUserAction = submission.status === SubmissionStatus.Appealing;
   const canAppealNow = isAwaitingUserAction && submission.appeal_attempts < 5;
   const maxAppealsReached = submission.appeal_attempts >= 5;
@@ -692,6 +715,7 @@ const SubmissionDetail: React.FC = () => {
               return 'processing';
           case SubmissionStatus.EvaluationError:
               return 'failed';
+          case SubmissionStatus.OcrPending:
           case SubmissionStatus.Pending:
               return 'pending';
           case SubmissionStatus.Processing:
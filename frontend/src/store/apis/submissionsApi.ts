@@ -1,5 +1,5 @@
 import { createApi, fetchBaseQuery } from '@reduxjs/toolkit/query/react';
-import { Submission, MultiAppealCreate } from '../../types/submission';
+import { Submission, SubmissionSummary, MultiAppealCreate } from '../../types/submission';
 
 export const submissionsApi = createApi({
   reducerPath: 'submissionsApi',
@@ -11,12 +11,14 @@ export const submissionsApi = createApi({
       providesTags: (result, error, id) => [{ type: 'Submission', id }],
     }),
     
-    getSubmissions: builder.query<Submission[], { skip?: number; limit?: number; problem_id?: number }>({
+    getSubmissions: builder.query<SubmissionSummary[], { skip?: number; limit?: number; problem_id?: number }>({
       query: ({ skip = 0, limit = 20, problem_id }) => {
         // Build query params
         const params = new URLSearchParams();
         params.append('skip', skip.toString());
         params.append('limit', limit.toString());
+        // List pages only show summary columns; skip solution text and errors
+        params.append('fields', 'summary');
         if (problem_id) {
           params.append('problem_id', problem_id.toString());
         }
@@ -2,6 +2,7 @@ import { Problem } from './problem'; // Import if needed for nested data later
 
 // Matches backend schema enum
 export enum SubmissionStatus {
+    OcrPending = "ocr_pending",
     Pending = "pending",
     Processing = "processing",
     Appealing = "appealing",
@@ -33,6 +34,12 @@ export interface Submission {
     // problem?: Problem; // Optional: Include if API response nests problem data
 }
 
+// Row of the submission list (GET /submissions/?fields=summary): no solution text or errors
+export type SubmissionSummary = Pick<
+    Submission,
+    'id' | 'problem_id' | 'submitted_at' | 'status' | 'score' | 'appeal_attempts'
+>;
+
 // Interface for data needed to create a submission (matches backend create schema)
 export interface SubmissionCreate {
     problem_id: number;
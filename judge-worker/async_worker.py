@@ -0,0 +1,356 @@
+"""
+asyncio-native judge worker.
+
+Alternative entry point to worker.py: consumes `evaluation_queue` and
+`appeal_queue` with aio-pika and judges submissions as coroutines on AsyncSession, so many network-bound
+evaluations share one event loop instead of one OS thread each.
+
+Run with: python async_worker.py
+"""
+import asyncio
+import json
+import os
+import sys
+import logging
+import signal
+from datetime import datetime, timedelta
+from typing import Dict, Any, Set
+
+import aio_pika
+
+# Configure logging first so we see everything
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger("judge-worker-async")
+
+# Add path to backend to be able to import modules
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend'))
+sys.path.append(backend_path)
+
+try:
+    from app.crud import submission as submission_crud
+    from app.crud import problem as problem_crud
+    from app.db.session import get_async_engine, get_async_sessionmaker
+    from app.db.pool import pool_status
+    from app.evaluation import default_router
+    from app.evaluation.utils import diff_error_statuses
+    from app.db.models.submission import SubmissionStatus
+    from app.schemas.submission import ErrorAppeal
+    from app.core.config import settings
+    from app.core.rabbitmq import APPEAL_QUEUE, EVALUATION_QUEUE
+    logger.info("All imports successful")
+except Exception as e:
+    logger.error(f"Failed to import modules: {e}", exc_info=True)
+    sys.exit(1)
+
+# Maximum number of submissions judged concurrently on the event loop. Each
+# job checks out a pooled connection while it reads or writes, so the default
+# matches this process's pool profile; raise the pool size along with it.
+_pool_profile = settings.db_pool_profile()
+ASYNC_WORKER_CONCURRENCY = max(1, int(os.getenv(
+    'ASYNC_WORKER_CONCURRENCY', _pool_profile["pool_size"] + _pool_profile["max_overflow"]
+)))
+PROCESSING_TIMEOUT_SECONDS = int(os.getenv('PROCESSING_TIMEOUT_SECONDS', 300))
+HEALTH_PORT = int(os.getenv('HEALTH_PORT', 8080))
+SWEEP_INTERVAL_SECONDS = int(os.getenv('SWEEP_INTERVAL_SECONDS', 30))
+SWEEP_GRACE_SECONDS = int(os.getenv('SWEEP_GRACE_SECONDS', 120))
+
+health_status = {
+    "connected": False,
+    "last_message_processed": None,
+    "messages_processed": 0,
+    "errors_encountered": 0,
+    "in_flight": 0,
+    "submissions_swept": 0,
+    "appeals_processed": 0,
+    "concurrency": ASYNC_WORKER_CONCURRENCY,
+    "started_at": datetime.now().isoformat()
+}
+
+async def process_submission(submission_id: int, reclaim: bool = False):
+    """
+    Async counterpart of worker.process_submission.
+
+    The sync crud functions are reused through AsyncSession.run_sync, which
+    runs them on the async driver without blocking the loop.
+    """
+    async with get_async_sessionmaker()() as session:
+        try:
+            # 1. Claim the submission; another worker may already have it
+            logger.info(f"Processing submission {submission_id}")
+            submission = await session.run_sync(submission_crud.claim_submission, submission_id, reclaim)
+            if not submission:
+                logger.warning(f"Submission {submission_id} not found or already claimed; skipping.")
+                return
+
+            # 2. Get the associated problem
+            problem = await session.run_sync(problem_crud.get_problem_cached, submission.problem_id)
+            if not problem:
+                logger.error(f"Problem {submission.problem_id} associated with submission {submission_id} not found.")
+                await session.run_sync(
+                    submission_crud.update_submission_status, submission_id, SubmissionStatus.evaluation_error
+                )
+                health_status["errors_encountered"] += 1
+                return
+
+            # Return the connection to the pool while the evaluator runs
+            await session.commit()
+
+            # 3. Find errors and store them
+            try:
+                errors = await default_router.find_errors_async(submission=submission, problem=problem)
+                logger.info(f"Found {len(errors)} errors for submission {submission_id}")
+                await session.run_sync(
+                    lambda s: submission_crud.update_submission_after_initial_evaluation(
+                        s, submission_id=submission_id, errors=errors, expected_status=SubmissionStatus.processing
+                    )
+                )
+                logger.info(f"Initial processing complete for submission {submission_id}.")
+            except Exception as e:
+                logger.error(f"Error during evaluation phase for submission {submission_id}: {type(e).__name__}: {str(e)}", exc_info=True)
+                await session.run_sync(
+                    submission_crud.update_submission_status, submission_id, SubmissionStatus.evaluation_error
+                )
+                health_status["errors_encountered"] += 1
+
+        except Exception as e:
+            logger.error(f"General error processing submission {submission_id}: {type(e).__name__}: {str(e)}", exc_info=True)
+            try:
+                await session.run_sync(
+                    submission_crud.update_submission_status, submission_id, SubmissionStatus.evaluation_error
+                )
+            except Exception as inner_e:
+                logger.error(f"Failed to update submission status to evaluation_error for {submission_id}: {str(inner_e)}")
+            health_status["errors_encountered"] += 1
+
+    health_status["messages_processed"] += 1
+    health_status["last_message_processed"] = datetime.now().isoformat()
+
+async def process_appeal(submission_id: int, message: Dict[str, Any]):
+    """Async counterpart of worker.process_appeal."""
+    appeal_attempt = message.get('appeal_attempt')
+    async with get_async_sessionmaker()() as session:
+        try:
+            submission = await session.run_sync(submission_crud.get_submission, submission_id)
+            if not submission or submission.status != SubmissionStatus.processing or submission.appeal_attempts != appeal_attempt:
+                logger.warning(f"Appeal {appeal_attempt} of submission {submission_id} is no longer awaited; skipping.")
+                return
+
+            problem = await session.run_sync(problem_crud.get_problem_cached, submission.problem_id)
+            if not problem:
+                logger.error(f"Problem {submission.problem_id} associated with submission {submission_id} not found.")
+                await session.run_sync(
+                    submission_crud.update_submission_status, submission_id, SubmissionStatus.evaluation_error, SubmissionStatus.processing
+                )
+                health_status["errors_encountered"] += 1
+                return
+
+            appeals = [ErrorAppeal(**appeal) for appeal in message.get('appeals', [])]
+            previous_statuses = message.get('error_statuses')
+            previous = None if previous_statuses is None else {"score": submission.score, "feedback": submission.feedback}
+            # Blocking evaluators run in a thread; load the error rows first,
+            # as lazy loads only work inside run_sync
+            await session.run_sync(lambda s: submission.error_rows)
+            # Return the connection to the pool while the evaluator runs
+            await session.commit()
+            await default_router.process_appeal_async(appeals=appeals, submission=submission, problem=problem)
+            changes = diff_error_statuses(previous_statuses or {}, submission.errors)
+            evaluation_result = await default_router.evaluate_incremental_async(
+                submission=submission, problem=problem, changes=changes, previous=previous
+            )
+
+            errors = submission.errors
+            final_status = submission_crud.status_after_appeal(errors, submission.appeal_attempts, settings.MAX_APPEAL_ATTEMPTS)
+            updated = await session.run_sync(
+                lambda s: submission_crud.update_submission_after_appeal(
+                    s, submission_id=submission_id, evaluation_result=evaluation_result, updated_errors=errors,
+                    status=final_status, expected_status=SubmissionStatus.processing, expected_attempts=appeal_attempt,
+                )
+            )
+            if updated:
+                logger.info(f"Appeal {appeal_attempt} of submission {submission_id} decided. Final status: {updated.status}")
+        except Exception as e:
+            logger.error(f"Error processing appeal {appeal_attempt} of submission {submission_id}: {type(e).__name__}: {str(e)}", exc_info=True)
+            try:
+                await session.run_sync(
+                    submission_crud.update_submission_status, submission_id, SubmissionStatus.evaluation_error, SubmissionStatus.processing
+                )
+            except Exception as inner_e:
+                logger.error(f"Failed to update submission status to evaluation_error for {submission_id}: {str(inner_e)}")
+            health_status["errors_encountered"] += 1
+
+    health_status["appeals_processed"] += 1
+    health_status["last_message_processed"] = datetime.now().isoformat()
+
+async def release_appeal(submission_id: int, message: Dict[str, Any]):
+    """Hand a timed-out appeal round back to the submitter (see release_timed_out_appeal)."""
+    async with get_async_sessionmaker()() as session:
+        await session.run_sync(
+            lambda s: submission_crud.release_timed_out_appeal(
+                s, submission_id, message.get('appeal_attempt'), message.get('error_statuses') or {},
+                settings.MAX_APPEAL_ATTEMPTS,
+            )
+        )
+
+async def handle_message(message: aio_pika.abc.AbstractIncomingMessage):
+    """
+    Judge one delivery and ack it. Malformed messages are acked and dropped;
+    unexpected failures are requeued.
+    """
+    health_status["in_flight"] += 1
+    try:
+        try:
+            payload = json.loads(message.body)
+        except json.JSONDecodeError:
+            logger.error(f"Failed to parse message: {message.body}")
+            await message.ack()
+            return
+
+        submission_id = payload.get('submission_id')
+        if not submission_id:
+            logger.error("Message doesn't contain submission_id")
+            await message.ack()
+            return
+
+        if message.routing_key == APPEAL_QUEUE:
+            job = process_appeal(submission_id, payload)
+        else:
+            job = process_submission(submission_id, reclaim=message.redelivered)
+        try:
+            await asyncio.wait_for(job, timeout=PROCESSING_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.error(f"Processing of submission {submission_id} timed out after {PROCESSING_TIMEOUT_SECONDS} seconds")
+            health_status["errors_encountered"] += 1
+            if message.routing_key == APPEAL_QUEUE:
+                # The sweeper only re-judges first evaluations; hand the
+                # appeal round back before its message is gone. If this
+                # fails the message is requeued below.
+                await release_appeal(submission_id, payload)
+        # Acknowledge the message - we've tried our best to process it
+        await message.ack()
+    except Exception as e:
+        logger.error(f"Error handling message: {type(e).__name__}: {str(e)}", exc_info=True)
+        health_status["errors_encountered"] += 1
+        await message.nack(requeue=True)
+    finally:
+        health_status["in_flight"] -= 1
+
+async def judge_swept_submission(submission_id: int):
+    """Judge a submission claimed by the sweeper (no queue message to ack)."""
+    health_status["in_flight"] += 1
+    try:
+        await asyncio.wait_for(process_submission(submission_id, reclaim=True), timeout=PROCESSING_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.error(f"Processing of submission {submission_id} timed out after {PROCESSING_TIMEOUT_SECONDS} seconds")
+        health_status["errors_encountered"] += 1
+    finally:
+        health_status["in_flight"] -= 1
+
+async def sweep_pending_submissions(spawn):
+    """
+    Periodically claim submissions stuck in 'pending' (their queue message
+    never arrived) or left 'processing' past the processing timeout, and
+    judge them with the loop's spare capacity.
+    """
+    while True:
+        await asyncio.sleep(SWEEP_INTERVAL_SECONDS)
+        free_slots = ASYNC_WORKER_CONCURRENCY - health_status["in_flight"]
+        if free_slots <= 0:
+            continue
+        now = datetime.utcnow()
+        pending_before = now - timedelta(seconds=SWEEP_GRACE_SECONDS)
+        processing_before = now - timedelta(seconds=PROCESSING_TIMEOUT_SECONDS + SWEEP_GRACE_SECONDS)
+        try:
+            async with get_async_sessionmaker()() as session:
+                submission_ids = await session.run_sync(
+                    lambda s: submission_crud.claim_stale_submissions(
+                        s, pending_before=pending_before, processing_before=processing_before, limit=free_slots
+                    )
+                )
+        except Exception as e:
+            logger.error(f"Sweeper failed to claim stale submissions: {type(e).__name__}: {str(e)}", exc_info=True)
+            continue
+        for submission_id in submission_ids:
+            logger.info(f"Sweeper picked up stale submission {submission_id}")
+            spawn(judge_swept_submission(submission_id))
+        health_status["submissions_swept"] += len(submission_ids)
+
+async def serve_health(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Minimal HTTP responder for the container health check."""
+    request_line = await reader.readline()
+    path = request_line.decode(errors='replace').split(' ')[1] if request_line.count(b' ') >= 2 else ''
+    if path == '/health':
+        engine = get_async_engine()
+        db_pool = pool_status(engine.pool) if engine is not None else None
+        body = json.dumps({**health_status, "db_pool": db_pool}).encode()
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n")
+        writer.write(f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+    else:
+        writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+    await writer.drain()
+    writer.close()
+
+async def main():
+    """
+    Connect to RabbitMQ and consume until SIGINT/SIGTERM.
+    """
+    shutdown = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, shutdown.set)
+
+    health_server = await asyncio.start_server(serve_health, '0.0.0.0', HEALTH_PORT)
+    logger.info(f"Health check server started on port {HEALTH_PORT}")
+
+    tasks: Set[asyncio.Task] = set()
+
+    def spawn(coro):
+        task = asyncio.create_task(coro)
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    async def on_message(message: aio_pika.abc.AbstractIncomingMessage):
+        # Run each delivery as its own task; prefetch bounds how many are alive
+        spawn(handle_message(message))
+
+    logger.info(f"Starting async judge worker with concurrency {ASYNC_WORKER_CONCURRENCY}...")
+    # connect_robust reconnects and restores the consumer after broker restarts
+    connection = await aio_pika.connect_robust(
+        host=os.getenv('RABBITMQ_HOST', 'rabbitmq'),
+        port=int(os.getenv('RABBITMQ_PORT', 5672)),
+        virtualhost=os.getenv('RABBITMQ_VHOST', '/'),
+        login=os.getenv('RABBITMQ_USER', 'guest'),
+        password=os.getenv('RABBITMQ_PASSWORD', 'guest'),
+    )
+    async with connection:
+        channel = await connection.channel()
+        # Channel-wide, so both consumers together stay within the bound
+        await channel.set_qos(prefetch_count=ASYNC_WORKER_CONCURRENCY, global_=True)
+        queues = [await channel.declare_queue(name, durable=True) for name in (EVALUATION_QUEUE, APPEAL_QUEUE)]
+        consumer_tags = [await queue.consume(on_message) for queue in queues]
+        health_status["connected"] = True
+        logger.info("Connected to RabbitMQ, waiting for messages...")
+        sweeper = asyncio.create_task(sweep_pending_submissions(spawn))
+
+        await shutdown.wait()
+        sweeper.cancel()
+
+        # Stop taking new work, then let in-flight submissions ack
+        logger.info("Shutting down async judge worker...")
+        for queue, consumer_tag in zip(queues, consumer_tags):
+            await queue.cancel(consumer_tag)
+        if tasks:
+            await asyncio.wait(tasks, timeout=PROCESSING_TIMEOUT_SECONDS)
+        health_status["connected"] = False
+
+    health_server.close()
+    await health_server.wait_closed()
+    logger.info("Async judge worker stopped")
+
+if __name__ == "__main__":
+    asyncio.run(main())
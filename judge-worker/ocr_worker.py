@@ -0,0 +1,213 @@
+"""
+OCR worker: the pipeline stage between image upload and evaluation.
+
+Consumes `ocr_queue`, converts the stored image of each 'ocr_pending'
+submission to LaTeX in a process pool, then stores the text and forwards the
+submission to `evaluation_queue` (through the outbox) in one transaction.
+Scale this service independently of the judge workers to match OCR load.
+
+Run with: python ocr_worker.py
+"""
+import pika
+import json
+import time
+import os
+import sys
+import logging
+import signal
+import functools
+from concurrent.futures import ThreadPoolExecutor, Future
+
+# Configure logging first so we see everything
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger("ocr-worker")
+
+# Add path to backend to be able to import modules
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend'))
+sys.path.append(backend_path)
+
+try:
+    from app.crud import submission as submission_crud
+    from app.db.session import SessionLocal
+    from app.core.rabbitmq import OCR_QUEUE
+    from app.evaluation.ocr_pool import OCRPool, OCRPoolSaturated, OCRTimeout
+    from app.evaluation.image_to_latex import get_ocr_cache
+    from app.core.config import settings
+    logger.info("All imports successful")
+except Exception as e:
+    logger.error(f"Failed to import modules: {e}", exc_info=True)
+    sys.exit(1)
+
+# One conversion per pool process; prefetch matches so RabbitMQ never hands
+# us more images than we can convert at once
+OCR_CONCURRENCY = max(1, settings.OCR_POOL_WORKERS)
+
+ocr_pool: OCRPool = None
+executor: ThreadPoolExecutor = None
+# Conversions not yet settled with the broker
+in_flight = set()
+
+shutdown_flag = False
+
+def signal_handler(sig, frame):
+    """Handle termination signals for graceful shutdown"""
+    global shutdown_flag
+    logger.info(f"Received signal {sig}, initiating graceful shutdown")
+    shutdown_flag = True
+
+signal.signal(signal.SIGINT, signal_handler)
+signal.signal(signal.SIGTERM, signal_handler)
+
+def process_image(submission_id: int):
+    """
+    Convert a submission's image and forward it to evaluation.
+
+    Unreadable images and OCR timeouts mark the submission as
+    evaluation_error. Database errors, and a pool still busy with timed-out
+    jobs, propagate so the message is requeued.
+    """
+    db = SessionLocal()
+    try:
+        image_data = submission_crud.get_submission_image(db, submission_id)
+        if not image_data:
+            logger.warning(f"Submission {submission_id} has no image awaiting OCR; skipping")
+            return
+
+        logger.info(f"Running OCR for submission {submission_id} ({len(image_data)} bytes)")
+        try:
+            # A job that timed out keeps its pool slot until its process is
+            # done, so wait for one instead of failing a valid image
+            solution_text = ocr_pool.convert(image_data, wait=settings.OCR_TIMEOUT_SECONDS)
+        except OCRPoolSaturated:
+            logger.warning(f"OCR pool still busy for submission {submission_id}; requeueing")
+            raise
+        except OCRTimeout as e:
+            logger.error(f"OCR timed out for submission {submission_id}: {e}")
+            solution_text = None
+        except Exception as e:
+            logger.error(f"OCR failed for submission {submission_id}: {type(e).__name__}: {str(e)}", exc_info=True)
+            solution_text = None
+
+        if not solution_text:
+            submission_crud.fail_ocr(db, submission_id)
+            return
+        submission_crud.complete_ocr(db, submission_id, solution_text)
+    finally:
+        db.close()
+
+def settle_message(ch, delivery_tag: int, future: Future):
+    """Ack a finished delivery, or requeue it if processing raised. Runs on the connection thread."""
+    in_flight.discard(future)
+    if not ch.is_open:
+        # RabbitMQ will redeliver the message
+        logger.warning(f"Channel closed before delivery {delivery_tag} could be settled")
+        return
+    if future.exception() is not None:
+        logger.error(f"Requeueing OCR message after error: {future.exception()}")
+        ch.basic_nack(delivery_tag=delivery_tag, requeue=True)
+    else:
+        ch.basic_ack(delivery_tag=delivery_tag)
+
+def callback(ch, method, properties, body):
+    """
+    Hand the image to the converter pool and return immediately, so the
+    connection thread keeps servicing heartbeats while OCR runs.
+    """
+    try:
+        message = json.loads(body)
+    except json.JSONDecodeError:
+        logger.error(f"Failed to parse message: {body}")
+        ch.basic_ack(delivery_tag=method.delivery_tag)
+        return
+
+    submission_id = message.get('submission_id')
+    if not submission_id:
+        logger.error("Message doesn't contain submission_id")
+        ch.basic_ack(delivery_tag=method.delivery_tag)
+        return
+
+    connection = ch.connection
+    future = executor.submit(process_image, submission_id)
+    in_flight.add(future)
+
+    def on_done(done: Future):
+        try:
+            connection.add_callback_threadsafe(functools.partial(settle_message, ch, method.delivery_tag, done))
+        except Exception as e:
+            # Connection already closed; the message will be redelivered
+            logger.warning(f"Could not schedule ack for submission {submission_id}: {e}")
+
+    future.add_done_callback(on_done)
+
+def main():
+    """
+    Consume `ocr_queue` until asked to stop, reconnecting on broker errors.
+    """
+    global ocr_pool, executor
+    retry_delay = 5
+
+    ocr_pool = OCRPool(
+        max_workers=OCR_CONCURRENCY,
+        max_pending=OCR_CONCURRENCY,
+        timeout=settings.OCR_TIMEOUT_SECONDS,
+        # Identical images (retries, duplicate uploads) skip Tesseract
+        cache=get_ocr_cache(),
+    )
+    try:
+        ocr_pool.cache.shared.purge_expired()
+    except Exception as e:
+        logger.warning(f"Could not purge expired OCR cache entries: {e}")
+    executor = ThreadPoolExecutor(max_workers=OCR_CONCURRENCY, thread_name_prefix="ocr")
+    logger.info(f"Starting OCR worker with concurrency {OCR_CONCURRENCY}...")
+
+    while not shutdown_flag:
+        connection = None
+        try:
+            connection = pika.BlockingConnection(pika.ConnectionParameters(
+                host=settings.RABBITMQ_HOST,
+                port=settings.RABBITMQ_PORT,
+                virtual_host=settings.RABBITMQ_VHOST,
+                credentials=pika.PlainCredentials(settings.RABBITMQ_USER, settings.RABBITMQ_PASSWORD),
+                connection_attempts=3,
+                retry_delay=2,
+                socket_timeout=5
+            ))
+            channel = connection.channel()
+            channel.queue_declare(queue=OCR_QUEUE, durable=True)
+            channel.basic_qos(prefetch_count=OCR_CONCURRENCY)
+            channel.basic_consume(queue=OCR_QUEUE, on_message_callback=callback)
+            logger.info("Connected to RabbitMQ, waiting for images...")
+
+            while not shutdown_flag:
+                connection.process_data_events(time_limit=1)
+
+            # Stop taking new work and let running conversions settle
+            channel.cancel()
+            deadline = time.time() + settings.OCR_TIMEOUT_SECONDS
+            while in_flight and time.time() < deadline:
+                connection.process_data_events(time_limit=1)
+        except pika.exceptions.AMQPError as e:
+            logger.warning(f"RabbitMQ connection failed: {type(e).__name__}: {str(e)}; retrying in {retry_delay} seconds")
+            time.sleep(retry_delay)
+        except Exception as e:
+            logger.error(f"Unexpected error: {type(e).__name__}: {str(e)}", exc_info=True)
+            time.sleep(retry_delay)
+        finally:
+            if connection and not connection.is_closed:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+
+    executor.shutdown(wait=False)
+    ocr_pool.shutdown()
+    logger.info("OCR worker stopped")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Outbox relay: drains `outbox_messages` to RabbitMQ in batches.
+
+The API writes queue messages to the outbox in the same transaction as the
+submission, so POST /submissions never waits on the broker. This process
+publishes them with publisher confirms and deletes them once confirmed.
+
+Run with: python outbox_relay.py
+"""
+import os
+import sys
+import time
+import signal
+import logging
+
+# Configure logging first so we see everything
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger("outbox-relay")
+
+# Add path to backend to be able to import modules
+backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../backend'))
+sys.path.append(backend_path)
+
+try:
+    from app.crud import outbox as outbox_crud
+    from app.db.session import SessionLocal
+    from app.core.rabbitmq import get_publisher
+    logger.info("All imports successful")
+except Exception as e:
+    logger.error(f"Failed to import modules: {e}", exc_info=True)
+    sys.exit(1)
+
+BATCH_SIZE = int(os.getenv('OUTBOX_RELAY_BATCH_SIZE', 100))
+# Seconds to sleep when the outbox is empty
+POLL_INTERVAL = float(os.getenv('OUTBOX_RELAY_POLL_INTERVAL', 0.5))
+# Seconds to back off after a failed publish (broker down)
+ERROR_BACKOFF = float(os.getenv('OUTBOX_RELAY_ERROR_BACKOFF', 5))
+# Failed publishes after which a message no longer blocks the ones behind it
+MAX_ATTEMPTS = int(os.getenv('OUTBOX_RELAY_MAX_ATTEMPTS', 5))
+
+shutdown_flag = False
+
+def signal_handler(sig, frame):
+    """Handle termination signals for graceful shutdown"""
+    global shutdown_flag
+    logger.info(f"Received signal {sig}, initiating graceful shutdown")
+    shutdown_flag = True
+
+signal.signal(signal.SIGINT, signal_handler)
+signal.signal(signal.SIGTERM, signal_handler)
+
+def main():
+    """
+    Relay outbox messages until asked to stop.
+    """
+    publisher = get_publisher()
+    logger.info(f"Starting outbox relay (batch size {BATCH_SIZE})...")
+
+    while not shutdown_flag:
+        db = SessionLocal()
+        try:
+            published, failed = outbox_crud.relay_batch(db, publisher.publish, batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS)
+        except Exception as e:
+            logger.error(f"Relay iteration failed: {type(e).__name__}: {str(e)}", exc_info=True)
+            published, failed = 0, True
+        finally:
+            db.close()
+
+        if failed:
+            time.sleep(ERROR_BACKOFF)
+        elif published < BATCH_SIZE:
+            # Outbox drained; poll again shortly
+            time.sleep(POLL_INTERVAL)
+
+    publisher.close()
+    logger.info("Outbox relay stopped")
+
+if __name__ == "__main__":
+    main()
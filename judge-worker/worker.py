@@ -4,10 +4,12 @@ import time
 import os
 import sys
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, Any
 import signal
 import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor, Future
 
 # Configure logging first so we see everything
 logging.basicConfig(
@@ -36,24 +38,56 @@ try:
     logger.info("Importing problem_crud")
     from app.crud import problem as problem_crud
     logger.info("Importing SessionLocal")
-    from app.db.session import SessionLocal
+    from app.db.session import SessionLocal, engine
+    from app.db.pool import pool_status
     logger.info("Importing default_router")
     from app.evaluation import default_router
+    from app.evaluation.utils import diff_error_statuses
     logger.info("Importing SubmissionStatus")
     from app.db.models.submission import SubmissionStatus
+    from app.schemas.submission import ErrorAppeal
+    from app.core.config import settings
+    from app.core.rabbitmq import APPEAL_QUEUE, EVALUATION_QUEUE
     logger.info("All imports successful")
 except Exception as e:
     logger.error(f"Failed to import modules: {e}", exc_info=True)
     sys.exit(1)
 
+# Number of submissions judged concurrently by this process. The channel
+# prefetch is matched to it so RabbitMQ never delivers more than we can run.
+WORKER_CONCURRENCY = max(1, int(os.getenv('WORKER_CONCURRENCY', 4)))
+# Time after which an in-flight submission is given up on and its message acked
+PROCESSING_TIMEOUT_SECONDS = int(os.getenv('PROCESSING_TIMEOUT_SECONDS', 300))
+# The sweeper judges submissions left 'pending' for longer than the grace
+# period, e.g. because the broker or the outbox relay was down, and
+# re-judges those left 'processing' for longer than the processing timeout
+# plus the grace period (their worker died or gave up on them)
+SWEEP_INTERVAL_SECONDS = int(os.getenv('SWEEP_INTERVAL_SECONDS', 30))
+SWEEP_GRACE_SECONDS = int(os.getenv('SWEEP_GRACE_SECONDS', 120))
+
 # Global health status
 health_status = {
     "connected": False,
     "last_message_processed": None,
     "messages_processed": 0,
     "errors_encountered": 0,
+    "in_flight": 0,
+    # Jobs given up on after PROCESSING_TIMEOUT_SECONDS that still hold a pool thread
+    "timed_out": 0,
+    "submissions_swept": 0,
+    "appeals_processed": 0,
+    "concurrency": WORKER_CONCURRENCY,
     "started_at": datetime.now().isoformat()
 }
+# Submissions are processed on pool threads, so counter updates need a lock
+health_lock = threading.Lock()
+
+# Pool running process_submission; created in main()
+executor: ThreadPoolExecutor = None
+
+# Connection and channel currently consuming; set in main()
+consumer_connection = None
+consumer_channel = None
 
 # Set to True to initiate a graceful shutdown
 shutdown_flag = False
@@ -68,29 +102,37 @@ def signal_handler(sig, frame):
 signal.signal(signal.SIGINT, signal_handler)
 signal.signal(signal.SIGTERM, signal_handler)
 
-def process_submission(submission_id: int):
+def record_error():
+    """Increment the error counter from any thread."""
+    with health_lock:
+        health_status["errors_encountered"] += 1
+
+def process_submission(submission_id: int, reclaim: bool = False):
     """
-    Process a submission: set status to processing, find errors,
+    Process a submission: claim it (pending -> processing), find errors,
     and update status to appealing or completed based on errors.
     Sets status to evaluation_error on failure.
+
+    `reclaim` also accepts a submission already in 'processing' (claimed by
+    the sweeper, or a redelivered message whose first worker died).
     """
     db = SessionLocal()
     try:
-        # 1. Update submission status to processing
+        # 1. Claim the submission; another worker may already have it
         logger.info(f"Processing submission {submission_id}")
-        updated_submission = submission_crud.update_submission_status(db, submission_id, SubmissionStatus.processing)
+        updated_submission = submission_crud.claim_submission(db, submission_id, reclaim=reclaim)
         if not updated_submission:
-            logger.error(f"Submission {submission_id} not found for processing.")
+            logger.warning(f"Submission {submission_id} not found or already claimed; skipping.")
             return
 
         # 2. Get submission and associated problem details
         submission = updated_submission
-        problem = problem_crud.get_problem(db, submission.problem_id)
+        problem = problem_crud.get_problem_cached(db, submission.problem_id)
         if not problem:
             logger.error(f"Problem {submission.problem_id} associated with submission {submission_id} not found.")
             # Mark submission as error since we can't proceed without problem context
             submission_crud.update_submission_status(db, submission_id, SubmissionStatus.evaluation_error)
-            health_status["errors_encountered"] += 1
+            record_error()
             return
 
         # 3. Use evaluator to find errors
@@ -106,7 +148,8 @@ def process_submission(submission_id: int):
             submission_crud.update_submission_after_initial_evaluation(
                 db=db,
                 submission_id=submission_id,
-                errors=errors
+                errors=errors,
+                expected_status=SubmissionStatus.processing
             )
             logger.info(f"Initial processing complete for submission {submission_id}.")
 
@@ -114,7 +157,7 @@ def process_submission(submission_id: int):
             # Error during find_errors or the subsequent DB update
             logger.error(f"Error during evaluation phase for submission {submission_id}: {type(e).__name__}: {str(e)}", exc_info=True)
             submission_crud.update_submission_status(db, submission_id, SubmissionStatus.evaluation_error)
-            health_status["errors_encountered"] += 1
+            record_error()
 
     except Exception as e:
         # Catch-all for errors like DB connection issues before evaluation starts
@@ -124,17 +167,163 @@ def process_submission(submission_id: int):
             submission_crud.update_submission_status(db, submission_id, SubmissionStatus.evaluation_error)
         except Exception as inner_e:
             logger.error(f"Failed to update submission status to evaluation_error for {submission_id}: {str(inner_e)}")
-        health_status["errors_encountered"] += 1
+        record_error()
     finally:
         if db:
             db.close()
 
-    health_status["messages_processed"] += 1
-    health_status["last_message_processed"] = datetime.now().isoformat()
+    with health_lock:
+        health_status["messages_processed"] += 1
+        health_status["last_message_processed"] = datetime.now().isoformat()
+
+def process_appeal(submission_id: int, message: Dict[str, Any]):
+    """
+    Decide an appeal batch queued by the API: adjudicate the appealed errors,
+    re-evaluate, and store score, errors and the final status (appealing or
+    completed) in one compare-and-set against the appeal round the message
+    was queued for. Sets status to evaluation_error on failure.
+    """
+    appeal_attempt = message.get('appeal_attempt')
+    db = SessionLocal()
+    try:
+        submission = submission_crud.get_submission(db, submission_id)
+        if not submission or submission.status != SubmissionStatus.processing or submission.appeal_attempts != appeal_attempt:
+            logger.warning(f"Appeal {appeal_attempt} of submission {submission_id} is no longer awaited; skipping.")
+            return
+
+        problem = problem_crud.get_problem_cached(db, submission.problem_id)
+        if not problem:
+            logger.error(f"Problem {submission.problem_id} associated with submission {submission_id} not found.")
+            submission_crud.update_submission_status(db, submission_id, SubmissionStatus.evaluation_error, expected_status=SubmissionStatus.processing)
+            record_error()
+            return
+
+        appeals = [ErrorAppeal(**appeal) for appeal in message.get('appeals', [])]
+        # Messages queued before error_statuses existed get a full re-evaluation
+        previous_statuses = message.get('error_statuses')
+        previous = None if previous_statuses is None else {"score": submission.score, "feedback": submission.feedback}
+        logger.info(f"Routing appeal batch of submission {submission_id} ({len(appeals)} item(s)) to evaluator.")
+        default_router.process_appeal(appeals=appeals, submission=submission, problem=problem)
+        changes = diff_error_statuses(previous_statuses or {}, submission.errors)
+        evaluation_result = default_router.evaluate_incremental(submission=submission, problem=problem, changes=changes, previous=previous)
+
+        errors = submission.errors
+        final_status = submission_crud.status_after_appeal(errors, submission.appeal_attempts, settings.MAX_APPEAL_ATTEMPTS)
+        updated = submission_crud.update_submission_after_appeal(
+            db=db,
+            submission_id=submission_id,
+            evaluation_result=evaluation_result,
+            updated_errors=errors,
+            status=final_status,
+            expected_status=SubmissionStatus.processing,
+            expected_attempts=appeal_attempt,
+        )
+        if updated:
+            logger.info(f"Appeal {appeal_attempt} of submission {submission_id} decided. Final status: {updated.status}")
+    except Exception as e:
+        logger.error(f"Error processing appeal {appeal_attempt} of submission {submission_id}: {type(e).__name__}: {str(e)}", exc_info=True)
+        try:
+            submission_crud.update_submission_status(db, submission_id, SubmissionStatus.evaluation_error, expected_status=SubmissionStatus.processing)
+        except Exception as inner_e:
+            logger.error(f"Failed to update submission status to evaluation_error for {submission_id}: {str(inner_e)}")
+        record_error()
+    finally:
+        db.close()
+
+    with health_lock:
+        health_status["appeals_processed"] += 1
+        health_status["last_message_processed"] = datetime.now().isoformat()
+
+def release_appeal(submission_id: int, message: Dict[str, Any]) -> bool:
+    """
+    Hand a timed-out appeal round back to the submitter (see
+    release_timed_out_appeal). Returns False if that failed.
+    """
+    db = SessionLocal()
+    try:
+        submission_crud.release_timed_out_appeal(
+            db, submission_id, message.get('appeal_attempt'), message.get('error_statuses') or {},
+            settings.MAX_APPEAL_ATTEMPTS,
+        )
+        return True
+    except Exception as e:
+        logger.error(f"Failed to release timed-out appeal of submission {submission_id}: {type(e).__name__}: {str(e)}", exc_info=True)
+        return False
+    finally:
+        db.close()
+
+def finish_in_flight(_: Future):
+    with health_lock:
+        health_status["in_flight"] -= 1
+
+def run_in_pool(fn, *args) -> Future:
+    """Run a judging job on the worker pool, tracking in-flight work."""
+    with health_lock:
+        health_status["in_flight"] += 1
+    future = executor.submit(fn, *args)
+    future.add_done_callback(finish_in_flight)
+    return future
+
+def run_submission(submission_id: int, reclaim: bool = False) -> Future:
+    """Judge a submission on the worker pool, tracking in-flight work."""
+    return run_in_pool(process_submission, submission_id, reclaim)
+
+def update_prefetch():
+    """
+    Match the channel prefetch to the pool threads not held by timed-out
+    jobs, so RabbitMQ never delivers more than the pool can start. Must run
+    on the connection thread.
+    """
+    with health_lock:
+        free_threads = WORKER_CONCURRENCY - health_status["timed_out"]
+    if consumer_channel is not None and consumer_channel.is_open:
+        # Shared by both consumers; never 0, which would mean unlimited
+        consumer_channel.basic_qos(prefetch_count=max(1, free_threads), global_qos=True)
+
+def schedule_prefetch_update():
+    """Run update_prefetch on the connection thread; callable from any thread."""
+    try:
+        consumer_connection.add_callback_threadsafe(update_prefetch)
+    except Exception as e:
+        # Closed; main() sets the prefetch again when it reconnects
+        logger.warning(f"Could not schedule prefetch update: {e}")
+
+def ack_message(ch, delivery_tag: int, delivery: Dict[str, Any]):
+    """
+    Acknowledge a delivery exactly once. Must run on the connection thread.
+    """
+    if delivery["acked"]:
+        return
+    delivery["acked"] = True
+    if ch.is_open:
+        ch.basic_ack(delivery_tag=delivery_tag)
+    else:
+        # The channel died while we were judging; RabbitMQ will redeliver the message
+        logger.warning(f"Channel closed before delivery {delivery_tag} could be acked")
+
+def nack_message(ch, delivery_tag: int, delivery: Dict[str, Any]):
+    """Requeue a delivery unless it was already settled. Must run on the connection thread."""
+    if delivery["acked"]:
+        return
+    delivery["acked"] = True
+    if ch.is_open:
+        ch.basic_nack(delivery_tag=delivery_tag, requeue=True)
 
 def callback(ch, method, properties, body):
     """
-    Process messages from RabbitMQ
+    Process messages from RabbitMQ.
+
+    The submission (or, from appeal_queue, the appeal batch) is handed to
+    the worker pool and this callback returns immediately, so the connection
+    thread keeps servicing heartbeats and deliveries. The message is acked
+    from the connection thread via add_callback_threadsafe once the job
+    finishes, which also cancels its timeout.
+
+    A job still running after PROCESSING_TIMEOUT_SECONDS is acked and given
+    up on, but its pool thread cannot be reclaimed, so the prefetch is
+    lowered until the job ends. The sweeper re-judges the submission if the
+    job never stores a result; a timed-out appeal round is handed back to
+    the submitter before its message is acked (requeued if that fails).
     """
     try:
         message = json.loads(body)
@@ -145,19 +334,64 @@ def callback(ch, method, properties, body):
             logger.error("Message doesn't contain submission_id")
             ch.basic_ack(delivery_tag=method.delivery_tag)
             return
-            
-        # Process the submission in a separate thread
-        process_thread = threading.Thread(target=process_submission, args=(submission_id,))
-        process_thread.start()
-        process_thread.join(timeout=300)  # 5 minute timeout for processing
-        
-        if process_thread.is_alive():
-            logger.error(f"Processing of submission {submission_id} timed out after 5 minutes")
-            health_status["errors_encountered"] += 1
-            # Let the thread continue in the background
-        
-        # Acknowledge the message - we've tried our best to process it
-        ch.basic_ack(delivery_tag=method.delivery_tag)
+
+        connection = ch.connection
+        delivery = {"acked": False, "timed_out": False}
+        ack = functools.partial(ack_message, ch, method.delivery_tag, delivery)
+        nack = functools.partial(nack_message, ch, method.delivery_tag, delivery)
+
+        def complete():
+            connection.remove_timeout(timer)
+            ack()
+
+        def on_done(_: Future):
+            with health_lock:
+                timed_out = delivery["timed_out"]
+                if timed_out:
+                    health_status["timed_out"] -= 1
+            if timed_out:
+                # The pool thread is free again
+                schedule_prefetch_update()
+            try:
+                connection.add_callback_threadsafe(complete)
+            except Exception as e:
+                # Connection already closed; the message will be redelivered
+                logger.warning(f"Could not schedule ack for submission {submission_id}: {e}")
+
+        def on_timeout():
+            with health_lock:
+                if future.done():
+                    return
+                delivery["timed_out"] = True
+                health_status["timed_out"] += 1
+            logger.error(f"Processing of submission {submission_id} timed out after {PROCESSING_TIMEOUT_SECONDS} seconds")
+            record_error()
+            # The pool thread is left to finish in the background, so take
+            # one fewer message until it does.
+            update_prefetch()
+            if method.routing_key != APPEAL_QUEUE:
+                # Acknowledge the message - we've tried our best to process it
+                ack()
+                return
+
+            def hand_back():
+                # The sweeper only re-judges first evaluations, so release
+                # the appeal round before its message is gone
+                settle = ack if release_appeal(submission_id, message) else nack
+                try:
+                    connection.add_callback_threadsafe(settle)
+                except Exception as e:
+                    logger.warning(f"Could not settle timed-out appeal of submission {submission_id}: {e}")
+
+            # Off the connection thread; the pool may have no free thread
+            threading.Thread(target=hand_back, name="appeal-release", daemon=True).start()
+
+        if method.routing_key == APPEAL_QUEUE:
+            future = run_in_pool(process_appeal, submission_id, message)
+        else:
+            future = run_submission(submission_id, reclaim=method.redelivered)
+        timer = connection.call_later(PROCESSING_TIMEOUT_SECONDS, on_timeout)
+        future.add_done_callback(on_done)
     except json.JSONDecodeError:
         logger.error(f"Failed to parse message: {body}")
         ch.basic_ack(delivery_tag=method.delivery_tag)
@@ -165,19 +399,66 @@ def callback(ch, method, properties, body):
         logger.error(f"Error in callback: {type(e).__name__}: {str(e)}", exc_info=True)
         # Requeue the message if it wasn't a parsing error
         ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
-        health_status["errors_encountered"] += 1
+        record_error()
+
+def sweep_pending_submissions():
+    """
+    Periodically claim submissions stuck in 'pending' or left 'processing'
+    past the processing timeout, and judge them on the pool's spare
+    capacity. This is the deferred path for submissions whose queue message
+    never arrived or whose worker died or gave up; the API never evaluates
+    inline.
+    """
+    while not shutdown_flag:
+        time.sleep(SWEEP_INTERVAL_SECONDS)
+        free_slots = WORKER_CONCURRENCY - health_status["in_flight"]
+        if shutdown_flag or free_slots <= 0:
+            continue
+
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            submission_ids = submission_crud.claim_stale_submissions(
+                db,
+                pending_before=now - timedelta(seconds=SWEEP_GRACE_SECONDS),
+                processing_before=now - timedelta(seconds=PROCESSING_TIMEOUT_SECONDS + SWEEP_GRACE_SECONDS),
+                limit=free_slots,
+            )
+        except Exception as e:
+            logger.error(f"Sweeper failed to claim stale submissions: {type(e).__name__}: {str(e)}", exc_info=True)
+            continue
+        finally:
+            db.close()
+
+        for submission_id in submission_ids:
+            logger.info(f"Sweeper picked up stale submission {submission_id}")
+            run_submission(submission_id, reclaim=True)
+        with health_lock:
+            health_status["submissions_swept"] += len(submission_ids)
+
+def wait_for_in_flight(connection, timeout: int = PROCESSING_TIMEOUT_SECONDS):
+    """
+    Keep pumping the connection until in-flight submissions finish (or the
+    timeout expires) so their acks reach the broker before we disconnect.
+    """
+    deadline = time.time() + timeout
+    while health_status["in_flight"] > 0 and time.time() < deadline:
+        if connection.is_closed:
+            break
+        connection.process_data_events(time_limit=1)
 
 def main():
     """
     Main function to start the worker
     """
-    global health_status
+    global health_status, executor, consumer_connection, consumer_channel
     max_retries = 10
     retry_delay = 5
     connection = None
     channel = None
     
-    logger.info("Starting judge worker...")
+    logger.info(f"Starting judge worker with concurrency {WORKER_CONCURRENCY}...")
+    executor = ThreadPoolExecutor(max_workers=WORKER_CONCURRENCY, thread_name_prefix="judge")
     
     # Start health check server in a separate thread
     def start_health_check():
@@ -189,7 +470,7 @@ def main():
                     self.send_response(200)
                     self.send_header('Content-type', 'application/json')
                     self.end_headers()
-                    self.wfile.write(json.dumps(health_status).encode())
+                    self.wfile.write(json.dumps({**health_status, "db_pool": pool_status(engine.pool)}).encode())
                 else:
                     self.send_response(404)
                     self.end_headers()
@@ -200,6 +481,9 @@ def main():
     
     health_thread = threading.Thread(target=start_health_check, daemon=True)
     health_thread.start()
+
+    sweeper_thread = threading.Thread(target=sweep_pending_submissions, daemon=True)
+    sweeper_thread.start()
     
     while not shutdown_flag:
         for attempt in range(max_retries):
@@ -226,25 +510,33 @@ def main():
                 connection = pika.BlockingConnection(connection_params)
                 channel = connection.channel()
                 
-                # Declare queue
-                queue_name = 'evaluation_queue'
-                channel.queue_declare(queue=queue_name, durable=True)
+                # Declare queues: new submissions and appeal batches
+                for queue_name in (EVALUATION_QUEUE, APPEAL_QUEUE):
+                    channel.queue_declare(queue=queue_name, durable=True)
                 
-                # Only consume one message at a time
-                channel.basic_qos(prefetch_count=1)
+                # Never hold more unacked messages than we can judge at once
+                consumer_connection, consumer_channel = connection, channel
+                update_prefetch()
                 
-                # Set up consumer
-                channel.basic_consume(queue=queue_name, on_message_callback=callback)
+                # Set up consumers; callback dispatches on the queue name
+                for queue_name in (EVALUATION_QUEUE, APPEAL_QUEUE):
+                    channel.basic_consume(queue=queue_name, on_message_callback=callback)
                 
                 logger.info("Connected to RabbitMQ, waiting for messages...")
                 health_status["connected"] = True
                 
-                # Start consuming messages
+                # Service the connection until asked to stop. Deliveries are
+                # dispatched to the pool, and acks scheduled by pool threads
+                # run here.
                 try:
-                    channel.start_consuming()
+                    while not shutdown_flag:
+                        connection.process_data_events(time_limit=1)
                 except KeyboardInterrupt:
-                    channel.stop_consuming()
-                    break
+                    pass
+
+                # Stop taking new work, then let in-flight submissions ack
+                channel.cancel()
+                wait_for_in_flight(connection)
                 
                 # If we reach here, we need to reconnect
                 break
@@ -272,6 +564,7 @@ def main():
     
     # Graceful shutdown
     logger.info("Shutting down judge worker...")
+    executor.shutdown(wait=False)
     if channel and channel.is_open:
         try:
             channel.stop_consuming()